@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.hse'
+
+    def ready(self):
+        import apps.hse.signals
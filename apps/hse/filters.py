@@ -0,0 +1,101 @@
+# apps/hse/filters.py
+"""
+فیلترهای مشترک صفحات لیست
+این توابع هم در ویوهای لیست و هم در خروجی‌ها استفاده می‌شوند تا
+خروجی دقیقاً همان چیزی باشد که کاربر در جدول می‌بیند
+"""
+from .models import CompanyMember
+
+
+def filter_inspections(request, inspections):
+    """فیلترهای لیست بازرسی‌ها"""
+    status_filter = request.GET.get('status')
+    priority_filter = request.GET.get('priority')
+    department_filter = request.GET.get('department')
+
+    if status_filter:
+        inspections = inspections.filter(status=status_filter)
+    if priority_filter:
+        inspections = inspections.filter(priority=priority_filter)
+    if department_filter:
+        inspections = inspections.filter(department_id=department_filter)
+
+    return inspections
+
+
+def filter_incidents(request, incidents):
+    """فیلترهای لیست حوادث"""
+    status_filter = request.GET.get('status', '')
+    severity_filter = request.GET.get('severity', '')
+    type_filter = request.GET.get('type', '')
+
+    if status_filter:
+        incidents = incidents.filter(status=status_filter)
+    if severity_filter:
+        incidents = incidents.filter(severity_level=severity_filter)
+    if type_filter:
+        incidents = incidents.filter(incident_type=type_filter)
+
+    return incidents.order_by('-incident_date')
+
+
+def filter_tasks(request, company, tasks):
+    """فیلترهای لیست وظایف"""
+    status_filter = request.GET.get('status', '')
+    priority_filter = request.GET.get('priority', '')
+    assigned_to_filter = request.GET.get('assigned_to', '')
+
+    if status_filter:
+        tasks = tasks.filter(status=status_filter)
+    if priority_filter:
+        tasks = tasks.filter(priority=priority_filter)
+    if assigned_to_filter:
+        tasks = tasks.filter(assigned_to_id=assigned_to_filter)
+
+    # وظایف شخصی کاربر
+    if request.GET.get('my_tasks'):
+        try:
+            member = CompanyMember.objects.get(company=company, user=request.user)
+            tasks = tasks.filter(assigned_to=member)
+        except CompanyMember.DoesNotExist:
+            pass
+
+    return tasks.order_by('-created_at')
+
+
+def filter_trainings(request, trainings):
+    """فیلترهای لیست آموزش‌ها"""
+    type_filter = request.GET.get('training_type')
+    status_filter = request.GET.get('status')
+    department_filter = request.GET.get('department')
+
+    if type_filter:
+        trainings = trainings.filter(training_type=type_filter)
+    if status_filter:
+        trainings = trainings.filter(status=status_filter)
+    if department_filter:
+        trainings = trainings.filter(department_id=department_filter)
+
+    return trainings
+
+
+def filter_training_participations(request, participations):
+    """فیلترهای سوابق حضور (همان فیلترهای آموزش روی آموزش مربوطه)"""
+    type_filter = request.GET.get('training_type')
+    status_filter = request.GET.get('status')
+    department_filter = request.GET.get('department')
+    training_filter = request.GET.get('training')
+    attendance_filter = request.GET.get('attendance_status')
+
+    if type_filter:
+        participations = participations.filter(training__training_type=type_filter)
+    if status_filter:
+        participations = participations.filter(training__status=status_filter)
+    if department_filter:
+        participations = participations.filter(training__department_id=department_filter)
+    if training_filter:
+        participations = participations.filter(training_id=training_filter)
+    if attendance_filter:
+        participations = participations.filter(attendance_status=attendance_filter)
+
+    return participations.order_by('-training__scheduled_date', 'registered_at')
@@ -56,6 +56,7 @@ class InspectionForm(forms.ModelForm):
         if company:
             self.fields['department'].queryset = CompanyDepartment.objects.filter(company=company)
             self.fields['assigned_to'].queryset = CompanyMember.objects.filter(company=company, is_active=True)
+            self.fields['checklist'].queryset = ChecklistTemplate.objects.filter(company=company, is_active=True)
 
     scheduled_date = forms.DateField(
         widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'text', 'autocomplete': 'off'}),
@@ -64,13 +65,91 @@ class InspectionForm(forms.ModelForm):
 
     class Meta:
         model = Inspection
-        fields = ['title', 'description', 'priority', 'department', 'assigned_to', 'scheduled_date']
+        fields = ['title', 'description', 'priority', 'department', 'assigned_to', 'scheduled_date', 'checklist']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'عنوان بازرسی'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
             'priority': forms.Select(attrs={'class': 'form-select'}),
             'department': forms.Select(attrs={'class': 'form-select'}),
             'assigned_to': forms.Select(attrs={'class': 'form-select'}),
+            'checklist': forms.Select(attrs={'class': 'form-select'}),
+        }
+
+
+class InspectionScheduleForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        company = kwargs.pop('company', None)
+        super().__init__(*args, **kwargs)
+
+        if company:
+            self.fields['department'].queryset = CompanyDepartment.objects.filter(company=company)
+            self.fields['assigned_to'].queryset = CompanyMember.objects.filter(company=company, is_active=True)
+            self.fields['checklist'].queryset = ChecklistTemplate.objects.filter(company=company, is_active=True)
+        if self.instance.pk:
+            self.initial['weekdays'] = [str(day) for day in self.instance.weekday_list]
+
+    weekdays = forms.MultipleChoiceField(
+        required=False,
+        choices=InspectionSchedule.WEEKDAY_CHOICES,
+        widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'}),
+        label='روزهای هفته'
+    )
+    start_date = forms.DateField(
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        initial=timezone.now().date(),
+        label='تاریخ شروع'
+    )
+    end_date = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        label='تاریخ پایان'
+    )
+
+    class Meta:
+        model = InspectionSchedule
+        fields = ['title', 'description', 'priority', 'department', 'assigned_to', 'checklist',
+                  'frequency', 'interval', 'weekdays', 'start_date', 'end_date', 'is_active']
+        widgets = {
+            'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'مثلاً بازدید روزانه لیفتراک'}),
+            'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'priority': forms.Select(attrs={'class': 'form-select'}),
+            'department': forms.Select(attrs={'class': 'form-select'}),
+            'assigned_to': forms.Select(attrs={'class': 'form-select'}),
+            'checklist': forms.Select(attrs={'class': 'form-select'}),
+            'frequency': forms.Select(attrs={'class': 'form-select'}),
+            'interval': forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
+            'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+        }
+
+    def clean_weekdays(self):
+        return ','.join(sorted(set(self.cleaned_data.get('weekdays') or [])))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('frequency') == 'CUSTOM' and not cleaned_data.get('weekdays'):
+            self.add_error('weekdays', 'برای تکرار در روزهای مشخص، حداقل یک روز را انتخاب کنید.')
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        if start_date and end_date and end_date < start_date:
+            self.add_error('end_date', 'تاریخ پایان نمی‌تواند قبل از تاریخ شروع باشد.')
+        return cleaned_data
+
+
+class ChecklistTemplateForm(forms.ModelForm):
+    items_text = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 15, 'dir': 'rtl'}),
+        label='بندهای چک‌لیست',
+        help_text='هر خط یک بند؛ برای دسته‌بندی به شکل «دسته | متن بند» بنویسید.'
+    )
+
+    class Meta:
+        model = ChecklistTemplate
+        fields = ['title', 'description', 'is_active']
+        widgets = {
+            'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'مثلاً چک‌لیست روزانه لیفتراک'}),
+            'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 2}),
+            'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
 
 
@@ -492,4 +571,84 @@ class TrainingUpdateForm(forms.ModelForm):
             'completion_date': 'تاریخ تکمیل',
             'instructor': 'مدرس',
             'participants': 'شرکت‌کنندگان',
-        }
\ No newline at end of file
+        }
+
+# apps/hse/forms.py - ورود گروهی
+class ImportJobForm(forms.ModelForm):
+    ALLOWED_EXTENSIONS = ('.csv', '.xlsx')
+
+    class Meta:
+        model = ImportJob
+        fields = ['kind', 'file']
+        widgets = {
+            'kind': forms.Select(attrs={'class': 'form-select'}),
+            'file': forms.FileInput(attrs={
+                'class': 'form-control',
+                'accept': '.csv,.xlsx'
+            }),
+        }
+        labels = {
+            'kind': 'نوع اطلاعات',
+            'file': 'فایل CSV یا Excel',
+        }
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(self.ALLOWED_EXTENSIONS):
+            raise forms.ValidationError('فقط فایل‌های CSV و XLSX پذیرفته می‌شوند')
+        return file
+
+
+class BulkInvitationForm(forms.Form):
+    """فرم دعوت گروهی اعضا (شماره‌ها به صورت متن یا فایل)"""
+    mobile_numbers = forms.CharField(
+        required=False,
+        label='شماره‌های موبایل',
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 8,
+            'placeholder': 'هر شماره در یک خط یا جدا شده با کاما'
+        })
+    )
+    mobile_file = forms.FileField(
+        required=False,
+        label='فایل شماره‌ها (CSV یا XLSX)',
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'})
+    )
+    position = forms.ChoiceField(
+        choices=CompanyMember.Position.choices,
+        initial=CompanyMember.Position.WORKER,
+        label='سمت',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    department = forms.ModelChoiceField(
+        queryset=CompanyDepartment.objects.none(),
+        required=False,
+        label='بخش',
+        empty_label='بدون بخش',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    message = forms.CharField(
+        required=False,
+        label='پیام دعوت',
+        widget=forms.Textarea(attrs={'class': 'form-control', 'rows': 3})
+    )
+
+    def __init__(self, *args, **kwargs):
+        company = kwargs.pop('company', None)
+        super().__init__(*args, **kwargs)
+
+        if company:
+            self.fields['department'].queryset = CompanyDepartment.objects.filter(company=company)
+
+    def clean_mobile_file(self):
+        file = self.cleaned_data.get('mobile_file')
+        if file and not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('فقط فایل‌های CSV و XLSX پذیرفته می‌شوند')
+        return file
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('mobile_numbers') and not cleaned_data.get('mobile_file'):
+            raise forms.ValidationError('حداقل یک شماره موبایل یا فایل شماره‌ها وارد کنید')
+        return cleaned_data
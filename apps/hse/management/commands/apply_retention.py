@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.service import retention_service
+
+
+class Command(BaseCommand):
+    help = 'انتقال دسته‌ای رکوردهای قدیمی جداول پرحجم (اعلان‌ها، حوادث بسته) به جداول بایگانی'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy', action='append', choices=sorted(retention_service.POLICIES),
+            help='سیاست مورد نظر (قابل تکرار؛ پیش‌فرض: همه)'
+        )
+        parser.add_argument('--batch-size', type=int, help='تعداد رکورد هر دسته (پیش‌فرض: HSE_RETENTION_BATCH_SIZE)')
+        parser.add_argument('--sleep', type=float, help='مکث بین دسته‌ها به ثانیه (پیش‌فرض: HSE_RETENTION_SLEEP)')
+        parser.add_argument(
+            '--max-batches', type=int,
+            help='توقف پس از این تعداد دسته؛ اجرای بعدی از همان نقطه ادامه می‌دهد'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        names = options['policy'] or sorted(retention_service.POLICIES)
+
+        for name in names:
+            policy = retention_service.POLICIES[name]
+            if options['dry_run']:
+                count = retention_service.pending_count(policy)
+                self.stdout.write(f'{policy.label}: {count} رکورد قابل بایگانی')
+                continue
+
+            try:
+                result = retention_service.apply_policy(
+                    policy,
+                    batch_size=options['batch_size'],
+                    sleep=options['sleep'],
+                    max_batches=options['max_batches'],
+                )
+            except retention_service.RetentionError as error:
+                raise CommandError(str(error))
+
+            state = 'تمام شد' if result.finished else 'ناتمام (اجرای بعدی ادامه می‌دهد)'
+            self.stdout.write(f'{policy.label}: {result.moved} رکورد در {result.batches} دسته بایگانی شد - {state}')
+
+        self.stdout.write(self.style.SUCCESS('اجرای سیاست‌های نگهداری انجام شد'))
@@ -0,0 +1,41 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.models import Company, Incident
+from apps.hse.service import duplicate_service
+
+
+class Command(BaseCommand):
+    help = 'گروه‌بندی گزارش‌های تکراری حوادث (امضای MinHash متن) در کل تاریخچه'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='شناسه شرکت (پیش‌فرض: همه شرکت‌ها)')
+        parser.add_argument('--rebuild', action='store_true', help='ساخت دوباره امضاها از روی جدول حوادث پیش از گروه‌بندی')
+        parser.add_argument('--threshold', type=float, help='حداقل شباهت تخمینی (پیش‌فرض: HSE_DUPLICATE_THRESHOLD)')
+        parser.add_argument('--top', type=int, default=10, help='تعداد بزرگ‌ترین گروه‌ها برای نمایش')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        company = None
+        if options['company']:
+            try:
+                company = Company.objects.get(id=options['company'])
+            except (Company.DoesNotExist, ValidationError):
+                raise CommandError('شرکت یافت نشد')
+        if options['threshold'] is not None and not 0 < options['threshold'] <= 1:
+            raise CommandError('شباهت باید بین ۰ و ۱ باشد')
+
+        if options['rebuild']:
+            count = duplicate_service.rebuild(company)
+            self.stdout.write(f'امضای {count} حادثه ساخته شد')
+
+        groups = duplicate_service.cluster(company, options['threshold'], dry_run=options['dry_run'])
+
+        top = groups[:options['top']]
+        titles = dict(Incident.objects.filter(id__in=[group[0] for group in top]).values_list('id', 'title'))
+        for group in top:
+            self.stdout.write(f'{len(group)} گزارش: «{titles.get(group[0], group[0])}» ({group[0]})')
+        label = 'بررسی شد (بدون ذخیره)' if options['dry_run'] else 'انجام شد'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(groups)} گروه تکراری شامل {sum(len(group) for group in groups)} حادثه - {label}'
+        ))
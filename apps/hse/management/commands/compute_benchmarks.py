@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.hse.service import benchmark_service
+
+
+class Command(BaseCommand):
+    help = 'محاسبه شاخص‌های حادثه همه شرکت‌ها و صدک آن‌ها در میان شرکت‌های هم‌حوزه'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = benchmark_service.compute()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'مقایسه {count} شرکت در {elapsed:.1f} ثانیه محاسبه شد'))
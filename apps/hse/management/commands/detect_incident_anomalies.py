@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.service import anomaly_service
+
+
+class Command(BaseCommand):
+    help = 'تشخیص افزایش غیرعادی حوادث بخش‌ها در هفته گذشته و ارسال هشدار به مدیران (اجرای هفتگی با cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='تاریخ مبنا به صورت YYYY-MM-DD (پیش‌فرض: امروز)')
+        parser.add_argument('--force', action='store_true', help='بررسی دوباره هفته‌ای که قبلاً بررسی شده')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('تاریخ نامعتبر است')
+
+        week, anomalies, notifications = anomaly_service.run(
+            today=today, dry_run=options['dry_run'], force=options['force']
+        )
+        if notifications is None:
+            self.stdout.write(f'هفته {week} قبلاً بررسی شده است')
+            return
+
+        for anomaly in anomalies:
+            self.stdout.write(
+                f'بخش {anomaly.department_id}: {anomaly.count} حادثه '
+                f'(مبنا {anomaly.baseline:.1f}، z={anomaly.z_score:.1f})'
+            )
+        label = 'بررسی شد (بدون ارسال)' if options['dry_run'] else 'انجام شد'
+        self.stdout.write(self.style.SUCCESS(
+            f'هفته {week}: {len(anomalies)} مورد ناهنجار، {notifications} اعلان - {label}'
+        ))
@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.service import escalation_service
+
+
+class Command(BaseCommand):
+    help = 'ارسال اعلان تشدید برای وظایف معوق (اجرای دوره‌ای، مثلاً روزانه با cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='تاریخ مبنا به صورت YYYY-MM-DD (پیش‌فرض: امروز)')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('تاریخ نامعتبر است')
+
+        result = escalation_service.escalate_overdue_tasks(today=today, dry_run=options['dry_run'])
+        for level, (tasks, notifications) in result.items():
+            self.stdout.write(f'سطح {level} روز: {tasks} وظیفه، {notifications} اعلان')
+
+        label = 'بررسی شد (بدون ارسال)' if options['dry_run'] else 'انجام شد'
+        self.stdout.write(self.style.SUCCESS(f'تشدید وظایف معوق {label}'))
@@ -0,0 +1,213 @@
+import os
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.hse.models import ChunkedUpload, MediaBlob, Training
+from apps.hse.service import upload_service
+from apps.hse.storage import TMP_DIR, is_blob_name, training_media_storage
+
+
+class Command(BaseCommand):
+    help = 'حذف دسته‌ای فایل‌های بدون ارجاع مخزن آموزش (blob) و در صورت نیاز بازشماری ارجاع‌ها'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--grace-hours', type=int, default=24,
+            help='blobهای بدون ارجاع تا این مدت پس از آخرین تغییر نگه داشته می‌شوند'
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='بازشماری ارجاع‌ها از روی جدول آموزش‌ها (برای تغییرات خارج از save/delete)'
+        )
+        parser.add_argument(
+            '--adopt-legacy', action='store_true',
+            help='انتقال فایل‌های قدیمی trainings/videos و trainings/attachments به مخزن و حذف نسخه‌های تکراری'
+        )
+        parser.add_argument(
+            '--upload-expiry-hours', type=int, default=None,
+            help='آپلودهای تکه‌ای متصل نشده که این مدت تغییری نداشته‌اند حذف می‌شوند (پیش‌فرض HSE_UPLOAD_EXPIRY_HOURS)'
+        )
+        parser.add_argument('--sleep', type=float, default=0, help='مکث بین دسته‌ها (ثانیه)')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['adopt_legacy'] and not options['dry_run']:
+            adopted = self.adopt_legacy(batch_size)
+            self.stdout.write(f'{adopted} آموزش به مخزن منتقل شد')
+            options['recount'] = True
+
+        if options['recount']:
+            fixed = self.recount(batch_size)
+            self.stdout.write(f'{fixed} شمارنده ارجاع اصلاح شد')
+
+        removed, freed = self.collect(
+            batch_size,
+            timezone.now() - timedelta(hours=options['grace_hours']),
+            options['sleep'],
+            options['dry_run']
+        )
+        self.remove_stale_tmp(options['grace_hours'], options['dry_run'])
+
+        expiry_hours = options['upload_expiry_hours']
+        if expiry_hours is None:
+            expiry_hours = upload_service.upload_expiry_hours()
+        expired = upload_service.expire_uploads(
+            timezone.now() - timedelta(hours=expiry_hours),
+            batch_size,
+            options['dry_run']
+        )
+        self.remove_orphan_partials(expiry_hours, options['dry_run'])
+
+        label = 'قابل حذف' if options['dry_run'] else 'حذف شد'
+        self.stdout.write(f'{expired} آپلود رها شده {label}')
+        self.stdout.write(self.style.SUCCESS(f'{removed} فایل {label} ({freed} بایت)'))
+
+    def adopt_legacy(self, batch_size):
+        """انتقال فایل‌های ذخیره شده پیش از مخزن blob؛ هر دسته با یک bulk_update"""
+        adopted = 0
+        moved = {}
+        legacy = (
+            Training.objects.exclude(video__startswith='blobs/', attachment__startswith='blobs/')
+            .filter(Q(video__gt='') | Q(attachment__gt=''))
+            .only('id', 'video', 'attachment')
+            .order_by('id')
+        )
+        last_id = None
+        while True:
+            batch = legacy.filter(id__gt=last_id) if last_id else legacy
+            batch = list(batch[:batch_size])
+            if not batch:
+                return adopted
+            last_id = batch[-1].id
+
+            changed = []
+            for training in batch:
+                updated = False
+                for field in ('video', 'attachment'):
+                    name = getattr(training, field).name
+                    if not name or is_blob_name(name):
+                        continue
+                    if name not in moved:
+                        path = training_media_storage.path(name)
+                        if not os.path.exists(path):
+                            continue
+                        moved[name] = training_media_storage.save_existing(path, name)
+                    setattr(training, field, moved[name])
+                    updated = True
+                if updated:
+                    changed.append(training)
+
+            Training.objects.bulk_update(changed, ['video', 'attachment'])
+            adopted += len(changed)
+
+    def recount(self, batch_size):
+        """بازشماری ارجاع‌ها با یک کوئری گروه‌بندی شده برای هر فیلد در هر دسته"""
+        fixed = 0
+        last_name = ''
+        while True:
+            blobs = list(
+                MediaBlob.objects.filter(name__gt=last_name).order_by('name').only('id', 'name', 'ref_count')[:batch_size]
+            )
+            if not blobs:
+                return fixed
+            last_name = blobs[-1].name
+            names = [blob.name for blob in blobs]
+
+            counts = Counter()
+            for field in ('video', 'attachment'):
+                for name, total in (
+                    Training.objects.filter(**{f'{field}__in': names})
+                    .values_list(field)
+                    .annotate(total=Count('id'))
+                    .order_by()
+                ):
+                    counts[name] += total
+
+            changed = []
+            for blob in blobs:
+                if blob.ref_count != counts[blob.name]:
+                    blob.ref_count = counts[blob.name]
+                    changed.append(blob)
+            MediaBlob.objects.bulk_update(changed, ['ref_count'])
+            fixed += len(changed)
+
+    def collect(self, batch_size, cutoff, sleep, dry_run):
+        """حذف دسته‌ای blobهای بدون ارجاع قدیمی‌تر از cutoff"""
+        removed = 0
+        freed = 0
+        last_name = ''
+        while True:
+            batch = list(
+                MediaBlob.objects.filter(ref_count=0, updated_at__lt=cutoff, name__gt=last_name)
+                .order_by('name')
+                .values_list('id', 'name', 'size')[:batch_size]
+            )
+            if not batch:
+                return removed, freed
+            last_name = batch[-1][1]
+
+            if not dry_run:
+                ids = [blob_id for blob_id, _, _ in batch]
+                # شرط دوباره روی ref_count و updated_at: blobی که در این فاصله ارجاع گرفته حذف نشود
+                MediaBlob.objects.filter(id__in=ids, ref_count=0, updated_at__lt=cutoff).delete()
+                kept = set(MediaBlob.objects.filter(id__in=ids).values_list('id', flat=True))
+                batch = [blob for blob in batch if blob[0] not in kept]
+                for _, name, _ in batch:
+                    training_media_storage.delete(name)
+
+            removed += len(batch)
+            freed += sum(size for _, _, size in batch)
+
+            if sleep:
+                time.sleep(sleep)
+
+    def remove_stale_tmp(self, grace_hours, dry_run):
+        """حذف فایل‌های موقت نیمه‌کاره (مثلاً آپلودهای قطع شده)"""
+        tmp_dir = training_media_storage.path(TMP_DIR)
+        if not os.path.isdir(tmp_dir):
+            return
+        cutoff = time.time() - grace_hours * 3600
+        for entry in os.scandir(tmp_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff and not dry_run:
+                os.remove(entry.path)
+
+    def remove_orphan_partials(self, expiry_hours, dry_run):
+        """حذف فایل‌های نیمه‌کاره قدیمی که ردیف آپلود آن‌ها دیگر وجود ندارد (مثلاً با حذف شرکت)"""
+        partial_dir = default_storage.path(upload_service.PARTIAL_UPLOAD_DIR)
+        if not os.path.isdir(partial_dir):
+            return
+        cutoff = time.time() - expiry_hours * 3600
+        stale = {}
+        for entry in os.scandir(partial_dir):
+            if entry.is_file() and entry.name.endswith('.part') and entry.stat().st_mtime < cutoff:
+                stale[entry.name[:-len('.part')]] = entry.path
+        if not stale or dry_run:
+            return
+
+        live = set(
+            str(upload_id) for upload_id in
+            ChunkedUpload.objects.filter(id__in=[
+                upload_id for upload_id in stale if self.is_uuid(upload_id)
+            ]).values_list('id', flat=True)
+        )
+        for upload_id, path in stale.items():
+            if upload_id not in live:
+                os.remove(path)
+
+    @staticmethod
+    def is_uuid(value):
+        try:
+            uuid.UUID(value)
+        except ValueError:
+            return False
+        return True
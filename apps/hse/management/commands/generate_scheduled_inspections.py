@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.service import inspection_schedule_service
+
+
+class Command(BaseCommand):
+    help = 'ساخت بازرسی‌های برنامه‌های دوره‌ای تا افق مشخص (اجرای دوره‌ای، مثلاً روزانه با cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='تاریخ مبنا به صورت YYYY-MM-DD (پیش‌فرض: امروز)')
+        parser.add_argument(
+            '--horizon-days', type=int, default=None,
+            help='تعداد روزهای آینده (پیش‌فرض: HSE_INSPECTION_SCHEDULE_HORIZON_DAYS)'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('تاریخ نامعتبر است')
+
+        schedules, created = inspection_schedule_service.generate_due(
+            today=today,
+            days=options['horizon_days'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'{schedules} برنامه بررسی شد، {created} بازرسی ساخته شد'))
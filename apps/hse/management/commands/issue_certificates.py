@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.models import Training
+from apps.hse.service import certificate_service
+
+
+class Command(BaseCommand):
+    help = 'صدور گروهی گواهی برای شرکت‌کنندگان حاضر یک آموزش'
+
+    def add_arguments(self, parser):
+        parser.add_argument('training_id')
+        parser.add_argument('--min-score', type=int, default=None)
+        parser.add_argument('--format', choices=certificate_service.CERTIFICATE_FORMATS, default='png')
+
+    def handle(self, *args, **options):
+        try:
+            training = Training.objects.select_related('company').get(id=options['training_id'])
+        except (Training.DoesNotExist, ValueError):
+            raise CommandError('آموزش یافت نشد')
+
+        try:
+            result = certificate_service.issue_certificates(
+                training,
+                min_score=options['min_score'],
+                file_format=options['format'],
+                parallel=True
+            )
+        except certificate_service.CertificateError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['eligible']} گواهی صادر شد ({result['rendered']} رندر جدید، {result['cached']} از کش)"
+        ))
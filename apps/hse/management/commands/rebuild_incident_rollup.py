@@ -0,0 +1,23 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.models import Company
+from apps.hse.service import rollup_service
+
+
+class Command(BaseCommand):
+    help = 'ساخت دوباره جدول خلاصه آماری حوادث از روی جدول حوادث'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='شناسه شرکت (پیش‌فرض: همه شرکت‌ها)')
+
+    def handle(self, *args, **options):
+        company = None
+        if options['company']:
+            try:
+                company = Company.objects.get(id=options['company'])
+            except (Company.DoesNotExist, ValidationError):
+                raise CommandError('شرکت یافت نشد')
+
+        count = rollup_service.rebuild(company)
+        self.stdout.write(self.style.SUCCESS(f'جدول خلاصه حوادث با {count} ردیف ساخته شد'))
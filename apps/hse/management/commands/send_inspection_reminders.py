@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hse.service import reminder_service
+
+
+class Command(BaseCommand):
+    help = 'ارسال یادآوری بازرسی‌های پیش رو به مسئولان (اجرای دوره‌ای، مثلاً روزانه با cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='تاریخ مبنا به صورت YYYY-MM-DD (پیش‌فرض: امروز)')
+        parser.add_argument('--batch-size', type=int, default=reminder_service.BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('تاریخ نامعتبر است')
+
+        scanned, reminded = reminder_service.send_inspection_reminders(
+            today=today,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run']
+        )
+
+        label = 'قابل ارسال' if options['dry_run'] else 'ارسال شد'
+        self.stdout.write(self.style.SUCCESS(f'{scanned} بازرسی بررسی شد، {reminded} یادآوری {label}'))
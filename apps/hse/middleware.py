@@ -0,0 +1,15 @@
+from .service.audit_service import audit_context
+
+
+class AuditMiddleware:
+    """
+    بافر تاریخچه تغییرات در طول هر درخواست
+    سوابقی که پس از commit جمع شده‌اند در پایان درخواست با یک bulk_create ذخیره می‌شوند
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_context(getattr(request, 'user', None)):
+            return self.get_response(request)
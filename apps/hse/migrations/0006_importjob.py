@@ -0,0 +1,43 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('hse', '0005_companydepartment_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('INCIDENT', 'حوادث'), ('INSPECTION', 'بازرسی\u200cها'), ('MEMBER', 'اعضا')], max_length=50, verbose_name='نوع اطلاعات')),
+                ('status', models.CharField(choices=[('UPLOADED', 'بارگذاری شده'), ('VALIDATED', 'اعتبارسنجی شده'), ('RUNNING', 'در حال ورود'), ('COMPLETED', 'تکمیل شده'), ('FAILED', 'ناموفق')], default='UPLOADED', max_length=50, verbose_name='وضعیت')),
+                ('file', models.FileField(upload_to='imports/', verbose_name='فایل')),
+                ('total_rows', models.PositiveIntegerField(default=0, verbose_name='تعداد کل ردیف\u200cها')),
+                ('valid_rows', models.PositiveIntegerField(default=0, verbose_name='ردیف\u200cهای معتبر')),
+                ('processed_rows', models.PositiveIntegerField(default=0, verbose_name='ردیف\u200cهای پردازش شده')),
+                ('created_rows', models.PositiveIntegerField(default=0, verbose_name='ردیف\u200cهای ثبت شده')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='تعداد خطاها')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='خطاها')),
+                ('preview', models.JSONField(blank=True, default=list, verbose_name='پیش\u200cنمایش')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='تاریخ شروع')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='تاریخ پایان')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='hse.company', verbose_name='شرکت')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='ایجاد کننده')),
+            ],
+            options={
+                'verbose_name': 'ورود گروهی',
+                'verbose_name_plural': 'ورودهای گروهی',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('hse', '0006_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('field', models.CharField(choices=[('video', 'فیلم آموزش'), ('attachment', 'ضمیمه')], max_length=20, verbose_name='نوع فایل')),
+                ('filename', models.CharField(max_length=255, verbose_name='نام فایل')),
+                ('total_size', models.BigIntegerField(verbose_name='حجم کل (بایت)')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='حجم دریافت شده (بایت)')),
+                ('checksum', models.CharField(blank=True, max_length=64, verbose_name='چک\u200cسام')),
+                ('status', models.CharField(choices=[('UPLOADING', 'در حال آپلود'), ('COMPLETED', 'تکمیل شده'), ('ATTACHED', 'متصل به آموزش'), ('CANCELLED', 'لغو شده')], default='UPLOADING', max_length=20, verbose_name='وضعیت')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='تاریخ تکمیل')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to='hse.company', verbose_name='شرکت')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL, verbose_name='ایجاد کننده')),
+                ('training', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunked_uploads', to='hse.training', verbose_name='آموزش')),
+            ],
+            options={
+                'verbose_name': 'آپلود تکه\u200cای',
+                'verbose_name_plural': 'آپلودهای تکه\u200cای',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
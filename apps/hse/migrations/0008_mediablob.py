@@ -0,0 +1,47 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:19
+
+import apps.hse.storage
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0007_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='مسیر فایل')),
+                ('digest', models.CharField(db_index=True, max_length=64, verbose_name='هش SHA-256')),
+                ('size', models.BigIntegerField(verbose_name='حجم (بایت)')),
+                ('original_name', models.CharField(blank=True, max_length=255, verbose_name='نام اصلی فایل')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='تعداد ارجاع')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')),
+            ],
+            options={
+                'verbose_name': 'فایل ذخیره شده',
+                'verbose_name_plural': 'فایل\u200cهای ذخیره شده',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='training',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=apps.hse.storage.ContentAddressedStorage(), upload_to='trainings/attachments/', verbose_name='ضمیمه'),
+        ),
+        migrations.AlterField(
+            model_name='training',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=apps.hse.storage.ContentAddressedStorage(), upload_to='trainings/videos/', verbose_name='فیلم آموزش'),
+        ),
+        migrations.AddIndex(
+            model_name='mediablob',
+            index=models.Index(fields=['ref_count', 'updated_at'], name='hse_mediabl_ref_cou_a3ea60_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0008_mediablob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingparticipation',
+            name='certificate_file',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='certificates/', verbose_name='فایل گواهی'),
+        ),
+    ]
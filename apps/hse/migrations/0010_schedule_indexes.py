@@ -0,0 +1,21 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0009_trainingparticipation_certificate_file'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['company', 'scheduled_date'], name='hse_inspect_company_39bb49_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='training',
+            index=models.Index(fields=['company', 'scheduled_date'], name='hse_trainin_company_82d75f_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0010_schedule_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='نام کار')),
+                ('value', models.CharField(blank=True, max_length=255, verbose_name='مقدار')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخرین اجرا')),
+            ],
+            options={
+                'verbose_name': 'نقطه پیشرفت کار',
+                'verbose_name_plural': 'نقاط پیشرفت کارها',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date'], name='hse_task_status_110f3e_idx'),
+        ),
+    ]
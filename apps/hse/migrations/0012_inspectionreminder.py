@@ -0,0 +1,46 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0011_jobcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InspectionReminder',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('lead_days', models.PositiveIntegerField(verbose_name='روز قبل از موعد')),
+                ('sent_at', models.DateTimeField(auto_now_add=True, verbose_name='زمان ارسال')),
+            ],
+            options={
+                'verbose_name': 'یادآوری بازرسی',
+                'verbose_name_plural': 'یادآوری\u200cهای بازرسی',
+                'ordering': ['-sent_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['scheduled_date', 'status'], name='hse_inspect_schedul_525962_idx'),
+        ),
+        migrations.AddField(
+            model_name='inspectionreminder',
+            name='inspection',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='hse.inspection', verbose_name='بازرسی'),
+        ),
+        migrations.AddField(
+            model_name='inspectionreminder',
+            name='member',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inspection_reminders', to='hse.companymember', verbose_name='مسئول'),
+        ),
+        migrations.AddConstraint(
+            model_name='inspectionreminder',
+            constraint=models.UniqueConstraint(fields=('inspection', 'member', 'lead_days'), name='unique_inspection_reminder'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:35
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('hse', '0012_inspectionreminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InspectionSchedule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='عنوان بازرسی')),
+                ('description', models.TextField(blank=True, verbose_name='توضیحات')),
+                ('priority', models.CharField(choices=[('LOW', 'پایین'), ('MEDIUM', 'متوسط'), ('HIGH', 'بالا'), ('CRITICAL', 'بحرانی')], default='MEDIUM', max_length=50, verbose_name='اولویت')),
+                ('frequency', models.CharField(choices=[('DAILY', 'روزانه'), ('WEEKLY', 'هفتگی'), ('MONTHLY', 'ماهانه'), ('CUSTOM', 'روزهای مشخص هفته')], default='WEEKLY', max_length=20, verbose_name='نوع تکرار')),
+                ('interval', models.PositiveIntegerField(default=1, help_text='مثلاً ۲ در تکرار هفتگی یعنی هر دو هفته یک بار', validators=[django.core.validators.MinValueValidator(1)], verbose_name='هر چند دوره')),
+                ('weekdays', models.CharField(blank=True, max_length=20, verbose_name='روزهای هفته')),
+                ('start_date', models.DateField(verbose_name='تاریخ شروع')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='تاریخ پایان')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+                ('generated_until', models.DateField(blank=True, null=True, verbose_name='بازرسی\u200cها ساخته شده تا')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')),
+            ],
+            options={
+                'verbose_name': 'برنامه بازرسی دوره\u200cای',
+                'verbose_name_plural': 'برنامه\u200cهای بازرسی دوره\u200cای',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='inspectionschedule',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inspection_schedules', to='hse.companymember', verbose_name='واگذار شده به'),
+        ),
+        migrations.AddField(
+            model_name='inspectionschedule',
+            name='company',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inspection_schedules', to='hse.company', verbose_name='شرکت'),
+        ),
+        migrations.AddField(
+            model_name='inspectionschedule',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_inspection_schedules', to=settings.AUTH_USER_MODEL, verbose_name='ایجاد کننده'),
+        ),
+        migrations.AddField(
+            model_name='inspectionschedule',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inspection_schedules', to='hse.companydepartment', verbose_name='بخش'),
+        ),
+        migrations.AddField(
+            model_name='inspection',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='hse.inspectionschedule', verbose_name='برنامه دوره\u200cای'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionschedule',
+            index=models.Index(fields=['is_active', 'generated_until'], name='hse_inspect_is_acti_86b3fd_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='inspection',
+            constraint=models.UniqueConstraint(fields=('schedule', 'scheduled_date'), name='unique_schedule_occurrence'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('hse', '0013_inspectionschedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChecklistItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('order', models.PositiveIntegerField(default=0, verbose_name='ترتیب')),
+                ('category', models.CharField(blank=True, max_length=100, verbose_name='دسته')),
+                ('text', models.CharField(max_length=500, verbose_name='متن بند')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+            ],
+            options={
+                'verbose_name': 'بند چک\u200cلیست',
+                'verbose_name_plural': 'بندهای چک\u200cلیست',
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChecklistTemplate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='عنوان چک\u200cلیست')),
+                ('description', models.TextField(blank=True, verbose_name='توضیحات')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checklist_templates', to='hse.company', verbose_name='شرکت')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_checklists', to=settings.AUTH_USER_MODEL, verbose_name='ایجاد کننده')),
+            ],
+            options={
+                'verbose_name': 'چک\u200cلیست بازرسی',
+                'verbose_name_plural': 'چک\u200cلیست\u200cهای بازرسی',
+                'ordering': ['title'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChecklistResponse',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('result', models.CharField(choices=[('PASS', 'مطابق'), ('FAIL', 'نامطابق'), ('NA', 'موضوعیت ندارد')], max_length=10, verbose_name='نتیجه')),
+                ('note', models.TextField(blank=True, verbose_name='توضیح')),
+                ('answered_at', models.DateTimeField(auto_now=True, verbose_name='زمان پاسخ')),
+                ('answered_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='checklist_responses', to=settings.AUTH_USER_MODEL, verbose_name='پاسخ دهنده')),
+                ('inspection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checklist_responses', to='hse.inspection', verbose_name='بازرسی')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='hse.checklistitem', verbose_name='بند چک\u200cلیست')),
+            ],
+            options={
+                'verbose_name': 'پاسخ چک\u200cلیست',
+                'verbose_name_plural': 'پاسخ\u200cهای چک\u200cلیست',
+            },
+        ),
+        migrations.AddField(
+            model_name='checklistitem',
+            name='template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='hse.checklisttemplate', verbose_name='چک\u200cلیست'),
+        ),
+        migrations.AddField(
+            model_name='inspection',
+            name='checklist',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='inspections', to='hse.checklisttemplate', verbose_name='چک\u200cلیست'),
+        ),
+        migrations.AddField(
+            model_name='inspectionschedule',
+            name='checklist',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='schedules', to='hse.checklisttemplate', verbose_name='چک\u200cلیست'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistresponse',
+            index=models.Index(fields=['inspection', 'result'], name='hse_checkli_inspect_0c1a73_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='checklistresponse',
+            constraint=models.UniqueConstraint(fields=('inspection', 'item'), name='unique_checklist_response'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(fields=['template', 'order'], name='hse_checkli_templat_b54d25_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0014_checklists'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['company', 'status', 'created_at'], name='hse_task_company_2065fc_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('hse', '0015_task_board_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('object_type', models.CharField(max_length=50, verbose_name='نوع شی')),
+                ('object_id', models.UUIDField(verbose_name='شناسه شی')),
+                ('action', models.CharField(choices=[('CREATE', 'ایجاد'), ('UPDATE', 'ویرایش'), ('DELETE', 'حذف')], max_length=10, verbose_name='عملیات')),
+                ('changes', models.JSONField(blank=True, default=dict, verbose_name='تغییرات')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='زمان')),
+                ('company', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hse.company', verbose_name='شرکت')),
+                ('user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='کاربر')),
+            ],
+            options={
+                'verbose_name': 'سابقه تغییر',
+                'verbose_name_plural': 'تاریخچه تغییرات',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['company', 'object_type', 'object_id', 'created_at'], name='hse_auditlo_company_a53e1f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['company', 'created_at'], name='hse_auditlo_company_3f3ff3_idx'),
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('hse', '0016_auditlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedIncident',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='عنوان حادثه')),
+                ('description', models.TextField(verbose_name='توضیحات')),
+                ('incident_type', models.CharField(choices=[('OCCURRED', 'اتفاق افتاده'), ('POTENTIAL', 'احتمالی'), ('NEAR_MISS', 'شبه\u200cحادثه')], max_length=50, verbose_name='نوع حادثه')),
+                ('severity_level', models.CharField(choices=[('LOW', 'پایین'), ('MEDIUM', 'متوسط'), ('HIGH', 'بالا'), ('SEVERE', 'شدید')], max_length=50, verbose_name='سطح حادثه')),
+                ('status', models.CharField(choices=[('UNDER_INVESTIGATION', 'در حال بررسی'), ('REPORTED', 'گزارش شده'), ('RESOLVED', 'حل شده'), ('CLOSED', 'بسته شده'), ('PENDING', 'در انتظار')], max_length=50, verbose_name='وضعیت حادثه')),
+                ('incident_date', models.DateTimeField(verbose_name='تاریخ وقوع حادثه')),
+                ('location', models.CharField(blank=True, max_length=500, verbose_name='محل وقوع')),
+                ('created_at', models.DateTimeField(verbose_name='تاریخ ثبت')),
+                ('updated_at', models.DateTimeField(verbose_name='تاریخ بروزرسانی')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='تاریخ بایگانی')),
+            ],
+            options={
+                'verbose_name': 'حادثه بایگانی شده',
+                'verbose_name_plural': 'حوادث بایگانی شده',
+                'ordering': ['-incident_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255, verbose_name='عنوان')),
+                ('message', models.TextField(verbose_name='پیام')),
+                ('notification_type', models.CharField(choices=[('INVITATION', 'دعوت'), ('TASK_ASSIGNED', 'وظیفه محول شده'), ('INSPECTION_REMINDER', 'یادآوری بازرسی'), ('INCIDENT_REPORT', 'گزارش حادثه'), ('SYSTEM', 'سیستمی'), ('WARNING', 'هشدار')], max_length=50, verbose_name='نوع اعلان')),
+                ('is_read', models.BooleanField(default=True, verbose_name='خوانده شده')),
+                ('related_object_id', models.UUIDField(blank=True, null=True, verbose_name='آیدی شی مرتبط')),
+                ('related_object_type', models.CharField(blank=True, max_length=100, verbose_name='نوع شی مرتبط')),
+                ('created_at', models.DateTimeField(verbose_name='تاریخ ایجاد')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='تاریخ بایگانی')),
+            ],
+            options={
+                'verbose_name': 'اعلان بایگانی شده',
+                'verbose_name_plural': 'اعلان\u200cهای بایگانی شده',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['status', 'updated_at'], name='hse_inciden_status_2ea06f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['is_read', 'created_at'], name='hse_notific_is_read_b77200_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='کاربر'),
+        ),
+        migrations.AddField(
+            model_name='archivedincident',
+            name='company',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hse.company', verbose_name='شرکت'),
+        ),
+        migrations.AddField(
+            model_name='archivedincident',
+            name='department',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hse.companydepartment', verbose_name='بخش مرتبط'),
+        ),
+        migrations.AddField(
+            model_name='archivedincident',
+            name='reporter',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hse.companymember', verbose_name='گزارش دهنده'),
+        ),
+        migrations.AddIndex(
+            model_name='archivednotification',
+            index=models.Index(fields=['user', 'created_at'], name='hse_archive_user_id_1a6d61_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedincident',
+            index=models.Index(fields=['company', 'incident_date'], name='hse_archive_company_8f167f_idx'),
+        ),
+    ]
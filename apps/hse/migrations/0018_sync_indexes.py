@@ -0,0 +1,41 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0017_retention_archives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['company', 'action', 'id'], name='hse_auditlo_company_6aa293_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companydepartment',
+            index=models.Index(fields=['company', 'updated_at'], name='hse_company_company_449fcc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companymember',
+            index=models.Index(fields=['company', 'updated_at'], name='hse_company_company_4994ad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['company', 'updated_at'], name='hse_inciden_company_5d501e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspection',
+            index=models.Index(fields=['company', 'updated_at'], name='hse_inspect_company_7f76ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['company', 'updated_at'], name='hse_task_company_255388_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='training',
+            index=models.Index(fields=['company', 'updated_at'], name='hse_trainin_company_d9ab64_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:54
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def build_rollup(apps, schema_editor):
+    Incident = apps.get_model('hse', 'Incident')
+    IncidentRollup = apps.get_model('hse', 'IncidentRollup')
+    groups = (
+        Incident.objects.order_by()
+        .annotate(month=TruncMonth('incident_date', output_field=models.DateField(), tzinfo=timezone.get_default_timezone()))
+        .values('company_id', 'department_id', 'month', 'incident_type', 'severity_level', 'status')
+        .annotate(count=Count('id'))
+    )
+    IncidentRollup.objects.bulk_create([IncidentRollup(**group) for group in groups.iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0018_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='ماه')),
+                ('incident_type', models.CharField(choices=[('OCCURRED', 'اتفاق افتاده'), ('POTENTIAL', 'احتمالی'), ('NEAR_MISS', 'شبه\u200cحادثه')], max_length=50, verbose_name='نوع حادثه')),
+                ('severity_level', models.CharField(choices=[('LOW', 'پایین'), ('MEDIUM', 'متوسط'), ('HIGH', 'بالا'), ('SEVERE', 'شدید')], max_length=50, verbose_name='سطح حادثه')),
+                ('status', models.CharField(choices=[('UNDER_INVESTIGATION', 'در حال بررسی'), ('REPORTED', 'گزارش شده'), ('RESOLVED', 'حل شده'), ('CLOSED', 'بسته شده'), ('PENDING', 'در انتظار')], max_length=50, verbose_name='وضعیت حادثه')),
+                ('count', models.IntegerField(default=0, verbose_name='تعداد')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incident_rollups', to='hse.company', verbose_name='شرکت')),
+                ('department', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='hse.companydepartment', verbose_name='بخش')),
+            ],
+            options={
+                'verbose_name': 'خلاصه آماری حوادث',
+                'verbose_name_plural': 'خلاصه آماری حوادث',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='incidentrollup',
+            index=models.Index(fields=['company', 'month'], name='hse_inciden_company_aaee94_idx'),
+        ),
+        migrations.RunPython(build_rollup, migrations.RunPython.noop),
+    ]
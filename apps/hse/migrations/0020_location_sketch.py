@@ -0,0 +1,33 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0019_incident_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='روز')),
+                ('counters', models.JSONField(default=dict, verbose_name='شمارنده\u200cها')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='تعداد کل')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_sketches', to='hse.company', verbose_name='شرکت')),
+            ],
+            options={
+                'verbose_name': 'خلاصه محل حوادث',
+                'verbose_name_plural': 'خلاصه محل حوادث',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='locationsketch',
+            constraint=models.UniqueConstraint(fields=('company', 'day'), name='unique_location_sketch_day'),
+        ),
+    ]
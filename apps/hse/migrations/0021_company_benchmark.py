@@ -0,0 +1,40 @@
+# Generated by Django 4.0.3 on 2026-10-19 08:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0020_location_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyBenchmark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity_field', models.CharField(max_length=255, verbose_name='حوزه فعالیت (نرمال شده)')),
+                ('period_start', models.DateField(verbose_name='شروع دوره')),
+                ('period_end', models.DateField(verbose_name='پایان دوره')),
+                ('employees', models.PositiveIntegerField(default=0, verbose_name='تعداد کارکنان')),
+                ('incidents', models.PositiveIntegerField(default=0, verbose_name='حوادث رخ داده')),
+                ('near_misses', models.PositiveIntegerField(default=0, verbose_name='شبه\u200cحوادث')),
+                ('frequency_rate', models.FloatField(null=True, verbose_name='حادثه به ازای هر ۱۰۰ نفر')),
+                ('near_miss_ratio', models.FloatField(null=True, verbose_name='سهم شبه\u200cحادثه از گزارش\u200cها')),
+                ('frequency_percentile', models.FloatField(null=True, verbose_name='صدک نرخ حادثه')),
+                ('near_miss_percentile', models.FloatField(null=True, verbose_name='صدک سهم شبه\u200cحادثه')),
+                ('peer_count', models.PositiveIntegerField(default=0, verbose_name='تعداد شرکت\u200cهای هم\u200cحوزه')),
+                ('peer_median_frequency', models.FloatField(null=True, verbose_name='میانه نرخ حادثه هم\u200cحوزه\u200cها')),
+                ('peer_median_near_miss', models.FloatField(null=True, verbose_name='میانه سهم شبه\u200cحادثه هم\u200cحوزه\u200cها')),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='زمان محاسبه')),
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='benchmark', to='hse.company', verbose_name='شرکت')),
+            ],
+            options={
+                'verbose_name': 'مقایسه با هم\u200cحوزه\u200cها',
+                'verbose_name_plural': 'مقایسه با هم\u200cحوزه\u200cها',
+            },
+        ),
+    ]
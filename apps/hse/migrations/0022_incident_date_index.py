@@ -0,0 +1,17 @@
+# Generated by Django 4.0.3 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0021_company_benchmark'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['incident_date', 'department'], name='hse_inciden_inciden_d871b3_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0.3 on 2026-10-19 09:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0022_incident_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentSignature',
+            fields=[
+                ('incident', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='hse.incident', verbose_name='حادثه')),
+                ('incident_date', models.DateTimeField(verbose_name='تاریخ وقوع')),
+                ('signature', models.BinaryField(verbose_name='امضای MinHash')),
+                ('cluster', models.UUIDField(blank=True, db_index=True, null=True, verbose_name='گروه تکراری')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incident_signatures', to='hse.company', verbose_name='شرکت')),
+            ],
+            options={
+                'verbose_name': 'امضای متن حادثه',
+                'verbose_name_plural': 'امضای متن حوادث',
+            },
+        ),
+        migrations.CreateModel(
+            name='IncidentBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(verbose_name='کلید سطل')),
+                ('incident_date', models.DateTimeField(verbose_name='تاریخ وقوع')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='hse.company', verbose_name='شرکت')),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='hse.incidentsignature', verbose_name='امضا')),
+            ],
+            options={
+                'verbose_name': 'سطل LSH حادثه',
+                'verbose_name_plural': 'سطل\u200cهای LSH حوادث',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='incidentbucket',
+            index=models.Index(fields=['company', 'key', 'incident_date'], name='hse_inciden_company_72c731_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.3 on 2026-10-19 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0023_incident_signature'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivednotification',
+            name='notification_type',
+            field=models.CharField(choices=[('INVITATION', 'دعوت'), ('TASK_ASSIGNED', 'وظیفه محول شده'), ('INSPECTION_REMINDER', 'یادآوری بازرسی'), ('INCIDENT_REPORT', 'گزارش حادثه'), ('SYSTEM', 'سیستمی'), ('WARNING', 'هشدار'), ('STATUS_CHANGED', 'تغییر وضعیت')], max_length=50, verbose_name='نوع اعلان'),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('INVITATION', 'دعوت'), ('TASK_ASSIGNED', 'وظیفه محول شده'), ('INSPECTION_REMINDER', 'یادآوری بازرسی'), ('INCIDENT_REPORT', 'گزارش حادثه'), ('SYSTEM', 'سیستمی'), ('WARNING', 'هشدار'), ('STATUS_CHANGED', 'تغییر وضعیت')], max_length=50, verbose_name='نوع اعلان'),
+        ),
+    ]
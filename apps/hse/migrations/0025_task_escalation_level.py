@@ -0,0 +1,40 @@
+# Generated by Django 4.0.3 on 2026-10-19 09:29
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def mark_escalated(apps, schema_editor):
+    # وظایف معوق فعلی قبلاً با نقطه پیشرفت سطح‌ها اعلان گرفته‌اند؛ بدون این مقداردهی
+    # اولین اجرا برای همه آن‌ها دوباره اعلان می‌فرستد
+    Task = apps.get_model('hse', 'Task')
+    today = timezone.localdate()
+    for level in sorted(getattr(settings, 'HSE_TASK_ESCALATION_LEVELS', (1, 3, 7))):
+        Task.objects.filter(
+            status__in=['PENDING', 'IN_PROGRESS'], due_date__lte=today - timedelta(days=level)
+        ).update(escalation_level=level, escalated_due_date=F('due_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0024_notification_status_changed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='escalated_due_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='سررسید تشدید شده'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='escalation_level',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='سطح تشدید'),
+        ),
+        migrations.RunPython(mark_escalated, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.3 on 2026-10-19 09:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_floor(apps, schema_editor):
+    # تا کنون خلاصه‌ها فقط افزایش یافته‌اند؛ در خلاصه پر کمترین شمارنده حد بالای محل‌های بیرون رانده شده است
+    LocationSketch = apps.get_model('hse', 'LocationSketch')
+    size = getattr(settings, 'HSE_HOTSPOT_CAPACITY', 50)
+    changed = []
+    for sketch in LocationSketch.objects.only('id', 'counters').iterator(chunk_size=500):
+        if len(sketch.counters) >= size:
+            sketch.floor = min(item[0] for item in sketch.counters.values())
+            changed.append(sketch)
+    LocationSketch.objects.bulk_update(changed, ['floor'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hse', '0025_task_escalation_level'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locationsketch',
+            name='floor',
+            field=models.PositiveIntegerField(default=0, verbose_name='حد بالای محل\u200cهای بیرون رانده شده'),
+        ),
+        migrations.RunPython(set_floor, migrations.RunPython.noop),
+    ]
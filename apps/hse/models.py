@@ -1,9 +1,13 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.urls import reverse
+from django.utils import timezone
 from apps.user.model.user import CustomUser
 import uuid
 from datetime import date
 
+from .storage import training_media_storage
+
 
 
 class Company(models.Model):
@@ -63,6 +67,9 @@ class CompanyDepartment(models.Model):
         verbose_name_plural = 'بخش‌های شرکت'
         unique_together = ['company', 'name']
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['company', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.company.name}"
@@ -131,6 +138,9 @@ class CompanyMember(models.Model):
         verbose_name_plural = 'اعضای شرکت'
         unique_together = ['company', 'user']
         ordering = ['-join_date']
+        indexes = [
+            models.Index(fields=['company', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.company.name} ({self.get_position_display()})"
@@ -216,6 +226,26 @@ class Inspection(models.Model):
     scheduled_date = models.DateField(verbose_name='تاریخ برنامه‌ریزی')
     completed_date = models.DateField(null=True, blank=True, verbose_name='تاریخ تکمیل')
 
+    # چک‌لیست مورد استفاده در این بازرسی
+    checklist = models.ForeignKey(
+        'ChecklistTemplate',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='inspections',
+        verbose_name='چک‌لیست'
+    )
+
+    # بازرسی تولید شده از برنامه دوره‌ای
+    schedule = models.ForeignKey(
+        'InspectionSchedule',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='occurrences',
+        verbose_name='برنامه دوره‌ای'
+    )
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')
 
@@ -223,6 +253,15 @@ class Inspection(models.Model):
         verbose_name = 'بازرسی'
         verbose_name_plural = 'بازرسی‌ها'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', 'scheduled_date']),
+            models.Index(fields=['scheduled_date', 'status']),
+            models.Index(fields=['company', 'updated_at']),
+        ]
+        constraints = [
+            # هر برنامه دوره‌ای در هر روز حداکثر یک بازرسی تولید می‌کند
+            models.UniqueConstraint(fields=['schedule', 'scheduled_date'], name='unique_schedule_occurrence'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.company.name}"
@@ -311,6 +350,12 @@ class Incident(models.Model):
         verbose_name = 'حادثه'
         verbose_name_plural = 'حوادث'
         ordering = ['-incident_date']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+            models.Index(fields=['company', 'updated_at']),
+            # سری هفتگی حوادث همه شرکت‌ها (anomaly_service)
+            models.Index(fields=['incident_date', 'department']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.company.name}"
@@ -388,6 +433,10 @@ class Task(models.Model):
     due_date = models.DateField(null=True, blank=True, verbose_name='تاریخ سررسید')
     completed_date = models.DateField(null=True, blank=True, verbose_name='تاریخ تکمیل')
 
+    # آخرین سطح تشدید اعلان شده و سررسیدی که برای آن اعلان شده؛ با تغییر سررسید تشدید از نو شروع می‌شود
+    escalation_level = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='سطح تشدید')
+    escalated_due_date = models.DateField(null=True, blank=True, editable=False, verbose_name='سررسید تشدید شده')
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ثبت')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='تاریخ بروزرسانی')
 
@@ -414,6 +463,11 @@ class Task(models.Model):
         verbose_name = 'وظیفه'
         verbose_name_plural = 'وظایف'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'due_date']),
+            models.Index(fields=['company', 'status', 'created_at']),
+            models.Index(fields=['company', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.company.name}"
@@ -551,6 +605,7 @@ class Notification(models.Model):
         INCIDENT_REPORT = 'INCIDENT_REPORT', 'گزارش حادثه'
         SYSTEM = 'SYSTEM', 'سیستمی'
         WARNING = 'WARNING', 'هشدار'
+        STATUS_CHANGED = 'STATUS_CHANGED', 'تغییر وضعیت'
 
     notification_type = models.CharField(
         max_length=50,
@@ -568,6 +623,9 @@ class Notification(models.Model):
         verbose_name = 'اعلان'
         verbose_name_plural = 'اعلان‌ها'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_read', 'created_at']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.user}"
@@ -728,6 +786,7 @@ class Training(models.Model):
     # فایل ویدیوی آموزش
     video = models.FileField(
         upload_to='trainings/videos/',
+        storage=training_media_storage,
         verbose_name='فیلم آموزش',
         null=True,
         blank=True
@@ -736,6 +795,7 @@ class Training(models.Model):
     # فایل‌های مرتبط (PDF، اسلایدها، ...)
     attachment = models.FileField(
         upload_to='trainings/attachments/',
+        storage=training_media_storage,
         null=True,
         blank=True,
         verbose_name='ضمیمه'
@@ -785,14 +845,24 @@ class Training(models.Model):
         verbose_name = 'آموزش'
         verbose_name_plural = 'آموزش‌ها'
         ordering = ['-scheduled_date']
+        indexes = [
+            models.Index(fields=['company', 'scheduled_date']),
+            models.Index(fields=['company', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.company.name}"
 
     def get_video_url(self):
-        """دریافت URL فیلم آموزش"""
+        """دریافت URL فیلم آموزش (از مسیر محافظت‌شده)"""
         if self.video:
-            return self.video.url
+            return reverse('hse:training_media', args=[self.company_id, self.id, 'video'])
+        return None
+
+    def get_attachment_url(self):
+        """دریافت URL ضمیمه آموزش (از مسیر محافظت‌شده)"""
+        if self.attachment:
+            return reverse('hse:training_media', args=[self.company_id, self.id, 'attachment'])
         return None
 
     def get_participants_count(self):
@@ -855,6 +925,13 @@ class TrainingParticipation(models.Model):
     # گواهی
     certificate_issued = models.BooleanField(default=False, verbose_name='صدور گواهی')
     certificate_issue_date = models.DateField(null=True, blank=True, verbose_name='تاریخ صدور گواهی')
+    certificate_file = models.FileField(
+        upload_to='certificates/',
+        max_length=255,
+        null=True,
+        blank=True,
+        verbose_name='فایل گواهی'
+    )
 
     registered_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ثبت‌نام')
     attended_at = models.DateTimeField(null=True, blank=True, verbose_name='تاریخ حضور')
@@ -900,4 +977,777 @@ class TrainingCategory(models.Model):
         unique_together = ['company', 'name']
 
     def __str__(self):
-        return f"{self.name} - {self.company.name}"
\ No newline at end of file
+        return f"{self.name} - {self.company.name}"
+
+class ImportJob(models.Model):
+    """مدل عملیات ورود گروهی اطلاعات از فایل CSV/XLSX"""
+
+    KIND_CHOICES = [
+        ('INCIDENT', 'حوادث'),
+        ('INSPECTION', 'بازرسی‌ها'),
+        ('MEMBER', 'اعضا'),
+    ]
+
+    STATUS_CHOICES = [
+        ('UPLOADED', 'بارگذاری شده'),
+        ('VALIDATED', 'اعتبارسنجی شده'),
+        ('RUNNING', 'در حال ورود'),
+        ('COMPLETED', 'تکمیل شده'),
+        ('FAILED', 'ناموفق'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='import_jobs',
+        verbose_name='شرکت'
+    )
+    created_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='import_jobs',
+        verbose_name='ایجاد کننده'
+    )
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES, verbose_name='نوع اطلاعات')
+    status = models.CharField(
+        max_length=50,
+        choices=STATUS_CHOICES,
+        default='UPLOADED',
+        verbose_name='وضعیت'
+    )
+    file = models.FileField(upload_to='imports/', verbose_name='فایل')
+
+    # پیشرفت عملیات
+    total_rows = models.PositiveIntegerField(default=0, verbose_name='تعداد کل ردیف‌ها')
+    valid_rows = models.PositiveIntegerField(default=0, verbose_name='ردیف‌های معتبر')
+    processed_rows = models.PositiveIntegerField(default=0, verbose_name='ردیف‌های پردازش شده')
+    created_rows = models.PositiveIntegerField(default=0, verbose_name='ردیف‌های ثبت شده')
+    error_count = models.PositiveIntegerField(default=0, verbose_name='تعداد خطاها')
+
+    # گزارش خطا به تفکیک ردیف و نمونه‌ای از ردیف‌های معتبر برای پیش‌نمایش
+    errors = models.JSONField(default=list, blank=True, verbose_name='خطاها')
+    preview = models.JSONField(default=list, blank=True, verbose_name='پیش‌نمایش')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='تاریخ شروع')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='تاریخ پایان')
+
+    class Meta:
+        verbose_name = 'ورود گروهی'
+        verbose_name_plural = 'ورودهای گروهی'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.company.name}"
+
+    @property
+    def progress_percent(self):
+        """درصد پیشرفت عملیات ورود"""
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+
+class ChunkedUpload(models.Model):
+    """مدل آپلود تکه‌تکه و قابل ادامه فایل‌های حجیم آموزش (فیلم/ضمیمه)"""
+
+    FIELD_CHOICES = [
+        ('video', 'فیلم آموزش'),
+        ('attachment', 'ضمیمه'),
+    ]
+
+    STATUS_CHOICES = [
+        ('UPLOADING', 'در حال آپلود'),
+        ('COMPLETED', 'تکمیل شده'),
+        ('ATTACHED', 'متصل به آموزش'),
+        ('CANCELLED', 'لغو شده'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='chunked_uploads',
+        verbose_name='شرکت'
+    )
+    created_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='chunked_uploads',
+        verbose_name='ایجاد کننده'
+    )
+    training = models.ForeignKey(
+        Training,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads',
+        verbose_name='آموزش'
+    )
+
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES, verbose_name='نوع فایل')
+    filename = models.CharField(max_length=255, verbose_name='نام فایل')
+    total_size = models.BigIntegerField(verbose_name='حجم کل (بایت)')
+    offset = models.BigIntegerField(default=0, verbose_name='حجم دریافت شده (بایت)')
+    # SHA-256 کل فایل (hex) که کلاینت اعلام کرده؛ در پایان آپلود بررسی می‌شود
+    checksum = models.CharField(max_length=64, blank=True, verbose_name='چک‌سام')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='UPLOADING',
+        verbose_name='وضعیت'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name='تاریخ تکمیل')
+
+    class Meta:
+        verbose_name = 'آپلود تکه‌ای'
+        verbose_name_plural = 'آپلودهای تکه‌ای'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
+
+    @property
+    def progress_percent(self):
+        """درصد پیشرفت آپلود"""
+        if not self.total_size:
+            return 100
+        return min(100, int(self.offset * 100 / self.total_size))
+
+
+class MediaBlob(models.Model):
+    """
+    مدل فایل ذخیره شده در مخزن آدرس‌دهی شده با محتوا (فیلم/ضمیمه آموزش)
+    ref_count تعداد ارجاع‌های آموزش‌ها به این فایل است و blobهای بدون ارجاع
+    توسط دستور gc_media_blobs حذف می‌شوند
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255, unique=True, verbose_name='مسیر فایل')
+    digest = models.CharField(max_length=64, db_index=True, verbose_name='هش SHA-256')
+    size = models.BigIntegerField(verbose_name='حجم (بایت)')
+    original_name = models.CharField(max_length=255, blank=True, verbose_name='نام اصلی فایل')
+    ref_count = models.PositiveIntegerField(default=0, verbose_name='تعداد ارجاع')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')
+
+    class Meta:
+        verbose_name = 'فایل ذخیره شده'
+        verbose_name_plural = 'فایل‌های ذخیره شده'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.original_name or self.name} ({self.ref_count})"
+
+
+class JobCheckpoint(models.Model):
+    """
+    نقطه پیشرفت کارهای دوره‌ای (high-water mark)
+    هر کار مقدار آخرین بازه پردازش شده را با یک نام یکتا نگه می‌دارد
+    تا اجرای بعدی فقط داده‌های جدید را بخواند
+    """
+
+    name = models.CharField(max_length=100, unique=True, verbose_name='نام کار')
+    value = models.CharField(max_length=255, blank=True, verbose_name='مقدار')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='آخرین اجرا')
+
+    class Meta:
+        verbose_name = 'نقطه پیشرفت کار'
+        verbose_name_plural = 'نقاط پیشرفت کارها'
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
+class InspectionReminder(models.Model):
+    """
+    دفتر یادآوری‌های ارسال شده بازرسی
+    برای هر بازرسی، فاصله یادآوری (روز قبل از موعد) و مسئول فقط یک رکورد ثبت می‌شود
+    تا یک یادآوری دو بار ارسال نشود
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    inspection = models.ForeignKey(
+        Inspection,
+        on_delete=models.CASCADE,
+        related_name='reminders',
+        verbose_name='بازرسی'
+    )
+    member = models.ForeignKey(
+        CompanyMember,
+        on_delete=models.CASCADE,
+        related_name='inspection_reminders',
+        verbose_name='مسئول'
+    )
+    lead_days = models.PositiveIntegerField(verbose_name='روز قبل از موعد')
+    sent_at = models.DateTimeField(auto_now_add=True, verbose_name='زمان ارسال')
+
+    class Meta:
+        verbose_name = 'یادآوری بازرسی'
+        verbose_name_plural = 'یادآوری‌های بازرسی'
+        ordering = ['-sent_at']
+        constraints = [
+            models.UniqueConstraint(fields=['inspection', 'member', 'lead_days'], name='unique_inspection_reminder'),
+        ]
+
+    def __str__(self):
+        return f"{self.inspection_id} - {self.lead_days}"
+
+
+class InspectionSchedule(models.Model):
+    """
+    برنامه بازرسی دوره‌ای (مثلاً بازدید روزانه لیفتراک یا بازدید هفتگی کپسول‌های آتش‌نشانی)
+    بازرسی‌ها فقط تا افق مشخصی (generated_until) در جدول بازرسی‌ها ساخته می‌شوند
+    و رخدادهای بعد از آن در تقویم به صورت محاسبه‌ای نمایش داده می‌شوند
+    """
+
+    # نوع تکرار
+    FREQUENCY_CHOICES = [
+        ('DAILY', 'روزانه'),
+        ('WEEKLY', 'هفتگی'),
+        ('MONTHLY', 'ماهانه'),
+        ('CUSTOM', 'روزهای مشخص هفته'),
+    ]
+
+    # روزهای هفته (مطابق weekday پایتون)
+    WEEKDAY_CHOICES = [
+        (5, 'شنبه'),
+        (6, 'یکشنبه'),
+        (0, 'دوشنبه'),
+        (1, 'سه‌شنبه'),
+        (2, 'چهارشنبه'),
+        (3, 'پنجشنبه'),
+        (4, 'جمعه'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='inspection_schedules',
+        verbose_name='شرکت'
+    )
+    title = models.CharField(max_length=255, verbose_name='عنوان بازرسی')
+    description = models.TextField(blank=True, verbose_name='توضیحات')
+
+    priority = models.CharField(
+        max_length=50,
+        choices=Inspection.PRIORITY_CHOICES,
+        default=Inspection.MEDIUM,
+        verbose_name='اولویت'
+    )
+
+    department = models.ForeignKey(
+        CompanyDepartment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='inspection_schedules',
+        verbose_name='بخش'
+    )
+
+    assigned_to = models.ForeignKey(
+        CompanyMember,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='inspection_schedules',
+        verbose_name='واگذار شده به'
+    )
+
+    created_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='created_inspection_schedules',
+        verbose_name='ایجاد کننده'
+    )
+
+    frequency = models.CharField(
+        max_length=20,
+        choices=FREQUENCY_CHOICES,
+        default='WEEKLY',
+        verbose_name='نوع تکرار'
+    )
+    interval = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        verbose_name='هر چند دوره',
+        help_text='مثلاً ۲ در تکرار هفتگی یعنی هر دو هفته یک بار'
+    )
+    checklist = models.ForeignKey(
+        'ChecklistTemplate',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='schedules',
+        verbose_name='چک‌لیست'
+    )
+
+    # فقط برای تکرار CUSTOM: شماره روزهای هفته جدا شده با کاما
+    weekdays = models.CharField(max_length=20, blank=True, verbose_name='روزهای هفته')
+
+    start_date = models.DateField(verbose_name='تاریخ شروع')
+    end_date = models.DateField(null=True, blank=True, verbose_name='تاریخ پایان')
+
+    is_active = models.BooleanField(default=True, verbose_name='فعال')
+    generated_until = models.DateField(null=True, blank=True, verbose_name='بازرسی‌ها ساخته شده تا')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')
+
+    class Meta:
+        verbose_name = 'برنامه بازرسی دوره‌ای'
+        verbose_name_plural = 'برنامه‌های بازرسی دوره‌ای'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'generated_until']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.get_frequency_display()})"
+
+    @property
+    def weekday_list(self):
+        return sorted(int(day) for day in self.weekdays.split(',') if day.strip().isdigit())
+
+
+class ChecklistTemplate(models.Model):
+    """قالب چک‌لیست بازرسی (مثلاً چک‌لیست روزانه لیفتراک)"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='checklist_templates',
+        verbose_name='شرکت'
+    )
+    title = models.CharField(max_length=255, verbose_name='عنوان چک‌لیست')
+    description = models.TextField(blank=True, verbose_name='توضیحات')
+    is_active = models.BooleanField(default=True, verbose_name='فعال')
+
+    created_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='created_checklists',
+        verbose_name='ایجاد کننده'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')
+
+    class Meta:
+        verbose_name = 'چک‌لیست بازرسی'
+        verbose_name_plural = 'چک‌لیست‌های بازرسی'
+        ordering = ['title']
+
+    def __str__(self):
+        return self.title
+
+
+class ChecklistItem(models.Model):
+    """یک بند از چک‌لیست بازرسی"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    template = models.ForeignKey(
+        ChecklistTemplate,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name='چک‌لیست'
+    )
+    order = models.PositiveIntegerField(default=0, verbose_name='ترتیب')
+    category = models.CharField(max_length=100, blank=True, verbose_name='دسته')
+    text = models.CharField(max_length=500, verbose_name='متن بند')
+    # بندی که پاسخ دارد حذف نمی‌شود و فقط غیرفعال می‌شود
+    is_active = models.BooleanField(default=True, verbose_name='فعال')
+
+    class Meta:
+        verbose_name = 'بند چک‌لیست'
+        verbose_name_plural = 'بندهای چک‌لیست'
+        ordering = ['order']
+        indexes = [
+            models.Index(fields=['template', 'order']),
+        ]
+
+    def __str__(self):
+        return self.text
+
+
+class ChecklistResponse(models.Model):
+    """پاسخ یک بند چک‌لیست در یک بازرسی"""
+
+    PASS = 'PASS'
+    FAIL = 'FAIL'
+    NA = 'NA'
+
+    RESULT_CHOICES = [
+        (PASS, 'مطابق'),
+        (FAIL, 'نامطابق'),
+        (NA, 'موضوعیت ندارد'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    inspection = models.ForeignKey(
+        Inspection,
+        on_delete=models.CASCADE,
+        related_name='checklist_responses',
+        verbose_name='بازرسی'
+    )
+    item = models.ForeignKey(
+        ChecklistItem,
+        on_delete=models.CASCADE,
+        related_name='responses',
+        verbose_name='بند چک‌لیست'
+    )
+    result = models.CharField(max_length=10, choices=RESULT_CHOICES, verbose_name='نتیجه')
+    note = models.TextField(blank=True, verbose_name='توضیح')
+
+    answered_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='checklist_responses',
+        verbose_name='پاسخ دهنده'
+    )
+    answered_at = models.DateTimeField(auto_now=True, verbose_name='زمان پاسخ')
+
+    class Meta:
+        verbose_name = 'پاسخ چک‌لیست'
+        verbose_name_plural = 'پاسخ‌های چک‌لیست'
+        constraints = [
+            models.UniqueConstraint(fields=['inspection', 'item'], name='unique_checklist_response'),
+        ]
+        indexes = [
+            models.Index(fields=['inspection', 'result']),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id} - {self.result}"
+
+
+class AuditLog(models.Model):
+    """
+    تاریخچه تغییرات (فقط افزودنی)
+    هر سطر تفاوت فیلدهای یک شی در یک ذخیره است: {نام فیلد: [قدیم، جدید]}
+    سوابق هر درخواست پس از commit با یک bulk_create نوشته می‌شوند
+    """
+
+    CREATE = 'CREATE'
+    UPDATE = 'UPDATE'
+    DELETE = 'DELETE'
+
+    ACTION_CHOICES = [
+        (CREATE, 'ایجاد'),
+        (UPDATE, 'ویرایش'),
+        (DELETE, 'حذف'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # بدون قید کلید خارجی تا تاریخچه با حذف شرکت یا کاربر از بین نرود
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+',
+        verbose_name='شرکت'
+    )
+    object_type = models.CharField(max_length=50, verbose_name='نوع شی')
+    object_id = models.UUIDField(verbose_name='شناسه شی')
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name='عملیات')
+    changes = models.JSONField(default=dict, blank=True, verbose_name='تغییرات')
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+',
+        verbose_name='کاربر'
+    )
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='زمان')
+
+    class Meta:
+        verbose_name = 'سابقه تغییر'
+        verbose_name_plural = 'تاریخچه تغییرات'
+        indexes = [
+            models.Index(fields=['company', 'object_type', 'object_id', 'created_at']),
+            models.Index(fields=['company', 'created_at']),
+            # خواندن حذف‌ها برای همگام‌سازی آفلاین
+            models.Index(fields=['company', 'action', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.object_type}:{self.object_id} {self.action}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('سوابق تغییرات قابل ویرایش نیستند')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('سوابق تغییرات قابل حذف نیستند')
+
+
+class ArchivedNotification(models.Model):
+    """
+    بایگانی اعلان‌های خوانده شده قدیمی (دستور apply_retention)
+    ستون‌ها همان ستون‌های Notification است؛ کلیدهای خارجی قید ندارند تا بایگانی مستقل بماند
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        verbose_name='کاربر'
+    )
+    title = models.CharField(max_length=255, verbose_name='عنوان')
+    message = models.TextField(verbose_name='پیام')
+    notification_type = models.CharField(
+        max_length=50,
+        choices=Notification.NotificationType.choices,
+        verbose_name='نوع اعلان'
+    )
+    is_read = models.BooleanField(default=True, verbose_name='خوانده شده')
+    related_object_id = models.UUIDField(null=True, blank=True, verbose_name='آیدی شی مرتبط')
+    related_object_type = models.CharField(max_length=100, blank=True, verbose_name='نوع شی مرتبط')
+    created_at = models.DateTimeField(verbose_name='تاریخ ایجاد')
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name='تاریخ بایگانی')
+
+    class Meta:
+        verbose_name = 'اعلان بایگانی شده'
+        verbose_name_plural = 'اعلان‌های بایگانی شده'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.user_id}"
+
+
+class ArchivedIncident(models.Model):
+    """
+    بایگانی حوادث بسته شده قدیمی (دستور apply_retention)
+    ستون‌ها همان ستون‌های Incident است تا فیلترها و قالب لیست حوادث روی آن هم کار کنند
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        verbose_name='شرکت'
+    )
+    title = models.CharField(max_length=255, verbose_name='عنوان حادثه')
+    description = models.TextField(verbose_name='توضیحات')
+    incident_type = models.CharField(max_length=50, choices=Incident.INCIDENT_TYPE_CHOICES, verbose_name='نوع حادثه')
+    severity_level = models.CharField(max_length=50, choices=Incident.SEVERITY_CHOICES, verbose_name='سطح حادثه')
+    status = models.CharField(max_length=50, choices=Incident.STATUS_CHOICES, verbose_name='وضعیت حادثه')
+    department = models.ForeignKey(
+        CompanyDepartment,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='بخش مرتبط'
+    )
+    reporter = models.ForeignKey(
+        CompanyMember,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+',
+        verbose_name='گزارش دهنده'
+    )
+    incident_date = models.DateTimeField(verbose_name='تاریخ وقوع حادثه')
+    location = models.CharField(max_length=500, blank=True, verbose_name='محل وقوع')
+    created_at = models.DateTimeField(verbose_name='تاریخ ثبت')
+    updated_at = models.DateTimeField(verbose_name='تاریخ بروزرسانی')
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name='تاریخ بایگانی')
+
+    class Meta:
+        verbose_name = 'حادثه بایگانی شده'
+        verbose_name_plural = 'حوادث بایگانی شده'
+        ordering = ['-incident_date']
+        indexes = [
+            models.Index(fields=['company', 'incident_date']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class IncidentRollup(models.Model):
+    """
+    تعداد حوادث به تفکیک (شرکت، بخش، ماه، نوع، سطح، وضعیت)
+    با سیگنال‌های ذخیره و حذف Incident به صورت افزایشی به‌روز می‌شود (rollup_service)
+    و دستور rebuild_incident_rollup آن را از روی جدول حوادث از نو می‌سازد
+    """
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='incident_rollups',
+        verbose_name='شرکت'
+    )
+    # بخش حذف شده از کل شرکت دوباره ساخته می‌شود؛ قید کلید خارجی لازم نیست
+    department = models.ForeignKey(
+        CompanyDepartment,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='بخش'
+    )
+    month = models.DateField(verbose_name='ماه')
+    incident_type = models.CharField(max_length=50, choices=Incident.INCIDENT_TYPE_CHOICES, verbose_name='نوع حادثه')
+    severity_level = models.CharField(max_length=50, choices=Incident.SEVERITY_CHOICES, verbose_name='سطح حادثه')
+    status = models.CharField(max_length=50, choices=Incident.STATUS_CHOICES, verbose_name='وضعیت حادثه')
+    count = models.IntegerField(default=0, verbose_name='تعداد')
+
+    class Meta:
+        verbose_name = 'خلاصه آماری حوادث'
+        verbose_name_plural = 'خلاصه آماری حوادث'
+        indexes = [
+            models.Index(fields=['company', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.incident_type}/{self.severity_level}/{self.status}: {self.count}"
+
+
+class LocationSketch(models.Model):
+    """
+    خلاصه Space-Saving محل وقوع حوادث یک شرکت در یک روز (hotspot_service)
+    counters: {کلید نرمال شده محل: [تعداد، حداکثر خطا، نمونه متن محل]} با حداکثر HSE_HOTSPOT_CAPACITY کلید
+    floor: حد بالای تعداد محلی که در counters نیست (بیشترین شمارنده بیرون رانده شده)
+    """
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='location_sketches',
+        verbose_name='شرکت'
+    )
+    day = models.DateField(verbose_name='روز')
+    counters = models.JSONField(default=dict, verbose_name='شمارنده‌ها')
+    total = models.PositiveIntegerField(default=0, verbose_name='تعداد کل')
+    floor = models.PositiveIntegerField(default=0, verbose_name='حد بالای محل‌های بیرون رانده شده')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='آخرین بروزرسانی')
+
+    class Meta:
+        verbose_name = 'خلاصه محل حوادث'
+        verbose_name_plural = 'خلاصه محل حوادث'
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'day'], name='unique_location_sketch_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.company_id} {self.day}"
+
+
+class CompanyBenchmark(models.Model):
+    """
+    مقایسه شاخص‌های حادثه شرکت با شرکت‌های هم‌حوزه (دستور compute_benchmarks)
+    هر اجرا همه ردیف‌ها را جایگزین می‌کند؛ صدک‌ها درصد شرکت‌های هم‌حوزه با مقدار کمتر است
+    """
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='benchmark',
+        verbose_name='شرکت'
+    )
+    activity_field = models.CharField(max_length=255, verbose_name='حوزه فعالیت (نرمال شده)')
+    period_start = models.DateField(verbose_name='شروع دوره')
+    period_end = models.DateField(verbose_name='پایان دوره')
+    employees = models.PositiveIntegerField(default=0, verbose_name='تعداد کارکنان')
+    incidents = models.PositiveIntegerField(default=0, verbose_name='حوادث رخ داده')
+    near_misses = models.PositiveIntegerField(default=0, verbose_name='شبه‌حوادث')
+    frequency_rate = models.FloatField(null=True, verbose_name='حادثه به ازای هر ۱۰۰ نفر')
+    near_miss_ratio = models.FloatField(null=True, verbose_name='سهم شبه‌حادثه از گزارش‌ها')
+    frequency_percentile = models.FloatField(null=True, verbose_name='صدک نرخ حادثه')
+    near_miss_percentile = models.FloatField(null=True, verbose_name='صدک سهم شبه‌حادثه')
+    peer_count = models.PositiveIntegerField(default=0, verbose_name='تعداد شرکت‌های هم‌حوزه')
+    peer_median_frequency = models.FloatField(null=True, verbose_name='میانه نرخ حادثه هم‌حوزه‌ها')
+    peer_median_near_miss = models.FloatField(null=True, verbose_name='میانه سهم شبه‌حادثه هم‌حوزه‌ها')
+    computed_at = models.DateTimeField(default=timezone.now, verbose_name='زمان محاسبه')
+
+    class Meta:
+        verbose_name = 'مقایسه با هم‌حوزه‌ها'
+        verbose_name_plural = 'مقایسه با هم‌حوزه‌ها'
+
+    def __str__(self):
+        return f"{self.company_id} ({self.activity_field})"
+
+
+class IncidentSignature(models.Model):
+    """
+    امضای MinHash متن نرمال شده عنوان، شرح و محل یک حادثه (duplicate_service)
+    با سیگنال ذخیره Incident به‌روز می‌شود؛ cluster با دستور cluster_duplicate_incidents پر می‌شود
+    """
+    incident = models.OneToOneField(
+        Incident,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='signature',
+        verbose_name='حادثه'
+    )
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='incident_signatures',
+        verbose_name='شرکت'
+    )
+    incident_date = models.DateTimeField(verbose_name='تاریخ وقوع')
+    signature = models.BinaryField(verbose_name='امضای MinHash')
+    # شناسه قدیمی‌ترین حادثه گروه تکراری‌ها؛ برای حادثه بدون تکرار خالی است
+    cluster = models.UUIDField(null=True, blank=True, db_index=True, verbose_name='گروه تکراری')
+
+    class Meta:
+        verbose_name = 'امضای متن حادثه'
+        verbose_name_plural = 'امضای متن حوادث'
+
+    def __str__(self):
+        return str(self.incident_id)
+
+
+class IncidentBucket(models.Model):
+    """سطل‌های LSH امضای حادثه: برای هر باند از امضا یک کلید (جستجوی نامزدهای تکراری با ایندکس)"""
+    signature = models.ForeignKey(
+        IncidentSignature,
+        on_delete=models.CASCADE,
+        related_name='buckets',
+        verbose_name='امضا'
+    )
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='شرکت'
+    )
+    key = models.BigIntegerField(verbose_name='کلید سطل')
+    # تکرار تاریخ وقوع تا بازه زمانی جستجو هم از همان ایندکس خوانده شود
+    incident_date = models.DateTimeField(verbose_name='تاریخ وقوع')
+
+    class Meta:
+        verbose_name = 'سطل LSH حادثه'
+        verbose_name_plural = 'سطل‌های LSH حوادث'
+        indexes = [
+            models.Index(fields=['company', 'key', 'incident_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.signature_id}: {self.key}"
@@ -0,0 +1,162 @@
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateField
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from ..models import CompanyDepartment, Incident, JobCheckpoint, Notification
+
+
+CHECKPOINT_NAME = 'incident_anomaly'
+
+BULK_BATCH_SIZE = 1000
+
+# نتیجه بررسی یک بخش در هفته مورد نظر
+Anomaly = namedtuple('Anomaly', ['department_id', 'count', 'baseline', 'z_score'])
+
+
+def history_weeks():
+    """تعداد هفته‌های قبلی که مبنای میانگین و انحراف معیار است"""
+    return getattr(settings, 'HSE_ANOMALY_HISTORY_WEEKS', 12)
+
+
+def z_threshold():
+    return getattr(settings, 'HSE_ANOMALY_Z_THRESHOLD', 3.0)
+
+
+def min_count():
+    """هفته‌ای با تعداد حوادث کمتر از این مقدار هرگز ناهنجار شمرده نمی‌شود"""
+    return getattr(settings, 'HSE_ANOMALY_MIN_COUNT', 3)
+
+
+def ewma_alpha():
+    return getattr(settings, 'HSE_ANOMALY_EWMA_ALPHA', 0.3)
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def weekly_counts(first_week, last_week):
+    """
+    تعداد حوادث هر بخش در هر هفته (دوشنبه تا یکشنبه) برای همه شرکت‌ها با یک کوئری گروهی
+    خروجی: (لیست شناسه بخش‌ها، ماتریس بخش × هفته)
+    """
+    tz = timezone.get_default_timezone()
+    start = timezone.make_aware(datetime.combine(first_week, time.min), tz)
+    end = timezone.make_aware(datetime.combine(last_week + timedelta(days=7), time.min), tz)
+    rows = (
+        Incident.objects
+        .filter(incident_date__gte=start, incident_date__lt=end, department__isnull=False)
+        .order_by()
+        .annotate(week=TruncWeek('incident_date', output_field=DateField(), tzinfo=tz))
+        .values_list('department_id', 'week')
+        .annotate(count=Count('id'))
+    )
+
+    weeks = (last_week - first_week).days // 7 + 1
+    index = {}
+    positions, columns, counts = [], [], []
+    for department_id, week, count in rows:
+        positions.append(index.setdefault(department_id, len(index)))
+        columns.append((week - first_week).days // 7)
+        counts.append(count)
+
+    matrix = np.zeros((len(index), weeks), dtype=np.float64)
+    if counts:
+        np.add.at(matrix, (np.array(positions), np.array(columns)), np.array(counts, dtype=np.float64))
+    return list(index), matrix
+
+
+def ewma_weights(length, alpha):
+    """وزن‌های میانگین متحرک نمایی برای ستون‌های قدیمی به جدید (جمع وزن‌ها ۱)"""
+    weights = alpha * (1 - alpha) ** np.arange(length - 1, -1, -1, dtype=np.float64)
+    return weights / weights.sum()
+
+
+def z_scores(matrix, alpha):
+    """
+    امتیاز z ستون آخر نسبت به ستون‌های قبلی با میانگین و واریانس EWMA، برای همه بخش‌ها با هم
+    انحراف معیار حداقل برابر جذر میانگین (توزیع پواسون) و ۱ در نظر گرفته می‌شود تا بخش‌های
+    کم‌حادثه با یک حادثه اضافه ناهنجار شمرده نشوند
+    خروجی: (مقادیر هفته آخر، میانگین مبنا، امتیازها)
+    """
+    history, current = matrix[:, :-1], matrix[:, -1]
+    weights = ewma_weights(history.shape[1], alpha)
+    mean = history @ weights
+    variance = ((history - mean[:, None]) ** 2) @ weights
+    std = np.maximum(np.sqrt(variance), np.sqrt(np.maximum(mean, 1.0)))
+    return current, mean, (current - mean) / std
+
+
+def detect(week, history=None):
+    """
+    بخش‌هایی که تعداد حوادث هفته week (دوشنبه) از روند هفته‌های قبل به‌طور معنادار بیشتر است
+    خروجی: لیست Anomaly به ترتیب امتیاز
+    """
+    history = history or history_weeks()
+    department_ids, matrix = weekly_counts(week - timedelta(weeks=history), week)
+    if not department_ids:
+        return []
+
+    current, mean, scores = z_scores(matrix, ewma_alpha())
+    flagged = np.flatnonzero((scores >= z_threshold()) & (current >= min_count()))
+    flagged = flagged[np.argsort(-scores[flagged])]
+    return [
+        Anomaly(department_ids[position], int(current[position]), float(mean[position]), float(scores[position]))
+        for position in flagged
+    ]
+
+
+def build_notifications(anomalies, week):
+    """اعلان هشدار برای مدیر هر بخش (یا مالک شرکت اگر بخش مدیر ندارد)"""
+    departments = {
+        department_id: (name, manager_id, company_name, owner_id)
+        for department_id, name, manager_id, company_name, owner_id in
+        CompanyDepartment.objects.filter(
+            id__in=[anomaly.department_id for anomaly in anomalies], is_active=True, company__is_active=True
+        ).values_list('id', 'name', 'manager_id', 'company__name', 'company__user_id')
+    }
+    for anomaly in anomalies:
+        if anomaly.department_id not in departments:
+            continue
+        name, manager_id, company_name, owner_id = departments[anomaly.department_id]
+        yield Notification(
+            user_id=manager_id or owner_id,
+            title='📈 افزایش غیرعادی حوادث',
+            message=(
+                f'در هفته {week} تعداد {anomaly.count} حادثه در بخش «{name}» ({company_name}) ثبت شده است؛ '
+                f'میانگین هفته‌های قبل حدود {anomaly.baseline:.1f} بوده است.'
+            ),
+            notification_type=Notification.NotificationType.WARNING,
+            related_object_id=anomaly.department_id,
+            related_object_type='department'
+        )
+
+
+def run(today=None, dry_run=False, force=False):
+    """
+    بررسی آخرین هفته کامل (دوشنبه تا یکشنبه گذشته) و ارسال هشدار
+    هر هفته فقط یک بار بررسی می‌شود مگر با force
+    خروجی: (هفته، لیست Anomaly، تعداد اعلان‌ها یا None اگر این هفته قبلاً بررسی شده)
+    """
+    today = today or timezone.localdate()
+    week = week_start(today) - timedelta(weeks=1)
+    checkpoint = JobCheckpoint.objects.filter(name=CHECKPOINT_NAME).values_list('value', flat=True).first()
+    if not force and checkpoint and date.fromisoformat(checkpoint) >= week:
+        return week, [], None
+
+    anomalies = detect(week)
+    notifications = list(build_notifications(anomalies, week))
+    if dry_run:
+        return week, anomalies, len(notifications)
+
+    # اعلان‌ها و نقطه پیشرفت با هم ثبت می‌شوند تا اجرای دوباره هشدار تکراری نفرستد
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications, batch_size=BULK_BATCH_SIZE)
+        JobCheckpoint.objects.update_or_create(name=CHECKPOINT_NAME, defaults={'value': week.isoformat()})
+    return week, anomalies, len(notifications)
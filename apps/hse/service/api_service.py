@@ -0,0 +1,247 @@
+import base64
+import json
+import uuid
+from collections import namedtuple
+from datetime import datetime
+
+from django.db.models import Prefetch, Q
+
+from apps.user.model.user import CustomUser
+from ..models import CompanyDepartment, CompanyMember, Incident, Inspection, Task, Training
+
+
+# منبع API: fields فیلدهای مجاز، default_fields فیلدهای پیش‌فرض بدون ?fields=
+# relations: {نام رابطه: (نام منبع مقصد، چندتایی؟)}؛ listable=False فقط از طریق include در دسترس است
+Resource = namedtuple('Resource', ['name', 'model', 'fields', 'default_fields', 'relations', 'listable'])
+
+RESOURCES = {
+    resource.name: resource
+    for resource in [
+        Resource(
+            'users', CustomUser,
+            ['name', 'family', 'mobileNumber'],
+            ['name', 'family'],
+            {}, False
+        ),
+        Resource(
+            'departments', CompanyDepartment,
+            ['name', 'employee_count', 'description', 'is_active', 'created_at', 'updated_at'],
+            ['name', 'is_active'],
+            {'manager': ('users', False), 'members': ('members', True)}, True
+        ),
+        Resource(
+            'members', CompanyMember,
+            ['position', 'status', 'join_date', 'leave_date', 'is_active', 'created_at', 'updated_at'],
+            ['position', 'status', 'is_active'],
+            {'user': ('users', False), 'department': ('departments', False)}, True
+        ),
+        Resource(
+            'incidents', Incident,
+            ['title', 'description', 'incident_type', 'severity_level', 'status', 'incident_date',
+             'location', 'created_at', 'updated_at'],
+            ['title', 'incident_type', 'severity_level', 'status', 'incident_date'],
+            {'department': ('departments', False), 'reporter': ('members', False), 'tasks': ('tasks', True)}, True
+        ),
+        Resource(
+            'inspections', Inspection,
+            ['title', 'description', 'priority', 'status', 'scheduled_date', 'completed_date',
+             'created_at', 'updated_at'],
+            ['title', 'priority', 'status', 'scheduled_date'],
+            {
+                'department': ('departments', False), 'assigned_to': ('members', False),
+                'created_by': ('users', False), 'tasks': ('tasks', True),
+            }, True
+        ),
+        Resource(
+            'tasks', Task,
+            ['title', 'description', 'priority', 'status', 'due_date', 'completed_date', 'created_at', 'updated_at'],
+            ['title', 'priority', 'status', 'due_date'],
+            {
+                'department': ('departments', False), 'assigned_to': ('members', False),
+                'created_by': ('users', False), 'related_inspection': ('inspections', False),
+                'related_incident': ('incidents', False),
+            }, True
+        ),
+        Resource(
+            'trainings', Training,
+            ['title', 'description', 'training_type', 'level', 'status', 'duration_minutes',
+             'scheduled_date', 'completion_date', 'created_at', 'updated_at'],
+            ['title', 'training_type', 'status', 'scheduled_date'],
+            {'department': ('departments', False), 'instructor': ('members', False)}, True
+        ),
+    ]
+}
+
+# عمق مجاز include، برای جلوگیری از درخواست‌های بسیار سنگین
+MAX_INCLUDE_DEPTH = 3
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class ApiError(Exception):
+    """خطای پارامترهای API"""
+
+
+# گره برنامه بارگذاری: فیلدهای یک منبع و روابط include شده آن
+Node = namedtuple('Node', ['resource', 'fields', 'children'])
+
+
+def page_size(value):
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ApiError('تعداد رکوردها نامعتبر است')
+    return max(1, min(value, MAX_PAGE_SIZE))
+
+
+def get_resource(name, listing=True):
+    resource = RESOURCES.get(name)
+    if resource is None or (listing and not resource.listable):
+        raise ApiError('منبع نامعتبر است')
+    return resource
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def build_plan(resource, fields=None, include=None):
+    """
+    تبدیل ?fields= و ?include= به درخت گره‌ها
+    include: مسیرهای نقطه‌دار رابطه (مثلاً assigned_to.user)
+    fields: نام فیلدها با پیشوند مسیر رابطه (مثلاً title,assigned_to.user.name)؛
+    گره‌ای که فیلدی برایش خواسته نشده فیلدهای پیش‌فرض منبع را می‌گیرد
+    """
+    requested = {}
+    for item in _split(fields):
+        path, _, name = item.rpartition('.')
+        requested.setdefault(path, []).append(name)
+
+    paths = set(_split(include))
+    # فیلد خواسته شده از یک رابطه یعنی آن رابطه هم include شده است
+    paths.update(path for path in requested if path)
+
+    def node(resource, path):
+        names = requested.get(path) or resource.default_fields
+        for name in names:
+            if name not in resource.fields:
+                raise ApiError(f'فیلد نامعتبر: {".".join(filter(None, [path, name]))}')
+        return Node(resource, list(dict.fromkeys(names)), {})
+
+    root = node(resource, '')
+    for path in sorted(paths, key=lambda value: value.count('.')):
+        parts = path.split('.')
+        if len(parts) > MAX_INCLUDE_DEPTH:
+            raise ApiError(f'عمق include بیش از حد مجاز است: {path}')
+        current = root
+        for index, name in enumerate(parts):
+            if name not in current.resource.relations:
+                raise ApiError(f'رابطه نامعتبر: {".".join(parts[:index + 1])}')
+            if name not in current.children:
+                target, many = current.resource.relations[name]
+                current.children[name] = (many, node(RESOURCES[target], '.'.join(parts[:index + 1])))
+            current = current.children[name][1]
+    return root
+
+
+def _projection(node, prefix=''):
+    """
+    مسیرهای only()، select_related و Prefetch برای یک گره و روابط تکی زیر آن
+    روابط تکی با JOIN در همان کوئری و روابط چندتایی با یک کوئری جداگانه برای هر رابطه خوانده می‌شوند
+    """
+    model = node.resource.model
+    only = [f'{prefix}{model._meta.pk.name}'] + [f'{prefix}{name}' for name in node.fields]
+    select = []
+    prefetch = []
+    for name, (many, child) in node.children.items():
+        if many:
+            prefetch.append(Prefetch(f'{prefix}{name}', queryset=_child_queryset(model, name, child)))
+            continue
+        select.append(f'{prefix}{name}')
+        child_only, child_select, child_prefetch = _projection(child, f'{prefix}{name}__')
+        only += child_only
+        select += child_select
+        prefetch += child_prefetch
+    return only, select, prefetch
+
+
+def _child_queryset(parent_model, name, node):
+    """کوئری رابطه چندتایی؛ کلید خارجی به والد برای اتصال نتایج prefetch لازم است"""
+    remote_field = parent_model._meta.get_field(name).field
+    only, select, prefetch = _projection(node)
+    queryset = node.resource.model.objects.only(remote_field.name, *only).order_by('-created_at', '-pk')
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def apply_plan(queryset, node, *extra_fields):
+    only, select, prefetch = _projection(node)
+    queryset = queryset.only(*only, *extra_fields)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def serialize(instance, node):
+    data = {'id': str(instance.pk)}
+    for name in node.fields:
+        value = getattr(instance, name)
+        data[name] = str(value) if isinstance(value, uuid.UUID) else value
+    for name, (many, child) in node.children.items():
+        if many:
+            data[name] = [serialize(item, child) for item in getattr(instance, name).all()]
+        else:
+            related = getattr(instance, name)
+            data[name] = serialize(related, child) if related is not None else None
+    return data
+
+
+def encode_cursor(instance):
+    data = json.dumps([instance.created_at.isoformat(), str(instance.pk)])
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(value):
+    try:
+        created_at, object_id = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        return datetime.fromisoformat(created_at), uuid.UUID(object_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ApiError('مکان نما نامعتبر است')
+
+
+def company_queryset(resource, company):
+    return resource.model.objects.filter(company=company)
+
+
+def list_objects(resource, company, fields=None, include=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    یک صفحه از اشیای شرکت، جدیدترین اول، با صفحه‌بندی keyset روی (created_at, id)
+    خروجی: (لیست داده‌ها، مکان نمای صفحه بعد یا None)
+    """
+    node = build_plan(resource, fields, include)
+    queryset = company_queryset(resource, company)
+    if cursor:
+        created_at, object_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=object_id))
+
+    # created_at برای ساخت مکان نما لازم است حتی اگر خواسته نشده باشد
+    page = list(apply_plan(queryset, node, 'created_at').order_by('-created_at', '-pk')[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1])
+    return [serialize(instance, node) for instance in page], next_cursor
+
+
+def get_object(resource, company, object_id, fields=None, include=None):
+    node = build_plan(resource, fields, include)
+    instance = apply_plan(company_queryset(resource, company), node).filter(pk=object_id).first()
+    return serialize(instance, node) if instance else None
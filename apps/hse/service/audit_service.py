@@ -0,0 +1,359 @@
+import contextvars
+import datetime
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import FileField, Q
+from django.db.models.fields.files import FieldFile
+from django.utils import timezone
+
+from .. import models as hse_models
+from ..models import AuditLog
+
+
+# مدل‌های دامنه که تغییرات آن‌ها ثبت می‌شود؛ مدل‌های دفترداری داخلی (اعلان، چک‌پوینت،
+# آپلود تکه‌ای، blob، دفتر یادآوری و پیشرفت ورود داده) عمداً ممیزی نمی‌شوند
+AUDITED_MODELS = [
+    hse_models.Company,
+    hse_models.CompanyDepartment,
+    hse_models.CompanyMember,
+    hse_models.Inspection,
+    hse_models.Incident,
+    hse_models.Task,
+    hse_models.Invitation,
+    hse_models.HSEReport,
+    hse_models.Training,
+    hse_models.TrainingParticipation,
+    hse_models.TrainingCategory,
+    hse_models.InspectionSchedule,
+    hse_models.ChecklistTemplate,
+    hse_models.ChecklistItem,
+    hse_models.ChecklistResponse,
+]
+
+# مسیر رسیدن به شرکت برای مدل‌هایی که فیلد company ندارند
+COMPANY_PATHS = {
+    hse_models.TrainingParticipation: 'training',
+    hse_models.ChecklistItem: 'template',
+    hse_models.ChecklistResponse: 'inspection',
+}
+
+# فیلدهایی که به صورت خودکار تغییر می‌کنند و در تاریخچه معنایی ندارند
+IGNORED_FIELDS = {
+    hse_models.InspectionSchedule: {'generated_until'},
+    hse_models.Task: {'escalation_level', 'escalated_due_date'},
+}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# بافر سوابق درخواست جاری؛ None یعنی خارج از درخواست (دستورات مدیریتی و shell)
+_buffer = contextvars.ContextVar('hse_audit_buffer', default=None)
+_actor = contextvars.ContextVar('hse_audit_actor', default=None)
+
+
+class AuditError(Exception):
+    """خطای پارامترهای تاریخچه تغییرات"""
+
+
+def object_type(model):
+    return model._meta.model_name
+
+
+MODELS_BY_TYPE = {object_type(model): model for model in AUDITED_MODELS}
+
+
+@lru_cache(maxsize=None)
+def tracked_fields(model):
+    """فیلدهای ساده مدل به جز کلید اصلی و فیلدهای auto_now"""
+    ignored = IGNORED_FIELDS.get(model, set())
+    return tuple(
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+        and not getattr(field, 'auto_now', False)
+        and not getattr(field, 'auto_now_add', False)
+        and field.name not in ignored
+    )
+
+
+def plain_value(value):
+    """تبدیل مقدار فیلد به مقدار قابل ذخیره در JSON"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, FieldFile):
+        return value.name or ''
+    return str(value)
+
+
+def snapshot(instance):
+    """
+    مقادیر فعلی فیلدها از __dict__ نمونه، بدون کوئری
+    فیلدهای defer شده در snapshot نیستند و تغییر آن‌ها قابل تشخیص نیست
+    """
+    values = instance.__dict__
+    return {
+        field.attname: values[field.attname]
+        for field in tracked_fields(type(instance))
+        if field.attname in values
+    }
+
+
+def diff(model, old, new):
+    """تفاوت دو snapshot به صورت {نام فیلد: [قدیم، جدید]}"""
+    changes = {}
+    for field in tracked_fields(model):
+        if field.attname not in old or field.attname not in new:
+            continue
+        before, after = old[field.attname], new[field.attname]
+        if isinstance(field, FileField) or before != after:
+            before, after = plain_value(before), plain_value(after)
+            if before != after:
+                changes[field.name] = [before, after]
+    return changes
+
+
+def created_changes(model, values):
+    """مقادیر غیرخالی شی تازه ایجاد شده به صورت {نام فیلد: [None، مقدار]}"""
+    return {
+        field.name: [None, plain_value(values[field.attname])]
+        for field in tracked_fields(model)
+        if values.get(field.attname) not in (None, '')
+    }
+
+
+def company_id_for(instance):
+    """
+    شناسه شرکت نمونه بدون کوئری
+    برای مدل‌های بدون فیلد company اگر والد در کش نمونه نباشد None برمی‌گردد
+    """
+    model = type(instance)
+    if model is hse_models.Company:
+        return instance.pk
+    if model in COMPANY_PATHS:
+        field = model._meta.get_field(COMPANY_PATHS[model])
+        if not field.is_cached(instance):
+            return None
+        parent = field.get_cached_value(instance)
+        return parent.company_id if parent else None
+    return instance.company_id
+
+
+def resolve_companies(entries):
+    """
+    مقداردهی شرکت سوابقی که والد آن‌ها بارگذاری نشده بود، با یک کوئری به ازای هر نوع والد
+    والدی که در همین بافر حذف شده دیگر در پایگاه داده نیست و شرکت آن از سابقه خودش خوانده می‌شود
+    """
+    pending = {}
+    for entry in entries:
+        parent = getattr(entry, '_audit_parent', None)
+        if parent is not None and entry.company_id is None:
+            pending.setdefault(parent[0], []).append(entry)
+
+    for parent_model, children in pending.items():
+        parent_type = object_type(parent_model)
+        companies = {
+            entry.object_id: entry.company_id
+            for entry in entries
+            if entry.object_type == parent_type and entry.company_id is not None
+        }
+        missing = {entry._audit_parent[1] for entry in children} - set(companies)
+        if missing:
+            companies.update(parent_model.objects.filter(pk__in=missing).values_list('pk', 'company_id'))
+        for entry in children:
+            entry.company_id = companies.get(entry._audit_parent[1])
+
+
+def _push(entry):
+    buffer = _buffer.get()
+    if buffer is not None:
+        buffer.append(entry)
+    else:
+        resolve_companies([entry])
+        AuditLog.objects.bulk_create([entry])
+
+
+def record(company_id, model, object_id, action, changes, user_id=None, parent=None):
+    """
+    افزودن یک سابقه به بافر پس از commit تراکنش جاری
+    سابقه تغییری که rollback شود هرگز ثبت نمی‌شود
+    parent: (مدل والد، شناسه والد) برای پیدا کردن شرکت در flush وقتی company_id خالی است
+    """
+    if user_id is None:
+        user = _actor.get()
+        user_id = user.pk if user is not None and user.is_authenticated else None
+    entry = AuditLog(
+        company_id=company_id,
+        object_type=object_type(model),
+        object_id=object_id,
+        action=action,
+        changes=changes,
+        user_id=user_id,
+        created_at=timezone.now(),
+    )
+    entry._audit_parent = parent
+    transaction.on_commit(lambda: _push(entry))
+
+
+def record_instance(instance, action, changes):
+    """
+    سابقه تغییر یک نمونه از سیگنال‌ها
+    شرکت مدل‌های بدون فیلد company داخل بافر به صورت گروهی در flush پیدا می‌شود؛ خارج از بافر
+    همان لحظه از والد خوانده می‌شود چون ممکن است والد تا پایان تراکنش حذف شود
+    """
+    model = type(instance)
+    company_id = company_id_for(instance)
+    parent = None
+    if company_id is None and model in COMPANY_PATHS:
+        field = model._meta.get_field(COMPANY_PATHS[model])
+        if _buffer.get() is None:
+            company_id = getattr(getattr(instance, field.name, None), 'company_id', None)
+        else:
+            parent = (field.related_model, getattr(instance, field.attname))
+    record(company_id, model, instance.pk, action, changes, parent=parent)
+
+
+def record_bulk(company_id, model, rows, user_id=None):
+    """سوابق تغییراتی که با update() گروهی اعمال شده‌اند؛ rows: [(object_id, changes)]"""
+    for object_id, changes in rows:
+        if changes:
+            record(company_id, model, object_id, AuditLog.UPDATE, changes, user_id)
+
+
+def record_bulk_update(company_id, model, instances, user_id=None):
+    """
+    سوابق نمونه‌هایی که با bulk_update ذخیره شده‌اند (bulk_update سیگنال ندارد)
+    تفاوت از snapshot زمان بارگذاری نمونه (post_init) و مقادیر فعلی حافظه، بدون کوئری محاسبه می‌شود
+    """
+    rows = []
+    for instance in instances:
+        current = snapshot(instance)
+        rows.append((instance.pk, diff(model, getattr(instance, '_audit_snapshot', {}), current)))
+        instance._audit_snapshot = current
+    record_bulk(company_id, model, rows, user_id)
+
+
+def record_bulk_create(company_id, model, instances, user_id=None):
+    """
+    سوابق ایجاد نمونه‌هایی که با bulk_create ذخیره شده‌اند (bulk_create سیگنال post_save ندارد)
+    company_id: None برای نمونه‌های چند شرکت که شرکت هر کدام از فیلد company خودش خوانده می‌شود
+    """
+    for instance in instances:
+        current = snapshot(instance)
+        instance._audit_snapshot = current
+        record(
+            company_id if company_id is not None else company_id_for(instance),
+            model, instance.pk, AuditLog.CREATE, created_changes(model, current), user_id
+        )
+
+
+def flush():
+    """ثبت همه سوابق بافر با یک bulk_create"""
+    buffer = _buffer.get()
+    if buffer:
+        resolve_companies(buffer)
+        AuditLog.objects.bulk_create(buffer)
+        buffer.clear()
+
+
+@contextmanager
+def audit_context(user=None):
+    """
+    بافر سوابق برای یک درخواست یا یک اجرای دستور مدیریتی
+    همه سوابق در پایان با یک کوئری ذخیره می‌شوند
+    """
+    buffer_token = _buffer.set([])
+    # کاربر درخواست تنبل است و فقط در صورت ثبت سابقه ارزیابی می‌شود
+    actor_token = _actor.set(user)
+    try:
+        yield
+    finally:
+        try:
+            flush()
+        finally:
+            _buffer.reset(buffer_token)
+            _actor.reset(actor_token)
+
+
+# ==================== خواندن تاریخچه ====================
+
+def page_size(value):
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise AuditError('تعداد سوابق نامعتبر است')
+    return max(1, min(value, MAX_PAGE_SIZE))
+
+
+def encode_cursor(entry):
+    return f'{entry.created_at.isoformat()}|{entry.id}'
+
+
+def decode_cursor(value):
+    try:
+        created_at, entry_id = value.rsplit('|', 1)
+        return datetime.datetime.fromisoformat(created_at), int(entry_id)
+    except (ValueError, TypeError):
+        raise AuditError('مکان نما نامعتبر است')
+
+
+def history(company, object_type_name=None, object_id=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    سوابق تغییرات شرکت یا یک شی، جدیدترین اول
+    صفحه‌بندی keyset روی (created_at, id) که با نمایه‌های (company, object, created_at) خوانده می‌شود
+    خروجی: (لیست سوابق، مکان نمای صفحه بعد یا None)
+    """
+    entries = AuditLog.objects.filter(company=company)
+    if object_type_name:
+        if object_type_name not in MODELS_BY_TYPE:
+            raise AuditError('نوع شی نامعتبر است')
+        entries = entries.filter(object_type=object_type_name)
+        if object_id:
+            try:
+                entries = entries.filter(object_id=uuid.UUID(str(object_id)))
+            except ValueError:
+                raise AuditError('شناسه شی نامعتبر است')
+    if cursor:
+        created_at, entry_id = decode_cursor(cursor)
+        entries = entries.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=entry_id))
+
+    page = list(entries.select_related('user').order_by('-created_at', '-id')[:limit + 1])
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(page[-1])
+    return page, None
+
+
+def _field_label(model, name):
+    try:
+        return str(model._meta.get_field(name).verbose_name)
+    except FieldDoesNotExist:
+        return name
+
+
+def serialize_entry(entry):
+    model = MODELS_BY_TYPE.get(entry.object_type)
+    user = entry.user
+    return {
+        'id': entry.id,
+        'time': entry.created_at.isoformat(),
+        'action': entry.action,
+        'action_label': entry.get_action_display(),
+        'object_type': entry.object_type,
+        'object_label': str(model._meta.verbose_name) if model else entry.object_type,
+        'object_id': str(entry.object_id),
+        'user': (user.full_name.strip() or user.mobileNumber) if user else None,
+        'changes': [
+            {'field': name, 'label': _field_label(model, name) if model else name, 'old': old, 'new': new}
+            for name, (old, new) in entry.changes.items()
+        ],
+    }
@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from ..models import Company, CompanyBenchmark, CompanyDepartment, CompanyMember, IncidentRollup
+from .hotspot_service import normalize_location
+
+
+# شاخص‌ها: (نام فیلد مقدار، نام فیلد صدک، نام فیلد میانه هم‌حوزه‌ها)
+METRICS = [
+    ('frequency_rate', 'frequency_percentile', 'peer_median_frequency'),
+    ('near_miss_ratio', 'near_miss_percentile', 'peer_median_near_miss'),
+]
+
+
+def window_days():
+    return getattr(settings, 'HSE_BENCHMARK_WINDOW_DAYS', 365)
+
+
+def normalize_field(value):
+    """حوزه فعالیت متن آزاد است؛ همان یکسان‌سازی متن محل حوادث برای گروه‌بندی به کار می‌رود"""
+    return normalize_location(value) or '-'
+
+
+def collect(period_start):
+    """
+    آمار خام همه شرکت‌های فعال با یک کوئری گروهی برای هر منبع
+    حوادث از جدول خلاصه آماری (IncidentRollup) خوانده می‌شوند نه از جدول حوادث
+    خروجی: آرایه‌های هم‌طول (شناسه‌ها، حوزه‌ها، کارکنان، حوادث، شبه‌حوادث)
+    """
+    companies = list(Company.objects.filter(is_active=True).values_list('id', 'activity_field'))
+    index = {company_id: position for position, (company_id, _) in enumerate(companies)}
+    size = len(companies)
+
+    head_count = np.zeros(size, dtype=np.int64)
+    for company_id, total in (
+        CompanyDepartment.objects.filter(is_active=True).order_by()
+        .values_list('company_id').annotate(total=Sum('employee_count'))
+    ):
+        if company_id in index:
+            head_count[index[company_id]] = total or 0
+
+    member_count = np.zeros(size, dtype=np.int64)
+    for company_id, total in (
+        CompanyMember.objects.filter(is_active=True).order_by()
+        .values_list('company_id').annotate(total=Count('id'))
+    ):
+        if company_id in index:
+            member_count[index[company_id]] = total
+
+    incidents = np.zeros(size, dtype=np.int64)
+    near_misses = np.zeros(size, dtype=np.int64)
+    for company_id, incident_type, total in (
+        IncidentRollup.objects.filter(month__gte=period_start.replace(day=1), incident_type__in=['OCCURRED', 'NEAR_MISS'])
+        .order_by().values_list('company_id', 'incident_type').annotate(total=Sum('count'))
+    ):
+        if company_id in index:
+            target = incidents if incident_type == 'OCCURRED' else near_misses
+            target[index[company_id]] = total
+
+    # تعداد کارکنان بخش‌ها ممکن است ثبت نشده باشد؛ در این صورت اعضای فعال شمرده می‌شوند
+    employees = np.maximum(head_count, member_count)
+    fields = np.array([normalize_field(field) for _, field in companies], dtype=object)
+    return [company_id for company_id, _ in companies], fields, employees, incidents, near_misses
+
+
+def rates(employees, incidents, near_misses):
+    """نرخ حادثه به ازای هر ۱۰۰ نفر و سهم شبه‌حادثه از گزارش‌ها؛ مقدار تعریف نشده NaN"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frequency = np.where(employees > 0, incidents * 100.0 / employees, np.nan)
+        reports = incidents + near_misses
+        near_miss = np.where(reports > 0, near_misses / reports, np.nan)
+    return frequency, near_miss
+
+
+def percentile_ranks(codes, values):
+    """
+    صدک هر مقدار در گروه خودش: درصد مقادیر کمتر به اضافه نیمی از مقادیر برابر
+    مقادیر NaN در رتبه‌بندی شرکت نمی‌کنند و صدک آن‌ها NaN است
+    خروجی: (صدک‌ها، میانه هر گروه)
+    """
+    ranks = np.full(values.shape, np.nan)
+    group_count = int(codes.max()) + 1 if codes.size else 0
+    medians = np.full(group_count, np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return ranks, medians
+
+    valid_codes = codes[valid]
+    # رتبه فشرده مقدار و کد گروه در یک کلید صحیح ترکیب می‌شوند تا یک جستجوی دودویی کافی باشد
+    unique_values, dense = np.unique(values[valid], return_inverse=True)
+    composite = valid_codes.astype(np.int64) * (unique_values.size + 1) + dense
+    ordered = np.sort(composite)
+
+    left = np.searchsorted(ordered, composite, side='left')
+    right = np.searchsorted(ordered, composite, side='right')
+    group_starts = np.searchsorted(ordered, np.arange(group_count, dtype=np.int64) * (unique_values.size + 1))
+    group_ends = np.append(group_starts[1:], ordered.size)
+    sizes = group_ends - group_starts
+
+    below = left - group_starts[valid_codes]
+    equal = right - left
+    ranks[valid] = (below + 0.5 * equal) * 100.0 / sizes[valid_codes]
+
+    sorted_values = unique_values[ordered % (unique_values.size + 1)]
+    for code in np.flatnonzero(sizes):
+        medians[code] = np.median(sorted_values[group_starts[code]:group_ends[code]])
+    return ranks, medians
+
+
+def compute(today=None):
+    """
+    محاسبه مقایسه همه شرکت‌ها و جایگزینی جدول CompanyBenchmark
+    خروجی: تعداد ردیف‌های ذخیره شده
+    """
+    period_end = today or timezone.localdate()
+    period_start = period_end - timedelta(days=window_days())
+    company_ids, fields, employees, incidents, near_misses = collect(period_start)
+    if not company_ids:
+        CompanyBenchmark.objects.all().delete()
+        return 0
+
+    _, codes = np.unique(fields, return_inverse=True)
+    codes = codes.reshape(-1)
+    peer_counts = np.bincount(codes)
+    values = dict(zip(('frequency_rate', 'near_miss_ratio'), rates(employees, incidents, near_misses)))
+    results = {}
+    for value_field, percentile_field, median_field in METRICS:
+        ranks, medians = percentile_ranks(codes, values[value_field])
+        results[percentile_field] = ranks
+        results[median_field] = medians[codes]
+
+    def number(value):
+        return None if np.isnan(value) else round(float(value), 4)
+
+    now = timezone.now()
+    rows = [
+        CompanyBenchmark(
+            company_id=company_id,
+            activity_field=fields[position][:255],
+            period_start=period_start,
+            period_end=period_end,
+            employees=int(employees[position]),
+            incidents=int(incidents[position]),
+            near_misses=int(near_misses[position]),
+            frequency_rate=number(values['frequency_rate'][position]),
+            near_miss_ratio=number(values['near_miss_ratio'][position]),
+            frequency_percentile=number(results['frequency_percentile'][position]),
+            near_miss_percentile=number(results['near_miss_percentile'][position]),
+            peer_count=int(peer_counts[codes[position]]),
+            peer_median_frequency=number(results['peer_median_frequency'][position]),
+            peer_median_near_miss=number(results['peer_median_near_miss'][position]),
+            computed_at=now,
+        )
+        for position, company_id in enumerate(company_ids)
+    ]
+    with transaction.atomic():
+        CompanyBenchmark.objects.all().delete()
+        CompanyBenchmark.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
@@ -0,0 +1,110 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from django.db.models import Count, Q
+
+from ..models import Task
+
+
+# ستون‌های برد به ترتیب نمایش
+COLUMNS = [value for value, _ in Task.STATUS_CHOICES]
+COLUMN_LABELS = dict(Task.STATUS_CHOICES)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class BoardError(Exception):
+    """خطای پارامترهای برد وظایف"""
+
+
+def encode_cursor(task):
+    """مکان نما کلید ترتیب آخرین کارت (created_at, id) است، نه شماره صفحه"""
+    data = json.dumps([task.created_at.isoformat(), str(task.id)])
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(value):
+    try:
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        return datetime.fromisoformat(created_at), uuid.UUID(task_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise BoardError('مکان نما نامعتبر است')
+
+
+def page_size(value):
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise BoardError('تعداد کارت‌ها نامعتبر است')
+    return max(1, min(value, MAX_PAGE_SIZE))
+
+
+def column_totals(tasks):
+    """تعداد کارت‌های هر ستون با یک GROUP BY"""
+    totals = dict.fromkeys(COLUMNS, 0)
+    for status, count in tasks.order_by().values_list('status').annotate(count=Count('id')):
+        totals[status] = count
+    return totals
+
+
+def column_page(tasks, status, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    یک صفحه از کارت‌های یک ستون با صفحه‌بندی keyset روی (created_at, id)
+    با نمایه (company, status, created_at) هزینه هر صفحه مستقل از عمق اسکرول است
+    خروجی: (لیست وظایف، مکان نمای صفحه بعد یا None)
+    """
+    tasks = tasks.filter(status=status)
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        tasks = tasks.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=task_id))
+
+    cards = list(
+        tasks.select_related('assigned_to__user', 'department')
+        .order_by('-created_at', '-id')[:limit + 1]
+    )
+    if len(cards) > limit:
+        cards = cards[:limit]
+        return cards, encode_cursor(cards[-1])
+    return cards, None
+
+
+def serialize_card(task, today=None):
+    assignee = task.assigned_to.user if task.assigned_to_id else None
+    return {
+        'id': str(task.id),
+        'title': task.title,
+        'status': task.status,
+        'priority': task.priority,
+        'priority_label': task.get_priority_display(),
+        'due_date': task.due_date.isoformat() if task.due_date else None,
+        'overdue': bool(today and task.due_date and task.due_date < today and task.status not in ('COMPLETED', 'CANCELLED')),
+        'assignee': (assignee.full_name.strip() or assignee.mobileNumber) if assignee else None,
+        'department': task.department.name if task.department_id else None,
+    }
+
+
+def serialize_column(status, cards, next_cursor, total, today=None):
+    return {
+        'status': status,
+        'label': COLUMN_LABELS[status],
+        'total': total,
+        'cards': [serialize_card(task, today) for task in cards],
+        'next_cursor': next_cursor,
+    }
+
+
+def board(tasks, limit=DEFAULT_PAGE_SIZE, today=None):
+    """
+    برد کامل: یک کوئری برای شمارش ستون‌ها و برای هر ستون غیرخالی یک کوئری صفحه اول
+    """
+    totals = column_totals(tasks)
+    columns = []
+    for status in COLUMNS:
+        cards, next_cursor = column_page(tasks, status, limit=limit) if totals[status] else ([], None)
+        columns.append(serialize_column(status, cards, next_cursor, totals[status], today))
+    return columns
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import jdatetime
+from arabic_reshaper import reshape
+from bidi.algorithm import get_display
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont, features
+
+from ..models import TrainingParticipation
+from . import audit_service
+
+
+CERTIFICATE_DIR = 'certificates'
+CERTIFICATE_FORMATS = ('png', 'pdf')
+
+# با تغییر طرح گواهی این نسخه افزایش یابد تا کش قبلی استفاده نشود
+TEMPLATE_VERSION = 2
+
+# A4 افقی با ۱۵۰ DPI
+PAGE_SIZE = (1754, 1240)
+PAGE_DPI = 150
+
+# زیر این تعداد، رندر در همان پروسه انجام می‌شود (هزینه ساخت pool بیشتر است)
+MIN_POOL_JOBS = 8
+
+# حداکثر گواهی جدیدی که در یک درخواست وب رندر می‌شود؛ بیشتر از آن با دستور issue_certificates
+WEB_MAX_RENDERS = 50
+
+
+class CertificateError(Exception):
+    """خطای صدور گواهی"""
+
+
+def _font_path():
+    return getattr(
+        settings,
+        'HSE_CERTIFICATE_FONT',
+        os.path.join(settings.BASE_DIR, 'static', 'fonts', 'Vazirmatn-Regular.ttf')
+    )
+
+
+def web_max_renders():
+    return getattr(settings, 'HSE_CERTIFICATE_WEB_MAX_RENDERS', WEB_MAX_RENDERS)
+
+
+def _worker_count():
+    return getattr(settings, 'HSE_CERTIFICATE_WORKERS', None) or os.cpu_count() or 1
+
+
+def _jalali(value):
+    if not value:
+        return ''
+    if hasattr(value, 'date'):
+        value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return jdatetime.date.fromgregorian(date=value).strftime('%Y/%m/%d')
+
+
+def eligible_participations(training, min_score=None):
+    """شرکت‌کنندگان حاضر با نمره آزمون حداقل min_score"""
+    participations = TrainingParticipation.objects.filter(training=training, attendance_status='ATTENDED')
+    if min_score is not None:
+        participations = participations.filter(test_score__gte=min_score)
+    return participations.select_related('participant__user', 'training__company')
+
+
+def certificate_payload(participation, issue_date):
+    """اطلاعات چاپ شده روی گواهی؛ هش همین داده کلید کش فایل است"""
+    training = participation.training
+    user = participation.participant.user
+    return {
+        'number': str(participation.id).split('-')[0].upper(),
+        'company': training.company.name,
+        'training': training.title,
+        'training_type': training.get_training_type_display(),
+        'participant': user.full_name.strip() or user.mobileNumber,
+        'duration': training.duration_minutes,
+        'date': _jalali(training.completion_date or training.scheduled_date),
+        'issue_date': _jalali(issue_date),
+        'score': participation.test_score,
+    }
+
+
+def payload_hash(payload, file_format):
+    data = json.dumps(
+        {'payload': payload, 'format': file_format, 'version': TEMPLATE_VERSION},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def certificate_name(digest, file_format):
+    return f'{CERTIFICATE_DIR}/{digest[:2]}/{digest}.{file_format}'
+
+
+def _load_font(path, size):
+    if features.check('raqm'):
+        return ImageFont.truetype(path, size, layout_engine=ImageFont.Layout.RAQM)
+    return ImageFont.truetype(path, size)
+
+
+def check_font(path):
+    """فونت پیش‌فرض Pillow حروف فارسی ندارد؛ بدون فونت تنظیم شده گواهی صادر نمی‌شود"""
+    try:
+        _load_font(path, 12)
+    except OSError:
+        raise CertificateError(f'فونت گواهی یافت نشد یا قابل خواندن نیست (HSE_CERTIFICATE_FONT: {path})')
+
+
+def _draw_centered(draw, y, text, font, fill):
+    """
+    متن وسط‌چین راست‌به‌چپ
+    بدون کتابخانه raqm، Pillow حروف را جدا و چپ‌به‌راست می‌چیند؛ در این حالت متن پیش از رسم
+    با arabic_reshaper به شکل‌های پیوسته حروف و با الگوریتم bidi به ترتیب نمایشی تبدیل می‌شود
+    """
+    if features.check('raqm'):
+        options = {'direction': 'rtl'}
+    else:
+        options = {}
+        text = get_display(reshape(text))
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font, **options)
+    x = (PAGE_SIZE[0] - (right - left)) / 2 - left
+    draw.text((x, y), text, font=font, fill=fill, **options)
+    return y + (bottom - top)
+
+
+def render_certificate(job):
+    """
+    رندر یک گواهی و ذخیره آن در مسیر مشخص
+    این تابع در پروسه‌های جداگانه اجرا می‌شود و به پایگاه داده دسترسی ندارد
+    job: (payload, file_format, path, font_path)
+    """
+    payload, file_format, path, font_path = job
+
+    image = Image.new('RGB', PAGE_SIZE, 'white')
+    draw = ImageDraw.Draw(image)
+    width, height = PAGE_SIZE
+
+    draw.rectangle((40, 40, width - 40, height - 40), outline=(13, 110, 253), width=12)
+    draw.rectangle((70, 70, width - 70, height - 70), outline=(173, 181, 189), width=2)
+
+    title_font = _load_font(font_path, 96)
+    name_font = _load_font(font_path, 80)
+    body_font = _load_font(font_path, 44)
+    small_font = _load_font(font_path, 32)
+
+    y = _draw_centered(draw, 170, 'گواهی‌نامه آموزشی', title_font, (13, 110, 253)) + 90
+    y = _draw_centered(draw, y, 'بدین‌وسیله گواهی می‌شود', body_font, (33, 37, 41)) + 60
+    y = _draw_centered(draw, y, payload['participant'], name_font, (0, 0, 0)) + 70
+    y = _draw_centered(
+        draw, y, f"دوره «{payload['training']}» ({payload['training_type']})", body_font, (33, 37, 41)
+    ) + 40
+    y = _draw_centered(
+        draw, y, f"به مدت {payload['duration']} دقیقه در تاریخ {payload['date']} را با موفقیت گذرانده است", body_font, (33, 37, 41)
+    ) + 40
+    if payload['score'] is not None:
+        _draw_centered(draw, y, f"نمره آزمون: {payload['score']}", body_font, (33, 37, 41))
+
+    _draw_centered(draw, height - 260, payload['company'], body_font, (0, 0, 0))
+    _draw_centered(
+        draw, height - 170, f"شماره گواهی: {payload['number']} - تاریخ صدور: {payload['issue_date']}", small_font, (108, 117, 125)
+    )
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    if file_format == 'pdf':
+        image.save(tmp_path, 'PDF', resolution=PAGE_DPI)
+    else:
+        image.save(tmp_path, 'PNG')
+    os.replace(tmp_path, path)
+    return path
+
+
+def _render_all(jobs, parallel=False):
+    if not parallel or len(jobs) < MIN_POOL_JOBS or _worker_count() == 1:
+        return [render_certificate(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=_worker_count()) as executor:
+        return list(executor.map(render_certificate, jobs, chunksize=max(1, len(jobs) // (_worker_count() * 4))))
+
+
+def issue_certificates(training, min_score=None, file_format='png', parallel=False, max_renders=None):
+    """
+    صدور گروهی گواهی برای شرکت‌کنندگان واجد شرایط
+    فایل‌ها با هش داده‌های ورودی نام‌گذاری می‌شوند؛ فایلی که از قبل وجود دارد دوباره رندر نمی‌شود
+    رندرها در همان پروسه (یا با parallel در ProcessPoolExecutor، فقط برای دستور مدیریتی) و ذخیره
+    رکوردها با یک bulk_update انجام می‌شود
+    max_renders: سقف فایل‌های جدید؛ بیشتر از آن خطا و هیچ گواهی صادر نمی‌شود
+    خروجی: {'eligible', 'rendered', 'cached'}
+    """
+    if file_format not in CERTIFICATE_FORMATS:
+        raise CertificateError('فرمت گواهی نامعتبر است')
+    if training.status != 'COMPLETED':
+        raise CertificateError('گواهی فقط برای آموزش تکمیل شده صادر می‌شود')
+
+    today = timezone.localdate()
+    font_path = _font_path()
+    check_font(font_path)
+    participations = list(eligible_participations(training, min_score))
+
+    jobs = []
+    for participation in participations:
+        issue_date = participation.certificate_issue_date or today
+        payload = certificate_payload(participation, issue_date)
+        name = certificate_name(payload_hash(payload, file_format), file_format)
+
+        participation.certificate_issued = True
+        participation.certificate_issue_date = issue_date
+        participation.certificate_file = name
+
+        path = default_storage.path(name)
+        if not os.path.exists(path):
+            jobs.append((payload, file_format, path, font_path))
+
+    if max_renders is not None and len(jobs) > max_renders:
+        raise CertificateError(
+            f'رندر {len(jobs)} گواهی جدید در این درخواست ممکن نیست (حداکثر {max_renders})؛ '
+            f'از دستور issue_certificates استفاده کنید'
+        )
+    _render_all(jobs, parallel)
+
+    with transaction.atomic():
+        TrainingParticipation.objects.bulk_update(
+            participations,
+            ['certificate_issued', 'certificate_issue_date', 'certificate_file'],
+            batch_size=500
+        )
+        audit_service.record_bulk_update(training.company_id, TrainingParticipation, participations)
+
+    return {
+        'eligible': len(participations),
+        'rendered': len(jobs),
+        'cached': len(participations) - len(jobs),
+    }
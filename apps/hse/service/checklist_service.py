@@ -0,0 +1,268 @@
+import uuid
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from ..models import ChecklistItem, ChecklistResponse, Inspection
+from . import audit_service
+
+
+RESULT_VALUES = {value for value, _ in ChecklistResponse.RESULT_CHOICES}
+
+# سقف تعداد بندهای یک چک‌لیست
+MAX_ITEMS = 500
+
+BULK_BATCH_SIZE = 500
+
+
+class ChecklistError(Exception):
+    """خطای ورودی چک‌لیست"""
+
+
+def parse_item_lines(text):
+    """
+    تبدیل متن بندها (هر خط یک بند، به شکل «دسته | متن» یا فقط «متن») به لیست (دسته، متن)
+    """
+    items = []
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        category, separator, body = line.partition('|')
+        if not separator:
+            category, body = '', category
+        category, body = category.strip()[:100], body.strip()[:500]
+        if body:
+            items.append((category, body))
+    if len(items) > MAX_ITEMS:
+        raise ChecklistError(f'حداکثر {MAX_ITEMS} بند مجاز است')
+    return items
+
+
+def items_as_text(template):
+    """متن قابل ویرایش بندهای فعال چک‌لیست"""
+    return '\n'.join(
+        f'{category} | {text}' if category else text
+        for category, text in template.items.filter(is_active=True).values_list('category', 'text')
+    )
+
+
+@transaction.atomic
+def save_items(template, items):
+    """
+    همگام‌سازی بندهای چک‌لیست با لیست (دسته، متن)
+    بندهای با متن یکسان حفظ و فقط مرتب می‌شوند تا پاسخ‌های قبلی معتبر بمانند؛
+    بندهای حذف شده در صورت داشتن پاسخ غیرفعال و در غیر این صورت حذف می‌شوند
+    """
+    existing = {}
+    for item in template.items.all():
+        existing.setdefault((item.category, item.text), item)
+
+    keep = []
+    new = []
+    for order, (category, text) in enumerate(items, start=1):
+        item = existing.pop((category, text), None)
+        if item is None:
+            new.append(ChecklistItem(template=template, order=order, category=category, text=text))
+        else:
+            item.order = order
+            item.is_active = True
+            keep.append(item)
+
+    ChecklistItem.objects.bulk_update(keep, ['order', 'is_active'], batch_size=BULK_BATCH_SIZE)
+    ChecklistItem.objects.bulk_create(new, batch_size=BULK_BATCH_SIZE)
+    audit_service.record_bulk_update(template.company_id, ChecklistItem, keep)
+    audit_service.record_bulk_create(template.company_id, ChecklistItem, new)
+
+    removed = [item.id for item in existing.values()]
+    answered = set(
+        ChecklistResponse.objects.filter(item_id__in=removed).values_list('item_id', flat=True).distinct()
+    )
+    deactivated = [item.id for item in existing.values() if item.id in answered and item.is_active]
+    ChecklistItem.objects.filter(id__in=deactivated).update(is_active=False)
+    # update() سیگنال ندارد؛ غیرفعال شدن بندها جداگانه در تاریخچه ثبت می‌شود
+    audit_service.record_bulk(
+        template.company_id, ChecklistItem, [(item_id, {'is_active': [True, False]}) for item_id in deactivated]
+    )
+    ChecklistItem.objects.filter(id__in=set(removed) - answered).delete()
+    return len(keep), len(new)
+
+
+def checklist_items(inspection):
+    """بندهای فعال چک‌لیست بازرسی به همراه پاسخ‌ها (دو کوئری)"""
+    if not inspection.checklist_id:
+        return []
+    responses = {
+        response.item_id: response
+        for response in ChecklistResponse.objects.filter(inspection=inspection)
+    }
+    items = list(ChecklistItem.objects.filter(template_id=inspection.checklist_id, is_active=True))
+    for item in items:
+        item.response = responses.get(item.id)
+    return items
+
+
+def responses_from_post(data, item_ids):
+    """تبدیل فرم چک‌لیست (result_<id> / note_<id>) به لیست ردیف‌ها"""
+    rows = []
+    for item_id in item_ids:
+        row = {'item': item_id}
+        if f'result_{item_id}' in data:
+            row['result'] = data.get(f'result_{item_id}')
+        if f'note_{item_id}' in data:
+            row['note'] = data.get(f'note_{item_id}')
+        if len(row) > 1:
+            rows.append(row)
+    return rows
+
+
+@transaction.atomic
+def submit_responses(inspection, rows, user):
+    """
+    ثبت گروهی پاسخ‌های چک‌لیست در یک تراکنش
+    rows: لیست {'item', 'result'?, 'note'?}
+    ابتدا همه ردیف‌ها اعتبارسنجی می‌شوند و در صورت وجود هر خطا هیچ پاسخی ذخیره نمی‌شود؛
+    سپس پاسخ‌های موجود با یک bulk_update و پاسخ‌های جدید با یک bulk_create ذخیره می‌شوند
+    ردیف بازرسی قفل می‌شود تا دو ثبت همزمان هر دو یک پاسخ جدید برای یک بند نسازند
+    خروجی: (تعداد ذخیره شده، لیست خطاها)
+    """
+    if not inspection.checklist_id:
+        raise ChecklistError('برای این بازرسی چک‌لیستی انتخاب نشده است')
+
+    list(Inspection.objects.select_for_update().filter(pk=inspection.pk).values_list('pk', flat=True))
+    item_ids = set(
+        ChecklistItem.objects.filter(template_id=inspection.checklist_id, is_active=True).values_list('id', flat=True)
+    )
+    existing = {
+        response.item_id: response
+        for response in ChecklistResponse.objects.filter(inspection=inspection)
+    }
+
+    errors = []
+    changed = {}
+    created = {}
+    for row in rows:
+        try:
+            item_id = uuid.UUID(str(row.get('item')))
+        except ValueError:
+            item_id = None
+        if item_id not in item_ids:
+            errors.append({'item': row.get('item'), 'error': 'بند چک‌لیست یافت نشد'})
+            continue
+
+        result = row.get('result')
+        note = row.get('note')
+        if note is not None:
+            note = str(note).strip()
+        response = existing.get(item_id) or created.get(item_id)
+        # بند بی‌پاسخ فرم (بدون نتیجه و توضیح) نادیده گرفته می‌شود
+        if not result and (note is None or (not note and response is None)):
+            continue
+        if result and (not isinstance(result, str) or result not in RESULT_VALUES):
+            errors.append({'item': row.get('item'), 'error': 'نتیجه نامعتبر است'})
+            continue
+
+        if response is None:
+            if not result:
+                errors.append({'item': row.get('item'), 'error': 'نتیجه بند مشخص نشده است'})
+                continue
+            response = ChecklistResponse(inspection=inspection, item_id=item_id)
+            created[item_id] = response
+        else:
+            changed[item_id] = response
+
+        if result:
+            response.result = result
+        if note is not None:
+            response.note = note
+        response.answered_by = user
+
+    if errors:
+        return 0, errors
+
+    # auto_now در bulk_update اعمال نمی‌شود؛ answered_at با pre_save مقداردهی می‌شود
+    field = ChecklistResponse._meta.get_field('answered_at')
+    for response in changed.values():
+        field.pre_save(response, add=False)
+    ChecklistResponse.objects.bulk_update(
+        list(changed.values()),
+        ['result', 'note', 'answered_by', 'answered_at'],
+        batch_size=BULK_BATCH_SIZE
+    )
+    ChecklistResponse.objects.bulk_create(list(created.values()), batch_size=BULK_BATCH_SIZE)
+    audit_service.record_bulk_update(inspection.company_id, ChecklistResponse, changed.values())
+    audit_service.record_bulk_create(inspection.company_id, ChecklistResponse, created.values())
+    return len(changed) + len(created), []
+
+
+def _result_counts(prefix=''):
+    return {
+        'pass_count': Count(f'{prefix}id', filter=Q(**{f'{prefix}result': ChecklistResponse.PASS})),
+        'fail_count': Count(f'{prefix}id', filter=Q(**{f'{prefix}result': ChecklistResponse.FAIL})),
+        'na_count': Count(f'{prefix}id', filter=Q(**{f'{prefix}result': ChecklistResponse.NA})),
+    }
+
+
+def pass_rate(pass_count, fail_count):
+    """درصد انطباق: مطابق / (مطابق + نامطابق)؛ بندهای NA در محاسبه نیستند"""
+    total = (pass_count or 0) + (fail_count or 0)
+    return round(100 * (pass_count or 0) / total, 1) if total else None
+
+
+def inspection_stats(inspection):
+    """آمار پاسخ‌های یک بازرسی با یک کوئری"""
+    stats = ChecklistResponse.objects.filter(inspection=inspection).aggregate(**_result_counts())
+    stats['pass_rate'] = pass_rate(stats['pass_count'], stats['fail_count'])
+    return stats
+
+
+def annotate_pass_rates(inspections):
+    """افزودن تعداد پاسخ‌ها به کوئری بازرسی‌ها (گروه‌بندی روی پاسخ‌ها)"""
+    return inspections.annotate(**_result_counts('checklist_responses__'))
+
+
+def department_stats(company, start=None, end=None):
+    """
+    درصد انطباق چک‌لیست به تفکیک بخش با یک کوئری گروه‌بندی شده
+    خروجی: لیست {'department_id', 'department', 'inspections', 'pass_count', 'fail_count', 'na_count', 'pass_rate'}
+    """
+    responses = ChecklistResponse.objects.filter(inspection__company=company)
+    if start:
+        responses = responses.filter(inspection__scheduled_date__gte=start)
+    if end:
+        responses = responses.filter(inspection__scheduled_date__lte=end)
+
+    rows = (
+        responses
+        .values('inspection__department_id', 'inspection__department__name')
+        .annotate(inspections=Count('inspection_id', distinct=True), **_result_counts())
+        .order_by('inspection__department__name')
+    )
+    return [
+        {
+            'department_id': row['inspection__department_id'],
+            'department': row['inspection__department__name'] or 'بدون بخش',
+            'inspections': row['inspections'],
+            'pass_count': row['pass_count'],
+            'fail_count': row['fail_count'],
+            'na_count': row['na_count'],
+            'pass_rate': pass_rate(row['pass_count'], row['fail_count']),
+        }
+        for row in rows
+    ]
+
+
+def failing_items(company, limit=10):
+    """بندهایی که بیشترین نتیجه نامطابق را داشته‌اند (یک کوئری گروه‌بندی شده)"""
+    rows = (
+        ChecklistResponse.objects
+        .filter(inspection__company=company)
+        .values('item_id', 'item__text', 'item__template__title')
+        .annotate(**_result_counts())
+        .filter(fail_count__gt=0)
+        .order_by('-fail_count')[:limit]
+    )
+    return [
+        dict(row, pass_rate=pass_rate(row['pass_count'], row['fail_count']))
+        for row in rows
+    ]
@@ -0,0 +1,193 @@
+import logging
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Max, Q, Value, When
+from django.db.models.functions import Coalesce
+
+from ..models import CompanyMember, Training, TrainingParticipation
+
+
+# رتبه وضعیت حضور؛ بهترین وضعیت هر عضو در هر نوع آموزش با Max محاسبه می‌شود
+STATUS_NONE = 0
+STATUS_ABSENT = 1
+STATUS_EXCUSED = 2
+STATUS_REGISTERED = 3
+STATUS_ATTENDED = 4
+
+STATUS_RANKS = {
+    'ABSENT': STATUS_ABSENT,
+    'EXCUSED': STATUS_EXCUSED,
+    'REGISTERED': STATUS_REGISTERED,
+    'ATTENDED': STATUS_ATTENDED,
+}
+
+STATUS_LABELS = {
+    STATUS_NONE: 'بدون سابقه',
+    STATUS_ABSENT: 'غایب',
+    STATUS_EXCUSED: 'معذور',
+    STATUS_REGISTERED: 'ثبت‌نام شده',
+    STATUS_ATTENDED: 'گذرانده',
+}
+
+TRAINING_TYPES = [value for value, _ in Training.TRAINING_TYPE_CHOICES]
+TRAINING_TYPE_LABELS = dict(Training.TRAINING_TYPE_CHOICES)
+
+# ماتریس تا تغییر نسخه شرکت معتبر است؛ این زمان فقط سقف نگهداری است
+# نسخه و ماتریس در کش پیش‌فرض نگهداری می‌شوند که باید بین پروسه‌ها مشترک باشد (CACHES در تنظیمات)
+MATRIX_CACHE_TIMEOUT = 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(company_id):
+    return f'hse:compliance:version:{company_id}'
+
+
+def get_company_version(company_id):
+    version = cache.get(_version_key(company_id))
+    if version is None:
+        version = 1
+        cache.add(_version_key(company_id), version, None)
+    return version
+
+
+def bump_company_version(company_id):
+    """
+    باطل کردن ماتریس شرکت پس از تغییر اعضا، آموزش‌ها یا حضورها
+    از سیگنال ذخیره/حذف صدا زده می‌شود؛ قطع بودن کش نباید ذخیره را متوقف کند و ماتریس
+    قدیمی حداکثر تا MATRIX_CACHE_TIMEOUT باقی می‌ماند
+    """
+    try:
+        cache.incr(_version_key(company_id))
+    except ValueError:
+        cache.set(_version_key(company_id), 2, None)
+    except Exception:
+        logger.exception('compliance cache unavailable; version of company %s not bumped', company_id)
+
+
+@lru_cache(maxsize=4096)
+def training_company_id(training_id):
+    """شرکت یک آموزش؛ شرکت آموزش تغییر نمی‌کند و در هر پروسه یک بار خوانده می‌شود"""
+    return Training.objects.filter(pk=training_id).values_list('company_id', flat=True).first()
+
+
+def _best_status_expression():
+    return Max(Case(
+        *[When(attendance_status=status, then=Value(rank)) for status, rank in STATUS_RANKS.items()],
+        default=Value(STATUS_NONE),
+        output_field=IntegerField()
+    ))
+
+
+def build_matrix(company):
+    """
+    ساخت ماتریس انطباق آموزشی (عضو × نوع آموزش)
+    وضعیت‌ها با یک کوئری گروه‌بندی شده روی TrainingParticipation خوانده می‌شوند
+    و در آرایه متراکم status[i][j] و completed[i][j] قرار می‌گیرند
+    """
+    members = list(
+        CompanyMember.objects.filter(company=company, status='ACTIVE', is_active=True)
+        .order_by('department__name', 'user__family', 'user__name')
+        .values_list('id', 'user__name', 'user__family', 'user__mobileNumber', 'department_id', 'department__name')
+    )
+    member_index = {member[0]: index for index, member in enumerate(members)}
+    type_index = {training_type: index for index, training_type in enumerate(TRAINING_TYPES)}
+
+    status = [[STATUS_NONE] * len(TRAINING_TYPES) for _ in members]
+    completed = [[None] * len(TRAINING_TYPES) for _ in members]
+
+    rows = (
+        TrainingParticipation.objects
+        .filter(training__company=company, participant__company=company)
+        .exclude(training__status='CANCELLED')
+        .values_list('participant_id', 'training__training_type')
+        .annotate(
+            best_status=_best_status_expression(),
+            last_completed=Max(
+                Coalesce('attended_at', 'training__completion_date'),
+                filter=Q(attendance_status='ATTENDED')
+            ),
+        )
+        .order_by()
+    )
+    for participant_id, training_type, best_status, last_completed in rows:
+        i = member_index.get(participant_id)
+        j = type_index.get(training_type)
+        if i is None or j is None:
+            continue
+        status[i][j] = best_status
+        completed[i][j] = last_completed.isoformat() if last_completed else None
+
+    # تعداد اعضای گذرانده هر نوع آموزش
+    coverage = [sum(1 for row in status if row[j] == STATUS_ATTENDED) for j in range(len(TRAINING_TYPES))]
+
+    return {
+        'types': TRAINING_TYPES,
+        'members': [
+            {
+                'id': str(member_id),
+                'name': f'{name or ""} {family or ""}'.strip() or mobile,
+                'department_id': str(department_id) if department_id else None,
+                'department': department_name or '',
+            }
+            for member_id, name, family, mobile, department_id, department_name in members
+        ],
+        'status': status,
+        'completed': completed,
+        'coverage': coverage,
+    }
+
+
+def get_matrix(company):
+    """ماتریس کش شده برای نسخه فعلی شرکت؛ اگر کش در دسترس نباشد ماتریس بدون کش (version=None) ساخته می‌شود"""
+    try:
+        version = get_company_version(company.id)
+        key = f'hse:compliance:matrix:{company.id}:{version}'
+        matrix = cache.get(key)
+    except Exception:
+        logger.exception('compliance cache unavailable; building matrix of company %s uncached', company.id)
+        matrix = build_matrix(company)
+        matrix['version'] = None
+        return matrix
+
+    if matrix is None:
+        matrix = build_matrix(company)
+        matrix['version'] = version
+        try:
+            cache.set(key, matrix, MATRIX_CACHE_TIMEOUT)
+        except Exception:
+            logger.exception('compliance cache unavailable; matrix of company %s not stored', company.id)
+    return matrix
+
+
+def select_rows(matrix, department_id=None, types=None, gaps_only=False):
+    """
+    فیلتر ردیف‌های ماتریس
+    خروجی: (اندیس ستون‌ها، لیست اندیس ردیف‌ها)
+    """
+    columns = [j for j, training_type in enumerate(matrix['types']) if not types or training_type in types]
+    rows = []
+    for i, member in enumerate(matrix['members']):
+        if department_id and member['department_id'] != str(department_id):
+            continue
+        if gaps_only and all(matrix['status'][i][j] == STATUS_ATTENDED for j in columns):
+            continue
+        rows.append(i)
+    return columns, rows
+
+
+def iter_gaps(matrix, columns, rows):
+    """ردیف‌های خروجی CSV کمبودها: (عضو، بخش، نوع آموزش، بهترین وضعیت)"""
+    for i in rows:
+        member = matrix['members'][i]
+        for j in columns:
+            status = matrix['status'][i][j]
+            if status == STATUS_ATTENDED:
+                continue
+            yield (
+                member['name'],
+                member['department'],
+                TRAINING_TYPE_LABELS[matrix['types'][j]],
+                STATUS_LABELS[status],
+            )
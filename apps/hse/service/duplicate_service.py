@@ -0,0 +1,325 @@
+import zlib
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import Incident, IncidentBucket, IncidentSignature
+from .hotspot_service import normalize_text
+
+
+# پارامترهای امضا؛ تغییر آن‌ها نیازمند ساخت دوباره نمایه است (cluster_duplicate_incidents --rebuild)
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SEED = 7
+
+# فیلدهای حادثه که در امضا شرکت می‌کنند
+TEXT_FIELDS = ('title', 'description', 'location', 'incident_date')
+
+# متن‌های خیلی بلند فقط تا این طول در امضا شرکت می‌کنند
+MAX_TEXT_LENGTH = 4000
+MAX_SUGGESTIONS = 5
+# حداکثر تعداد همسایه بعدی هر حادثه در یک سطل که در خوشه‌بندی بررسی می‌شود (سطل‌های خیلی شلوغ)
+MAX_NEIGHBOURS = 200
+
+BULK_BATCH_SIZE = 1000
+
+# درهم‌سازی ضرب و جابه‌جایی: ((a·x + b) mod 2^64) >> 32 با a فرد، برای هر جایگشت یک جفت (a, b)
+_random = np.random.default_rng(SEED)
+_UINT64_MAX = np.iinfo(np.uint64).max
+HASH_A = _random.integers(0, _UINT64_MAX, NUM_PERM, dtype=np.uint64, endpoint=True) | np.uint64(1)
+HASH_B = _random.integers(0, _UINT64_MAX, NUM_PERM, dtype=np.uint64, endpoint=True)
+# ترکیب سطرهای هر باند در یک کلید ۶۴ بیتی؛ نمک هر باند کلیدهای باندهای مختلف را جدا می‌کند
+BAND_MULTIPLIERS = _random.integers(0, _UINT64_MAX, ROWS, dtype=np.uint64, endpoint=True) | np.uint64(1)
+BAND_SALTS = _random.integers(0, _UINT64_MAX, BANDS, dtype=np.uint64, endpoint=True)
+
+# حادثه مشابه و شباهت تخمینی (Jaccard) متن آن
+Match = namedtuple('Match', ['incident', 'similarity'])
+
+
+class DuplicateError(Exception):
+    """خطای پارامترهای جستجوی حوادث تکراری"""
+
+
+def threshold():
+    """حداقل شباهت تخمینی برای تکراری شمردن دو گزارش"""
+    return getattr(settings, 'HSE_DUPLICATE_THRESHOLD', 0.35)
+
+
+def window_days():
+    """حداکثر فاصله تاریخ وقوع دو گزارش از یک رویداد"""
+    return getattr(settings, 'HSE_DUPLICATE_WINDOW_DAYS', 14)
+
+
+# ==================== امضا ====================
+
+def document(title, description, location):
+    return normalize_text(' '.join(part for part in (title, description, location) if part))[:MAX_TEXT_LENGTH]
+
+
+def shingles(text):
+    """درهم‌سازی پایدار (crc32) زیررشته‌های SHINGLE_SIZE نویسه‌ای متن؛ متن کوتاه‌تر یک زیررشته است"""
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    pieces = {text[start:start + SHINGLE_SIZE] for start in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    return np.fromiter((zlib.crc32(piece.encode()) for piece in pieces), dtype=np.uint64, count=len(pieces))
+
+
+def minhash(hashes):
+    """امضای MinHash (NUM_PERM مقدار ۳۲ بیتی) مجموعه درهم‌سازی‌ها؛ مجموعه خالی None"""
+    if not hashes.size:
+        return None
+    with np.errstate(over='ignore'):
+        values = (HASH_A[:, None] * hashes[None, :] + HASH_B[:, None]) >> np.uint64(32)
+    return values.min(axis=1).astype(np.uint32)
+
+
+def signature_of(title, description, location):
+    return minhash(shingles(document(title, description, location)))
+
+
+def band_keys(signatures):
+    """کلید سطل LSH هر باند برای ماتریس امضاها (n × NUM_PERM) ← ماتریس n × BANDS از اعداد ۶۴ بیتی"""
+    bands = signatures.astype(np.uint64).reshape(-1, BANDS, ROWS)
+    with np.errstate(over='ignore'):
+        keys = (bands * BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64) + BAND_SALTS
+    return keys.view(np.int64)
+
+
+def similarities(signature, others):
+    """شباهت تخمینی Jaccard یک امضا با هر سطر ماتریس امضاها (نسبت مقادیر برابر)"""
+    return (others == signature).mean(axis=1)
+
+
+def _decode(value):
+    return np.frombuffer(bytes(value), dtype=np.uint32)
+
+
+# ==================== نمایه ====================
+
+def _index_rows(incident_id, company_id, incident_date, signature):
+    row = IncidentSignature(
+        incident_id=incident_id, company_id=company_id, incident_date=incident_date, signature=signature.tobytes()
+    )
+    buckets = [
+        IncidentBucket(signature_id=incident_id, company_id=company_id, key=key, incident_date=incident_date)
+        for key in band_keys(signature[None, :])[0].tolist()
+    ]
+    return row, buckets
+
+
+def index(incidents):
+    """
+    افزودن یا به‌روزرسانی امضای حوادث ذخیره شده؛ incidents: نمونه‌های Incident
+    امضای بدون تغییر (مثلاً تغییر وضعیت) فقط با یک کوئری بررسی و رد می‌شود
+    """
+    incidents = [incident for incident in incidents if incident.pk]
+    if not incidents:
+        return
+
+    existing = {
+        pk: (bytes(signature), incident_date)
+        for pk, signature, incident_date in IncidentSignature.objects.filter(
+            pk__in=[incident.pk for incident in incidents]
+        ).values_list('pk', 'signature', 'incident_date')
+    }
+    stale, rows, buckets = [], [], []
+    for incident in incidents:
+        signature = signature_of(incident.title, incident.description, incident.location)
+        current = None if signature is None or not incident.incident_date else (signature.tobytes(), incident.incident_date)
+        if existing.get(incident.pk) == current:
+            continue
+        if incident.pk in existing:
+            stale.append(incident.pk)
+        if current is not None:
+            row, row_buckets = _index_rows(incident.pk, incident.company_id, incident.incident_date, signature)
+            rows.append(row)
+            buckets.extend(row_buckets)
+
+    if not stale and not rows:
+        return
+    with transaction.atomic():
+        IncidentSignature.objects.filter(pk__in=stale).delete()
+        IncidentSignature.objects.bulk_create(rows, batch_size=BULK_BATCH_SIZE)
+        IncidentBucket.objects.bulk_create(buckets, batch_size=BULK_BATCH_SIZE)
+
+
+def rebuild(company=None, chunk_size=2000):
+    """
+    ساخت دوباره امضای همه حوادث از روی جدول حوادث (برای داده‌های قبلی)
+    خروجی: تعداد حوادث نمایه شده
+    """
+    incidents = Incident.objects.all()
+    signatures = IncidentSignature.objects.all()
+    if company is not None:
+        incidents = incidents.filter(company=company)
+        signatures = signatures.filter(company=company)
+
+    count = 0
+    rows = incidents.order_by().values_list('id', 'company_id', 'incident_date', 'title', 'description', 'location')
+    with transaction.atomic():
+        signatures.delete()
+        batch, buckets = [], []
+        for incident_id, company_id, incident_date, title, description, location in rows.iterator(chunk_size=chunk_size):
+            signature = signature_of(title, description, location)
+            if signature is None or incident_date is None:
+                continue
+            row, row_buckets = _index_rows(incident_id, company_id, incident_date, signature)
+            batch.append(row)
+            buckets.extend(row_buckets)
+            if len(batch) >= chunk_size:
+                IncidentSignature.objects.bulk_create(batch, batch_size=BULK_BATCH_SIZE)
+                IncidentBucket.objects.bulk_create(buckets, batch_size=BULK_BATCH_SIZE)
+                count += len(batch)
+                batch, buckets = [], []
+        IncidentSignature.objects.bulk_create(batch, batch_size=BULK_BATCH_SIZE)
+        IncidentBucket.objects.bulk_create(buckets, batch_size=BULK_BATCH_SIZE)
+    return count + len(batch)
+
+
+# ==================== پیشنهاد هنگام ثبت ====================
+
+def parse_date(value):
+    """تاریخ وقوع از پارامتر درخواست (ISO)؛ مقدار خالی None"""
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise DuplicateError(f'تاریخ «{value}» نامعتبر است')
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def suggest(company, title, description='', location='', incident_date=None, limit=MAX_SUGGESTIONS):
+    """
+    حوادث شرکت با متن مشابه در بازه window_days روز اطراف تاریخ وقوع
+    نامزدها فقط از سطل‌های LSH مشترک با یک کوئری روی ایندکس خوانده می‌شوند (بدون مقایسه با همه حوادث)
+    خروجی: لیست Match به ترتیب شباهت
+    """
+    signature = signature_of(title, description, location)
+    if signature is None:
+        return []
+
+    center = incident_date or timezone.now()
+    window = timedelta(days=window_days())
+    candidates = dict(
+        IncidentBucket.objects.filter(
+            company=company,
+            key__in=band_keys(signature[None, :])[0].tolist(),
+            incident_date__range=(center - window, center + window),
+        ).values_list('signature_id', 'signature__signature')
+    )
+    if not candidates:
+        return []
+
+    ids = list(candidates)
+    scores = similarities(signature, np.stack([_decode(candidates[pk]) for pk in ids]))
+    ranked = [(ids[position], float(scores[position])) for position in np.argsort(-scores, kind='stable')[:limit]
+              if scores[position] >= threshold()]
+    if not ranked:
+        return []
+
+    incidents = Incident.objects.only('id', 'title', 'location', 'incident_date', 'status').in_bulk([pk for pk, _ in ranked])
+    return [Match(incidents[pk], round(score, 2)) for pk, score in ranked if pk in incidents]
+
+
+# ==================== خوشه‌بندی تاریخچه ====================
+
+def candidate_pairs(company_codes, seconds, keys, window):
+    """
+    جفت‌های نامزد: حوادث یک شرکت که در دست کم یک باند هم‌سطل‌اند و تاریخ وقوعشان حداکثر window ثانیه فاصله دارد
+    در هر باند سطرها بر اساس (شرکت، کلید، تاریخ) مرتب و هر سطر با سطرهای بعدی همان سطل مقایسه می‌شود
+    خروجی: آرایه n × 2 از شماره سطرها (i < j)
+    """
+    pairs = []
+    for band in range(keys.shape[1]):
+        order = np.lexsort((seconds, keys[:, band], company_codes))
+        same_company = company_codes[order]
+        same_key = keys[order, band]
+        dates = seconds[order]
+        for offset in range(1, MAX_NEIGHBOURS + 1):
+            if offset >= order.size:
+                break
+            valid = (
+                (same_company[offset:] == same_company[:-offset])
+                & (same_key[offset:] == same_key[:-offset])
+                & (dates[offset:] - dates[:-offset] <= window)
+            )
+            if not valid.any():
+                break
+            pairs.append(np.stack([order[:-offset][valid], order[offset:][valid]], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.concatenate(pairs)
+    return np.unique(np.sort(pairs, axis=1), axis=0)
+
+
+def cluster(company=None, min_similarity=None, dry_run=False):
+    """
+    گروه‌بندی گزارش‌های تکراری کل تاریخچه با امضاهای ذخیره شده
+    جفت‌های نامزد LSH با شباهت امضا تأیید می‌شوند و هر حادثه به قدیمی‌ترین گزارش مشابهی می‌پیوندد
+    که خودش تکرار گزارش دیگری نیست؛ به این ترتیب همه اعضای گروه به گزارش اول شبیه‌اند و گروه‌ها
+    با زنجیره شباهت‌های کوچک به هم وصل نمی‌شوند
+    شناسه گزارش اول هر گروه در فیلد cluster امضاهای گروه ذخیره می‌شود
+    خروجی: لیست گروه‌ها (لیست شناسه حوادث، قدیمی‌ترین اول) به ترتیب اندازه
+    """
+    min_similarity = threshold() if min_similarity is None else min_similarity
+    signatures = IncidentSignature.objects.all()
+    if company is not None:
+        signatures = signatures.filter(company=company)
+
+    ids, companies, seconds, values = [], [], [], []
+    rows = signatures.order_by('incident_date', 'pk').values_list('pk', 'company_id', 'incident_date', 'signature')
+    for pk, company_id, incident_date, signature in rows.iterator(chunk_size=BULK_BATCH_SIZE):
+        ids.append(pk)
+        companies.append(company_id)
+        seconds.append(incident_date.timestamp())
+        values.append(bytes(signature))
+
+    groups = []
+    if ids:
+        matrix = np.frombuffer(b''.join(values), dtype=np.uint32).reshape(len(ids), NUM_PERM)
+        _, company_codes = np.unique(np.array([str(company_id) for company_id in companies]), return_inverse=True)
+        pairs = candidate_pairs(
+            company_codes.reshape(-1), np.array(seconds), band_keys(matrix), timedelta(days=window_days()).total_seconds()
+        )
+        scores = (matrix[pairs[:, 0]] == matrix[pairs[:, 1]]).mean(axis=1) if pairs.size else np.empty(0)
+
+        # سطرها به ترتیب تاریخ‌اند؛ جفت‌ها به ترتیب (حادثه بعدی، حادثه قبلی) پیمایش می‌شوند تا وضعیت
+        # حادثه قبلی هنگام بررسی حادثه بعدی قطعی باشد
+        verified = pairs[scores >= min_similarity]
+        verified = verified[np.lexsort((verified[:, 0], verified[:, 1]))] if verified.size else verified
+        root = list(range(len(ids)))
+        for first, second in verified.tolist():
+            if root[second] == second and root[first] == first:
+                root[second] = first
+
+        members = {}
+        for position in range(len(ids)):
+            members.setdefault(root[position], []).append(position)
+        groups = sorted(
+            ([ids[position] for position in positions] for positions in members.values() if len(positions) > 1),
+            key=len, reverse=True
+        )
+
+    if dry_run:
+        return groups
+
+    updates = [
+        IncidentSignature(pk=pk, cluster=group[0])
+        for group in groups
+        for pk in group
+    ]
+    with transaction.atomic():
+        signatures.exclude(cluster=None).update(cluster=None)
+        IncidentSignature.objects.bulk_update(updates, ['cluster'], batch_size=BULK_BATCH_SIZE)
+    return groups
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import Notification, Task
+
+
+# وظایفی که هنوز باز هستند
+OPEN_STATUSES = ['PENDING', 'IN_PROGRESS']
+
+BULK_BATCH_SIZE = 1000
+
+LEVEL_TITLES = {
+    1: '⏰ وظیفه معوق',
+    3: '⚠️ تأخیر در انجام وظیفه',
+    7: '🚨 تأخیر جدی در انجام وظیفه',
+}
+
+
+def escalation_levels():
+    """سطوح تشدید بر حسب تعداد روز گذشته از سررسید"""
+    return sorted(getattr(settings, 'HSE_TASK_ESCALATION_LEVELS', (1, 3, 7)))
+
+
+def _level_title(level):
+    return LEVEL_TITLES.get(level, f'⚠️ وظیفه {level} روز معوق')
+
+
+def pending_escalation(level, today, next_level=None):
+    """
+    وظایف بازی که امروز در این سطح هستند (سررسید در بازه (today - next_level, today - level])
+    و برای سررسید فعلی‌شان هنوز به این سطح اعلان نشده‌اند؛ وظایفی که معوق ساخته شده‌اند، سررسیدشان
+    عقب رفته یا دوباره باز شده‌اند هم بدون وابستگی به زمان اجرای قبلی پیدا می‌شوند.
+    کوئری روی نمایه (status, due_date) به صورت بازه خوانده می‌شود
+    """
+    tasks = Task.objects.filter(status__in=OPEN_STATUSES, due_date__lte=today - timedelta(days=level))
+    if next_level is not None:
+        tasks = tasks.filter(due_date__gt=today - timedelta(days=next_level))
+    return (
+        tasks
+        .filter(
+            Q(escalation_level__lt=level)
+            | Q(escalated_due_date__isnull=True)
+            | ~Q(escalated_due_date=F('due_date'))
+        )
+        .order_by()
+        .values_list(
+            'id', 'title', 'due_date', 'company__name',
+            'assigned_to__user_id', 'department__manager_id'
+        )
+    )
+
+
+def build_notifications(level, rows):
+    """یک اعلان برای مسئول و یک اعلان برای مدیر بخش هر وظیفه (بدون تکرار برای یک کاربر)"""
+    title = _level_title(level)
+    for task_id, task_title, due_date, company_name, assignee_id, manager_id in rows:
+        recipients = []
+        if assignee_id:
+            recipients.append((assignee_id, f'وظیفه «{task_title}» در شرکت {company_name} از تاریخ {due_date} سررسید شده و هنوز انجام نشده است.'))
+        if manager_id and manager_id != assignee_id:
+            recipients.append((manager_id, f'وظیفه «{task_title}» در بخش شما ({company_name}) {level} روز از سررسید گذشته و هنوز باز است.'))
+
+        for user_id, message in recipients:
+            yield Notification(
+                user_id=user_id,
+                title=title,
+                message=message,
+                notification_type='WARNING',
+                related_object_id=task_id,
+                related_object_type='task'
+            )
+
+
+def escalate_overdue_tasks(today=None, dry_run=False):
+    """
+    اعلان تشدید وظایف معوق
+    سطح اعلان شده برای هر وظیفه روی خود وظیفه نگهداری می‌شود؛ هر وظیفه فقط برای بالاترین سطحی
+    که به آن رسیده و هنوز اعلان نشده یک بار اعلان می‌گیرد و اجرای مجدد در همان روز اعلانی ندارد
+    خروجی: {سطح: (تعداد وظایف، تعداد اعلان‌ها)}
+    """
+    today = today or timezone.localdate()
+    levels = escalation_levels()
+
+    result = {}
+    for level, next_level in zip(levels, levels[1:] + [None]):
+        rows = list(pending_escalation(level, today, next_level))
+        notifications = list(build_notifications(level, rows))
+        result[level] = (len(rows), len(notifications))
+        if dry_run or not rows:
+            continue
+
+        # اعلان‌ها و سطح وظایف با هم ثبت می‌شوند تا اجرای ناقص تکرار یا جا انداختن نداشته باشد
+        # (فیلدهای تشدید جزو ستون‌های همگام‌سازی نیستند و updated_at تغییر نمی‌کند)
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=BULK_BATCH_SIZE)
+            task_ids = [row[0] for row in rows]
+            for start in range(0, len(task_ids), BULK_BATCH_SIZE):
+                Task.objects.filter(id__in=task_ids[start:start + BULK_BATCH_SIZE]).update(
+                    escalation_level=level, escalated_due_date=F('due_date')
+                )
+    return result
@@ -0,0 +1,298 @@
+import csv
+import re
+import uuid
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from ..models import Incident, Inspection, Task, Training, TrainingParticipation
+
+
+# تعداد ردیف‌هایی که در هر رفت‌وبرگشت از دیتابیس خوانده می‌شود
+EXPORT_CHUNK_SIZE = 2000
+
+# تعداد ردیف‌هایی که قبل از ارسال به کلاینت در حافظه جمع می‌شود
+FLUSH_ROWS = 500
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# کاراکترهای کنترلی که در XML مجاز نیستند
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# متنی که با این کاراکترها شروع شود در اکسل به عنوان فرمول اجرا می‌شود
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+# ستون‌های خروجی هر مدل: (lookup در values، عنوان ستون، choices برای نمایش)
+INCIDENT_COLUMNS = [
+    ('id', 'شناسه', None),
+    ('title', 'عنوان حادثه', None),
+    ('incident_type', 'نوع حادثه', dict(Incident.INCIDENT_TYPE_CHOICES)),
+    ('severity_level', 'سطح حادثه', dict(Incident.SEVERITY_CHOICES)),
+    ('status', 'وضعیت', dict(Incident.STATUS_CHOICES)),
+    ('department__name', 'بخش', None),
+    ('reporter__user__mobileNumber', 'گزارش دهنده', None),
+    ('incident_date', 'تاریخ وقوع', None),
+    ('location', 'محل وقوع', None),
+    ('created_at', 'تاریخ ثبت', None),
+]
+
+INSPECTION_COLUMNS = [
+    ('id', 'شناسه', None),
+    ('title', 'عنوان بازرسی', None),
+    ('priority', 'اولویت', dict(Inspection.PRIORITY_CHOICES)),
+    ('status', 'وضعیت', dict(Inspection.STATUS_CHOICES)),
+    ('department__name', 'بخش', None),
+    ('assigned_to__user__mobileNumber', 'واگذار شده به', None),
+    ('scheduled_date', 'تاریخ برنامه‌ریزی', None),
+    ('completed_date', 'تاریخ تکمیل', None),
+    ('created_at', 'تاریخ ایجاد', None),
+]
+
+TASK_COLUMNS = [
+    ('id', 'شناسه', None),
+    ('title', 'عنوان وظیفه', None),
+    ('priority', 'اولویت', dict(Task.PRIORITY_CHOICES)),
+    ('status', 'وضعیت', dict(Task.STATUS_CHOICES)),
+    ('department__name', 'بخش', None),
+    ('assigned_to__user__mobileNumber', 'مسئول', None),
+    ('due_date', 'تاریخ سررسید', None),
+    ('completed_date', 'تاریخ تکمیل', None),
+    ('related_inspection__title', 'بازرسی مرتبط', None),
+    ('related_incident__title', 'حادثه مرتبط', None),
+    ('created_at', 'تاریخ ثبت', None),
+]
+
+TRAINING_COLUMNS = [
+    ('id', 'شناسه', None),
+    ('title', 'عنوان آموزش', None),
+    ('training_type', 'نوع آموزش', dict(Training.TRAINING_TYPE_CHOICES)),
+    ('level', 'سطح آموزش', dict(Training.LEVEL_CHOICES)),
+    ('status', 'وضعیت', dict(Training.STATUS_CHOICES)),
+    ('department__name', 'بخش', None),
+    ('instructor__user__mobileNumber', 'مدرس', None),
+    ('duration_minutes', 'مدت زمان (دقیقه)', None),
+    ('scheduled_date', 'تاریخ برگزاری', None),
+    ('completion_date', 'تاریخ تکمیل', None),
+]
+
+TRAINING_PARTICIPATION_COLUMNS = [
+    ('training__title', 'عنوان آموزش', None),
+    ('training__training_type', 'نوع آموزش', dict(Training.TRAINING_TYPE_CHOICES)),
+    ('participant__user__mobileNumber', 'شماره موبایل', None),
+    ('participant__user__name', 'نام', None),
+    ('participant__user__family', 'نام خانوادگی', None),
+    ('participant__department__name', 'بخش', None),
+    ('attendance_status', 'وضعیت حضور', dict(TrainingParticipation.ATTENDANCE_CHOICES)),
+    ('test_score', 'نمره آزمون', None),
+    ('participant_rating', 'امتیاز شرکت‌کننده', None),
+    ('certificate_issued', 'صدور گواهی', None),
+    ('certificate_issue_date', 'تاریخ صدور گواهی', None),
+    ('registered_at', 'تاریخ ثبت‌نام', None),
+    ('attended_at', 'تاریخ حضور', None),
+]
+
+
+def format_value(value, choices=None):
+    """تبدیل مقدار خام دیتابیس به مقدار قابل نمایش در فایل خروجی"""
+    if value is None:
+        return ''
+    if choices:
+        return choices.get(value, value)
+    if isinstance(value, bool):
+        return 'بله' if value else 'خیر'
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def iter_rows(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    خواندن ردیف‌ها به صورت تکه‌تکه با values_list
+    فقط ستون‌های لازم از دیتابیس خوانده می‌شود و هیچ شیء مدلی ساخته نمی‌شود
+    """
+    lookups = [column[0] for column in columns]
+    choices = [column[2] for column in columns]
+    for record in queryset.values_list(*lookups).iterator(chunk_size=chunk_size):
+        yield [format_value(value, choice) for value, choice in zip(record, choices)]
+
+
+def safe_cell(value):
+    """خنثی کردن فرمول در متن کاربر (CSV/Formula injection) با افزودن ' به ابتدای آن"""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """شیء شبه فایل برای csv.writer که خروجی را بدون بافر برمی‌گرداند"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(headers, rows):
+    """تولید تدریجی فایل CSV (با BOM برای نمایش درست فارسی در اکسل)"""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(headers)
+
+    pending = []
+    for row in rows:
+        pending.append(writer.writerow([safe_cell(value) for value in row]))
+        if len(pending) >= FLUSH_ROWS:
+            yield ''.join(pending)
+            pending = []
+    if pending:
+        yield ''.join(pending)
+
+
+class _StreamBuffer:
+    """
+    بافر فقط‌نوشتنی برای zipfile
+    چون tell ندارد، zipfile آن را غیرقابل seek در نظر می‌گیرد و
+    هدرها را به صورت data descriptor می‌نویسد؛ پس می‌توان خروجی را تکه‌تکه فرستاد
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_XLSX_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0" rightToLeft="1"/></sheetViews>'
+    '<sheetData>'
+)
+
+_XLSX_SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c t="n"><v>{value}</v></c>'
+    text = _ILLEGAL_XML_CHARS.sub('', str(safe_cell(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(index, values):
+    cells = ''.join(_xlsx_cell(value) for value in values)
+    return f'<row r="{index}">{cells}</row>'
+
+
+def iter_xlsx(headers, rows, sheet_name='Sheet1'):
+    """
+    تولید تدریجی فایل XLSX
+    شیت مستقیماً داخل یک zip استریمی نوشته می‌شود و بعد از هر دسته ردیف،
+    بایت‌های فشرده‌شده به کلاینت ارسال می‌شود؛ مصرف حافظه به تعداد ردیف‌ها وابسته نیست
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=escape(sheet_name)))
+        archive.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_XLSX_SHEET_HEADER + _xlsx_row(1, headers)).encode('utf-8'))
+
+            pending = []
+            for index, row in enumerate(rows, start=2):
+                pending.append(_xlsx_row(index, row))
+                if len(pending) >= FLUSH_ROWS:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            if pending:
+                sheet.write(''.join(pending).encode('utf-8'))
+            sheet.write(_XLSX_SHEET_FOOTER.encode('utf-8'))
+
+    yield buffer.drain()
+
+
+def export_response(queryset, columns, filename, file_format='csv', sheet_name='Sheet1'):
+    """
+    ساخت پاسخ استریمی برای خروجی CSV یا XLSX
+    queryset باید از قبل فیلتر و مرتب شده باشد
+    """
+    headers = [column[1] for column in columns]
+    return stream_response(headers, iter_rows(queryset, columns), filename, file_format, sheet_name)
+
+
+def stream_response(headers, rows, filename, file_format='csv', sheet_name='Sheet1'):
+    """پاسخ استریمی CSV یا XLSX برای ردیف‌های آماده (غیر از queryset)"""
+    if file_format == 'xlsx':
+        stream = iter_xlsx(headers, rows, sheet_name=sheet_name)
+        content_type = XLSX_CONTENT_TYPE
+    else:
+        file_format = 'csv'
+        stream = iter_csv(headers, rows)
+        content_type = CSV_CONTENT_TYPE
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    response['Cache-Control'] = 'no-store'
+    return response
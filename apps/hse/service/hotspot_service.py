@@ -0,0 +1,268 @@
+import contextvars
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.user.validators.mobile_validator import PERSIAN_DIGITS
+from ..models import Incident, LocationSketch
+
+
+DEFAULT_WINDOW_DAYS = 90
+MAX_WINDOW_DAYS = 3 * 365
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# یکسان‌سازی نویسه‌های عربی و صورت‌های مختلف حروف فارسی
+ARABIC_LETTERS = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی', 'ك': 'ک', 'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ؤ': 'و',
+    '\u200c': ' ', '\u200d': '', '\u0640': '',
+})
+DIACRITICS = re.compile('[\u064b-\u065f\u0670]')
+NON_WORD = re.compile(r'[^\w]+')
+NUMBER = re.compile(r'\d+')
+
+MAX_KEY_LENGTH = 200
+
+# حذف‌های گروهی (بایگانی حوادث) در پایان دسته با یک قفل برای هر (شرکت، روز) اعمال می‌شوند
+_pending = contextvars.ContextVar('hse_hotspot_pending', default=None)
+
+
+class HotspotError(Exception):
+    """خطای پارامترهای کانون‌های حادثه"""
+
+
+def capacity():
+    """حداکثر تعداد محل‌های نگهداری شده در خلاصه هر روز"""
+    return getattr(settings, 'HSE_HOTSPOT_CAPACITY', 50)
+
+
+def normalize_text(value):
+    """
+    یکسان‌سازی متن آزاد فارسی: حروف عربی، اعراب، نیم‌فاصله، ارقام فارسی، صفرهای ابتدای اعداد،
+    علائم و فاصله‌ها یکسان می‌شوند
+    """
+    if not value:
+        return ''
+    text = DIACRITICS.sub('', str(value).translate(ARABIC_LETTERS).translate(PERSIAN_DIGITS))
+    text = NON_WORD.sub(' ', text.lower()).replace('_', ' ')
+    text = NUMBER.sub(lambda match: f' {int(match.group())} ', text)
+    return ' '.join(text.split())
+
+
+def normalize_location(value):
+    """
+    کلید یکسان برای متن آزاد محل وقوع
+    مثلاً «انبار  شماره ۰۳» و «انبار‌شماره3» هر دو «انبار شماره 3» می‌شوند
+    """
+    return normalize_text(value)[:MAX_KEY_LENGTH]
+
+
+def day_of(value):
+    return timezone.localtime(value, timezone.get_default_timezone()).date()
+
+
+def add_occurrence(counters, key, label, size):
+    """
+    به‌روزرسانی Space-Saving: کلید موجود یک واحد افزایش می‌یابد؛ اگر جا نباشد کلید با کمترین
+    شمارنده جایگزین می‌شود و شمارنده آن (به عنوان حداکثر خطا) به کلید جدید به ارث می‌رسد
+    خروجی: شمارنده کلید بیرون رانده شده (برای floor خلاصه) یا 0
+    """
+    if key in counters:
+        counters[key][0] += 1
+    elif len(counters) < size:
+        counters[key] = [1, 0, label]
+    else:
+        smallest = min(counters, key=lambda item: counters[item][0])
+        count = counters.pop(smallest)[0]
+        counters[key] = [count + 1, count, label]
+        return count
+    return 0
+
+
+def remove_occurrence(counters, key):
+    """
+    کاهش شمارنده کلید برای حادثه حذف یا بایگانی شده؛ count همچنان حد بالا و count - error حد پایین است
+    کلیدی که در خلاصه نیست شمارنده‌ای برای کاهش ندارد و floor خلاصه حد بالای آن باقی می‌ماند
+    (ممکن است تا بازسازی بیش از مقدار واقعی باشد اما هرگز کمتر نیست)
+    """
+    item = counters.get(key)
+    if item is None:
+        return
+    item[0] -= 1
+    item[1] = min(item[1], item[0])
+    if item[0] <= 0:
+        del counters[key]
+
+
+def _occurrences(incidents):
+    """گروه‌بندی (company_id, incident_date, location) به {(company_id, روز): [(کلید، متن)]}"""
+    groups = defaultdict(list)
+    for company_id, incident_date, location in incidents:
+        key = normalize_location(location)
+        if key and incident_date:
+            groups[(company_id, day_of(incident_date))].append((key, location.strip()))
+    return groups
+
+
+def record(incidents):
+    """
+    افزودن حوادث تازه ایجاد شده به خلاصه روزانه؛ incidents: نمونه‌های Incident
+    برای هر (شرکت، روز) یک ردیف قفل و به‌روز می‌شود
+    """
+    groups = _occurrences(
+        (incident.company_id, incident.incident_date, incident.location) for incident in incidents
+    )
+    size = capacity()
+    for (company_id, day), occurrences in groups.items():
+        with transaction.atomic():
+            sketch, _ = LocationSketch.objects.select_for_update().get_or_create(company_id=company_id, day=day)
+            for key, label in occurrences:
+                sketch.floor = max(sketch.floor, add_occurrence(sketch.counters, key, label, size))
+            sketch.total += len(occurrences)
+            sketch.save(update_fields=['counters', 'total', 'floor', 'updated_at'])
+
+
+def _apply_removals(groups):
+    for (company_id, day), occurrences in groups.items():
+        with transaction.atomic():
+            sketch = LocationSketch.objects.select_for_update().filter(company_id=company_id, day=day).first()
+            if sketch is None:
+                continue
+            for key, _ in occurrences:
+                remove_occurrence(sketch.counters, key)
+            sketch.total = max(0, sketch.total - len(occurrences))
+            sketch.save(update_fields=['counters', 'total', 'updated_at'])
+
+
+def remove(incidents):
+    """
+    کم کردن حوادث حذف یا بایگانی شده از خلاصه روزانه؛ incidents: نمونه‌های Incident
+    نمونه‌ای که محل یا تاریخ آن بارگذاری نشده نادیده گرفته می‌شود
+    """
+    groups = _occurrences(
+        (incident.company_id, incident.incident_date, incident.location)
+        for incident in incidents
+        if 'location' in incident.__dict__ and 'incident_date' in incident.__dict__
+    )
+    if not groups:
+        return
+    pending = _pending.get()
+    if pending is not None:
+        for group, occurrences in groups.items():
+            pending[group].extend(occurrences)
+        return
+    _apply_removals(groups)
+
+
+@contextmanager
+def deferred():
+    """جمع کردن حذف‌های داخل بلوک و اعمال همه آن‌ها در پایان (مانند rollup_service.deferred)"""
+    token = _pending.set(defaultdict(list))
+    try:
+        yield
+    except BaseException:
+        _pending.reset(token)
+        raise
+    pending = _pending.get()
+    _pending.reset(token)
+    _apply_removals(pending)
+
+
+def rebuild(company=None, chunk_size=2000):
+    """
+    ساخت دوباره خلاصه‌ها از روی جدول حوادث (برای داده‌های قبلی یا پس از ویرایش محل‌ها)
+    خروجی: تعداد روزهای ساخته شده
+    """
+    incidents = Incident.objects.exclude(location='')
+    sketches = LocationSketch.objects.all()
+    if company is not None:
+        incidents = incidents.filter(company=company)
+        sketches = sketches.filter(company=company)
+
+    size = capacity()
+    built = {}
+    rows = incidents.order_by('incident_date').values_list('company_id', 'incident_date', 'location')
+    for (company_id, day), occurrences in _occurrences(rows.iterator(chunk_size=chunk_size)).items():
+        sketch = built.setdefault((company_id, day), LocationSketch(company_id=company_id, day=day, counters={}))
+        for key, label in occurrences:
+            sketch.floor = max(sketch.floor, add_occurrence(sketch.counters, key, label, size))
+        sketch.total += len(occurrences)
+
+    with transaction.atomic():
+        sketches.delete()
+        LocationSketch.objects.bulk_create(built.values(), batch_size=500)
+    return len(built)
+
+
+# ==================== پرس‌وجو ====================
+
+def _parse_day(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HotspotError(f'تاریخ «{value}» نامعتبر است (قالب: YYYY-MM-DD)')
+
+
+def parse_window(params, today=None):
+    """بازه از پارامترهای from و to (شامل هر دو روز)؛ پیش‌فرض DEFAULT_WINDOW_DAYS روز اخیر"""
+    end = _parse_day(params['to']) if params.get('to') else (today or timezone.localdate())
+    start = _parse_day(params['from']) if params.get('from') else end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    if start > end:
+        raise HotspotError('تاریخ شروع بعد از تاریخ پایان است')
+    if (end - start).days >= MAX_WINDOW_DAYS:
+        raise HotspotError(f'بازه حداکثر {MAX_WINDOW_DAYS} روز است')
+    return start, end
+
+
+def limit_value(value):
+    if value in (None, ''):
+        return DEFAULT_LIMIT
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HotspotError('تعداد نامعتبر است')
+    return max(1, min(value, MAX_LIMIT))
+
+
+def hotspots(company, start, end, limit=DEFAULT_LIMIT):
+    """
+    پرتکرارترین محل‌های حادثه در بازه [start, end] از ادغام خلاصه‌های روزانه
+    هزینه به تعداد روزهای بازه بستگی دارد نه تعداد حوادث
+    count حد بالای تعداد و error حداکثر خطای آن است (count - error حد پایین تضمین شده)
+    """
+    merged = {}
+    missing = []
+    total = 0
+    sketches = LocationSketch.objects.filter(company=company, day__range=(start, end)).values_list(
+        'counters', 'total', 'floor'
+    )
+    for counters, day_total, floor in sketches:
+        total += day_total
+        # کلیدی که در خلاصه یک روز نیست ممکن است تا floor آن روز رخ داده باشد
+        missing.append((floor, counters))
+        for key, (count, error, label) in counters.items():
+            item = merged.setdefault(key, [0, 0, label])
+            item[0] += count
+            item[1] += error
+
+    for floor, counters in missing:
+        if floor:
+            for key, item in merged.items():
+                if key not in counters:
+                    item[0] += floor
+                    item[1] += floor
+
+    ranked = sorted(merged.items(), key=lambda pair: (-pair[1][0], pair[1][1], pair[0]))[:limit]
+    return {
+        'total': total,
+        'hotspots': [
+            {'key': key, 'location': label, 'count': count, 'error': error}
+            for key, (count, error, label) in ranked
+        ],
+    }
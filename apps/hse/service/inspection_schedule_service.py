@@ -0,0 +1,277 @@
+import calendar
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Inspection, InspectionSchedule
+from . import audit_service
+
+
+BULK_BATCH_SIZE = 1000
+
+# تغییر این فیلدها رخدادهای آینده برنامه را عوض می‌کند
+RULE_FIELDS = ['frequency', 'interval', 'weekdays', 'start_date', 'end_date', 'is_active']
+
+# فیلدهایی که در بازرسی‌های ساخته شده آینده هم به‌روزرسانی می‌شوند
+COPIED_FIELDS = ['title', 'description', 'priority', 'department', 'assigned_to', 'checklist']
+
+
+def horizon_days():
+    """تعداد روزهای آینده که بازرسی‌های آن در جدول ساخته می‌شوند"""
+    return getattr(settings, 'HSE_INSPECTION_SCHEDULE_HORIZON_DAYS', 30)
+
+
+def _add_months(value, months, day):
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(schedule, start, end):
+    """
+    تاریخ‌های رخداد برنامه در بازه [start, end]
+    اولین رخداد بازه به صورت محاسباتی پیدا می‌شود و تاریخچه از start_date پیمایش نمی‌شود
+    """
+    if schedule.end_date:
+        end = min(end, schedule.end_date)
+    start = max(start, schedule.start_date)
+    if start > end:
+        return
+
+    interval = max(1, schedule.interval or 1)
+    origin = schedule.start_date
+
+    if schedule.frequency in ('DAILY', 'WEEKLY'):
+        step = interval * (7 if schedule.frequency == 'WEEKLY' else 1)
+        skipped = -(-(start - origin).days // step)
+        current = origin + timedelta(days=skipped * step)
+        while current <= end:
+            yield current
+            current += timedelta(days=step)
+
+    elif schedule.frequency == 'MONTHLY':
+        months = (start.year - origin.year) * 12 + start.month - origin.month
+        index = max(0, months // interval)
+        while True:
+            current = _add_months(origin, index * interval, origin.day)
+            if current > end:
+                break
+            if current >= start:
+                yield current
+            index += 1
+
+    elif schedule.frequency == 'CUSTOM':
+        weekdays = schedule.weekday_list
+        if not weekdays:
+            return
+        # هفته‌ها از دوشنبه هفته شروع برنامه شمرده می‌شوند و هر interval هفته یک بار تکرار می‌شوند
+        anchor = origin - timedelta(days=origin.weekday())
+        week = (start - anchor).days // 7
+        week += -week % interval
+        while True:
+            week_start = anchor + timedelta(weeks=week)
+            if week_start > end:
+                break
+            for weekday in weekdays:
+                current = week_start + timedelta(days=weekday)
+                if current > end:
+                    break
+                if current >= start:
+                    yield current
+            week += interval
+
+
+def _occurrence(schedule, scheduled_date):
+    return Inspection(
+        company_id=schedule.company_id,
+        title=schedule.title,
+        description=schedule.description,
+        priority=schedule.priority,
+        department_id=schedule.department_id,
+        assigned_to_id=schedule.assigned_to_id,
+        checklist_id=schedule.checklist_id,
+        created_by_id=schedule.created_by_id,
+        scheduled_date=scheduled_date,
+        schedule=schedule,
+        status=Inspection.DRAFT,
+    )
+
+
+def _insert_occurrences(buffer):
+    """
+    درج دسته‌ای بازرسی‌ها با ignore_conflicts روی یکتایی برنامه و تاریخ
+    شناسه‌ها (uuid) پیش از درج ساخته می‌شوند، پس ردیف‌هایی که واقعاً درج شده‌اند با یک کوئری
+    روی همان شناسه‌ها مشخص می‌شوند؛ خروجی: لیست بازرسی‌های درج شده
+    """
+    Inspection.objects.bulk_create(buffer, ignore_conflicts=True)
+    inserted = set(
+        Inspection.objects.filter(id__in=[inspection.id for inspection in buffer]).values_list('id', flat=True)
+    )
+    inserted = [inspection for inspection in buffer if inspection.id in inserted]
+    # bulk_create سیگنال ندارد؛ دسته می‌تواند شامل برنامه‌های چند شرکت باشد
+    audit_service.record_bulk_create(None, Inspection, inserted)
+    return inserted
+
+
+def materialize(schedules, today=None, days=None):
+    """
+    ساخت بازرسی‌های برنامه‌ها از generated_until تا افق today + days
+    بازرسی‌ها با bulk_create دسته‌ای (ignore_conflicts روی یکتایی برنامه و تاریخ) و
+    generated_until برنامه‌ها با یک bulk_update ذخیره می‌شود
+    خروجی: تعداد بازرسی‌هایی که واقعاً ساخته شده‌اند (بدون تاریخ‌های تکراری رد شده)
+    """
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=horizon_days() if days is None else days)
+
+    created = 0
+    buffer = []
+    updated = []
+    for schedule in schedules:
+        begin = today
+        if schedule.generated_until and schedule.generated_until >= today:
+            begin = schedule.generated_until + timedelta(days=1)
+
+        for scheduled_date in occurrences(schedule, begin, horizon):
+            buffer.append(_occurrence(schedule, scheduled_date))
+            if len(buffer) >= BULK_BATCH_SIZE:
+                created += len(_insert_occurrences(buffer))
+                buffer = []
+
+        schedule.generated_until = horizon
+        updated.append(schedule)
+
+    if buffer:
+        created += len(_insert_occurrences(buffer))
+    InspectionSchedule.objects.bulk_update(updated, ['generated_until'], batch_size=BULK_BATCH_SIZE)
+    return created
+
+
+def generate_due(today=None, days=None, batch_size=500):
+    """
+    اجرای دوره‌ای: تمدید افق همه برنامه‌های فعالی که generated_until آن‌ها از افق عقب‌تر است
+    خروجی: (تعداد برنامه‌ها، تعداد بازرسی‌های ساخته شده)
+    """
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=horizon_days() if days is None else days)
+
+    schedules = (
+        InspectionSchedule.objects
+        .filter(is_active=True)
+        .filter(Q(generated_until__isnull=True) | Q(generated_until__lt=horizon))
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=today))
+        .order_by()
+    )
+
+    count = 0
+    created = 0
+    batch = []
+    for schedule in schedules.iterator(chunk_size=batch_size):
+        batch.append(schedule)
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                created += materialize(batch, today, days)
+            count += len(batch)
+            batch = []
+    if batch:
+        with transaction.atomic():
+            created += materialize(batch, today, days)
+        count += len(batch)
+    return count, created
+
+
+def future_occurrences(schedule, today=None):
+    """بازرسی‌های آینده برنامه که هنوز شروع نشده‌اند"""
+    today = today or timezone.localdate()
+    return Inspection.objects.filter(schedule=schedule, scheduled_date__gte=today, status=Inspection.DRAFT)
+
+
+@transaction.atomic
+def apply_changes(schedule, changed_fields, today=None):
+    """
+    اعمال ویرایش برنامه روی بازرسی‌های آینده
+    تغییر قاعده تکرار: حذف بازرسی‌های شروع نشده آینده و ساخت دوباره تا افق
+    تغییر سایر فیلدها: یک update روی همان بازرسی‌ها
+    """
+    today = today or timezone.localdate()
+    if set(changed_fields) & set(RULE_FIELDS):
+        future_occurrences(schedule, today).delete()
+        schedule.generated_until = today - timedelta(days=1)
+        schedule.save(update_fields=['generated_until', 'updated_at'])
+        if schedule.is_active:
+            materialize([schedule], today)
+        return
+
+    copied = [
+        (Inspection._meta.get_field(field), InspectionSchedule._meta.get_field(field).attname)
+        for field in COPIED_FIELDS if field in changed_fields
+    ]
+    if copied:
+        values = {field.attname: getattr(schedule, attname) for field, attname in copied}
+        inspections = future_occurrences(schedule, today)
+        # update() سیگنال ندارد؛ تاریخچه از مقادیر قبلی همان بازرسی‌ها ساخته می‌شود
+        rows = [
+            (row['id'], {
+                field.name: [audit_service.plain_value(row[field.attname]), audit_service.plain_value(values[field.attname])]
+                for field, _ in copied
+                if row[field.attname] != values[field.attname]
+            })
+            for row in inspections.select_for_update().values('id', *values)
+        ]
+        # update() فیلد auto_now را مقداردهی نمی‌کند؛ بدون آن تغییر به کلاینت‌های همگام‌سازی نمی‌رسد
+        Inspection.objects.filter(id__in=[object_id for object_id, _ in rows]).update(
+            updated_at=timezone.now(), **values
+        )
+        audit_service.record_bulk(schedule.company_id, Inspection, rows)
+
+
+def calendar_events(company, start, end, today=None):
+    """
+    رویدادهای تقویم بازرسی در بازه [start, end]
+    بازرسی‌های موجود با یک کوئری و رخدادهای بعد از افق هر برنامه به صورت محاسبه‌ای
+    (virtual) اضافه می‌شوند بدون اینکه ردیفی در جدول ساخته شود
+    """
+    today = today or timezone.localdate()
+    events = [
+        {
+            'id': str(inspection_id),
+            'date': scheduled_date,
+            'title': title,
+            'status': status,
+            'priority': priority,
+            'schedule_id': str(schedule_id) if schedule_id else None,
+            'virtual': False,
+        }
+        for inspection_id, scheduled_date, title, status, priority, schedule_id in (
+            Inspection.objects
+            .filter(company=company, scheduled_date__gte=start, scheduled_date__lte=end)
+            .order_by('scheduled_date')
+            .values_list('id', 'scheduled_date', 'title', 'status', 'priority', 'schedule_id')
+        )
+    ]
+
+    schedules = (
+        InspectionSchedule.objects
+        .filter(company=company, is_active=True, start_date__lte=end)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=start))
+    )
+    for schedule in schedules:
+        begin = max(start, today)
+        if schedule.generated_until and schedule.generated_until >= begin:
+            begin = schedule.generated_until + timedelta(days=1)
+        for scheduled_date in occurrences(schedule, begin, end):
+            events.append({
+                'id': None,
+                'date': scheduled_date,
+                'title': schedule.title,
+                'status': Inspection.DRAFT,
+                'priority': schedule.priority,
+                'schedule_id': str(schedule.id),
+                'virtual': True,
+            })
+
+    events.sort(key=lambda event: event['date'])
+    return events
@@ -0,0 +1,190 @@
+import csv
+import re
+import uuid
+import zipfile
+from datetime import timedelta
+from xml.etree.ElementTree import ParseError
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.user.model.user import CustomUser
+from apps.user.validators.mobile_validator import normalize_iranian_mobile
+from ..models import CompanyMember, Invitation, Notification
+from . import audit_service
+from .import_service import ImportFileError, read_rows
+
+
+# حداکثر تعداد شماره در هر درخواست دعوت گروهی
+MAX_BULK_INVITATIONS = 1000
+
+INVITATION_EXPIRE_DAYS = 7
+
+# نتیجه دعوت برای هر شماره
+OUTCOME_INVITED = 'INVITED'
+OUTCOME_SAVED = 'SAVED'
+OUTCOME_ALREADY_PENDING = 'ALREADY_PENDING'
+OUTCOME_ALREADY_MEMBER = 'ALREADY_MEMBER'
+OUTCOME_DUPLICATE = 'DUPLICATE'
+OUTCOME_INVALID = 'INVALID'
+
+OUTCOME_LABELS = {
+    OUTCOME_INVITED: 'دعوت ارسال شد',
+    OUTCOME_SAVED: 'دعوت ذخیره شد (کاربر هنوز ثبت‌نام نکرده)',
+    OUTCOME_ALREADY_PENDING: 'دعوت‌نامه قبلی در انتظار است',
+    OUTCOME_ALREADY_MEMBER: 'قبلاً عضو شرکت است',
+    OUTCOME_DUPLICATE: 'شماره تکراری در لیست',
+    OUTCOME_INVALID: 'شماره موبایل نامعتبر',
+}
+
+_SEPARATORS = re.compile(r'[\r\n,;،؛]+')
+
+
+def parse_mobile_text(text):
+    """
+    جدا کردن شماره‌های وارد شده در متن (هر خط، کاما یا نقطه‌ویرگول)
+    اگر یک بخش با فاصله، شماره معتبری نباشد (مثلاً چند شماره در یک خط) با فاصله هم جدا می‌شود
+    """
+    values = []
+    for value in _SEPARATORS.split(text or ''):
+        value = value.strip()
+        if not value:
+            continue
+        if normalize_iranian_mobile(value):
+            values.append(value)
+        else:
+            values.extend(value.split())
+    return values
+
+
+def parse_mobile_file(fileobj, filename, limit=MAX_BULK_INVITATIONS):
+    """
+    استخراج شماره‌ها از فایل CSV/XLSX (همه سلول‌هایی که عدد دارند)
+    خواندن فایل بعد از گذشتن از limit شماره متوقف می‌شود؛ فایل خراب ImportFileError می‌دهد
+    """
+    values = []
+    try:
+        for row in read_rows(fileobj, filename):
+            for cell in row:
+                cell = str(cell).strip()
+                if any(char.isdigit() for char in cell):
+                    values.append(cell)
+            if len(values) > limit:
+                break
+    except (zipfile.BadZipFile, UnicodeDecodeError, csv.Error, ParseError, IndexError, ValueError) as error:
+        raise ImportFileError('قالب فایل معتبر نیست') from error
+    return values
+
+
+def bulk_invite(company, inviter, raw_mobiles, position, department=None, message=''):
+    """
+    دعوت گروهی اعضا
+    کاربران، دعوت‌نامه‌های در انتظار و عضویت‌ها هر کدام با یک کوئری
+    برای کل لیست پیدا می‌شوند و دعوت‌نامه‌ها و اعلان‌ها با bulk_create ثبت می‌شوند
+
+    خروجی: لیستی از {'input', 'mobile', 'outcome', 'message'} به ترتیب ورودی
+    """
+    results = []
+    mobiles = []
+    seen = set()
+
+    for raw in raw_mobiles:
+        mobile = normalize_iranian_mobile(raw)
+        if not mobile:
+            results.append({'input': raw, 'mobile': None, 'outcome': OUTCOME_INVALID})
+        elif mobile in seen:
+            results.append({'input': raw, 'mobile': mobile, 'outcome': OUTCOME_DUPLICATE})
+        else:
+            seen.add(mobile)
+            mobiles.append(mobile)
+            results.append({'input': raw, 'mobile': mobile, 'outcome': None})
+
+    # ۱) کاربران موجود
+    users = {
+        user.mobileNumber: user
+        for user in CustomUser.objects.filter(mobileNumber__in=mobiles).only('id', 'mobileNumber')
+    }
+    user_ids = [user.id for user in users.values()]
+
+    # ۲) دعوت‌نامه‌های در انتظار (با کاربر یا با شماره موبایل)
+    pending_user_ids = set()
+    pending_mobiles = set()
+    for invited_user_id, invited_mobile in Invitation.objects.filter(
+        Q(invited_user_id__in=user_ids) | Q(invited_mobile__in=mobiles),
+        company=company,
+        status='PENDING',
+    ).values_list('invited_user_id', 'invited_mobile'):
+        if invited_user_id:
+            pending_user_ids.add(invited_user_id)
+        if invited_mobile:
+            pending_mobiles.add(invited_mobile)
+
+    # ۳) عضویت‌های موجود
+    member_user_ids = set(
+        CompanyMember.objects.filter(company=company, user_id__in=user_ids).values_list('user_id', flat=True)
+    )
+
+    expires_at = timezone.now() + timedelta(days=INVITATION_EXPIRE_DAYS)
+    position_display = dict(CompanyMember.Position.choices).get(position, position)
+
+    invitations = []
+    notifications = []
+    for result in results:
+        if result['outcome']:
+            continue
+
+        mobile = result['mobile']
+        user = users.get(mobile)
+
+        if user and user.id in member_user_ids:
+            result['outcome'] = OUTCOME_ALREADY_MEMBER
+            continue
+        if (user and user.id in pending_user_ids) or mobile in pending_mobiles:
+            result['outcome'] = OUTCOME_ALREADY_PENDING
+            continue
+
+        invitation = Invitation(
+            company=company,
+            invited_user=user,
+            invited_mobile=mobile if not user else None,
+            inviter=inviter,
+            department=department,
+            position=position,
+            message=message,
+            token=str(uuid.uuid4()),
+            expires_at=expires_at,
+            status='PENDING'
+        )
+        invitations.append(invitation)
+
+        if user:
+            notifications.append(Notification(
+                user=user,
+                title=f'📨 دعوت به شرکت {company.name}',
+                message=f'شما برای عضویت در شرکت {company.name} دعوت شده‌اید. سمت پیشنهادی: {position_display}',
+                notification_type='INVITATION',
+                related_object_id=invitation.id,
+                related_object_type='invitation'
+            ))
+            result['outcome'] = OUTCOME_INVITED
+        else:
+            result['outcome'] = OUTCOME_SAVED
+
+    with transaction.atomic():
+        Invitation.objects.bulk_create(invitations)
+        Notification.objects.bulk_create(notifications)
+        audit_service.record_bulk_create(company.id, Invitation, invitations)
+
+    for result in results:
+        result['message'] = OUTCOME_LABELS[result['outcome']]
+    return results
+
+
+def summarize(results):
+    """تعداد نتایج به تفکیک نوع"""
+    summary = {outcome: 0 for outcome in OUTCOME_LABELS}
+    for result in results:
+        summary[result['outcome']] += 1
+    summary['total'] = len(results)
+    return summary
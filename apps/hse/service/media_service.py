@@ -0,0 +1,167 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+
+MODE_DJANGO = 'django'
+MODE_X_ACCEL = 'x-accel'
+MODE_X_SENDFILE = 'x-sendfile'
+
+_RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _etag(stat):
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    تجزیه هدر Range (فقط یک بازه)
+    خروجی: (start, end) شامل هر دو سر، None اگر هدر قابل استفاده نباشد،
+    و ValueError اگر بازه خارج از فایل باشد (پاسخ 416)
+    """
+    match = _RANGE_PATTERN.match(header.strip()) if header else None
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+
+    if not start:
+        # bytes=-500 یعنی ۵۰۰ بایت آخر
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path, start, length, chunk_size):
+    """خواندن بخشی از فایل با تکه‌های ثابت"""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = file.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def _is_not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and int(last_modified) <= if_modified_since
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    if_range_date = parse_http_date_safe(if_range)
+    return if_range_date is not None and int(last_modified) <= if_range_date
+
+
+def serve_field_file(request, field_file, as_attachment=False, filename=None):
+    """
+    ارسال فایل محافظت‌شده با پشتیبانی از Range/206 و هدرهای کش
+
+    بسته به HSE_MEDIA_SERVE_MODE یا فایل با تکه‌های ثابت از دیسک استریم می‌شود یا
+    ارسال آن با X-Accel-Redirect (nginx) یا X-Sendfile (apache/lighttpd) به پروکسی سپرده می‌شود
+    """
+    if not field_file:
+        raise Http404('فایل یافت نشد')
+
+    try:
+        path = field_file.path
+        stat = os.stat(path)
+    except (NotImplementedError, ValueError, OSError):
+        raise Http404('فایل یافت نشد')
+
+    filename = filename or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    etag = _etag(stat)
+    disposition = 'attachment' if as_attachment else 'inline'
+    max_age = _setting('HSE_MEDIA_MAX_AGE', 3600)
+
+    def _common_headers(response):
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        # فایل‌ها فقط برای اعضای شرکت قابل دسترسی است؛ پروکسی‌های مشترک نباید کش کنند
+        response['Cache-Control'] = f'private, max-age={max_age}'
+        response['Content-Disposition'] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+        return response
+
+    if _is_not_modified(request, etag, stat.st_mtime):
+        return _common_headers(HttpResponseNotModified())
+
+    mode = _setting('HSE_MEDIA_SERVE_MODE', MODE_DJANGO)
+    if mode == MODE_X_ACCEL:
+        # nginx خودش Range را مدیریت می‌کند؛ location مربوطه باید internal باشد
+        response = HttpResponse(content_type=content_type)
+        prefix = _setting('HSE_MEDIA_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(field_file.name)
+        return _common_headers(response)
+    if mode == MODE_X_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return _common_headers(response)
+
+    size = stat.st_size
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size) if size else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return _common_headers(response)
+
+    if byte_range and not _if_range_matches(request, etag, stat.st_mtime):
+        byte_range = None
+
+    chunk_size = _setting('HSE_MEDIA_CHUNK_SIZE', 64 * 1024)
+
+    if byte_range is None:
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+            response.block_size = chunk_size
+        response['Content-Length'] = str(size)
+        return _common_headers(response)
+
+    start, end = byte_range
+    length = end - start + 1
+
+    if request.method == 'HEAD':
+        response = HttpResponse(status=206, content_type=content_type)
+    else:
+        response = StreamingHttpResponse(
+            iter_file_range(path, start, length, chunk_size),
+            status=206,
+            content_type=content_type
+        )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    return _common_headers(response)
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Inspection, InspectionReminder, Notification
+
+
+# بازرسی‌هایی که هنوز انجام نشده‌اند
+PENDING_STATUSES = ['DRAFT', 'IN_PROGRESS']
+
+BATCH_SIZE = 2000
+
+
+def lead_days():
+    """فاصله‌های یادآوری بر حسب روز قبل از موعد، از بزرگ به کوچک"""
+    return sorted(set(getattr(settings, 'HSE_INSPECTION_REMINDER_LEAD_DAYS', (7, 1, 0))), reverse=True)
+
+
+def upcoming_inspections(today, horizon):
+    """
+    بازرسی‌های انجام نشده همه شرکت‌ها با موعد در [today, today + horizon]
+    یک کوئری بازه‌ای روی نمایه (scheduled_date, status)
+    """
+    return (
+        Inspection.objects
+        .filter(
+            scheduled_date__gte=today,
+            scheduled_date__lte=today + timedelta(days=horizon),
+            status__in=PENDING_STATUSES,
+            assigned_to__isnull=False,
+        )
+        .order_by()
+        .values_list('id', 'title', 'scheduled_date', 'assigned_to_id', 'assigned_to__user_id', 'company__name')
+    )
+
+
+def _message(title, company_name, scheduled_date, days):
+    if days == 0:
+        when = 'امروز'
+    elif days == 1:
+        when = 'فردا'
+    else:
+        when = f'{days} روز دیگر'
+    return f'بازرسی «{title}» در شرکت {company_name} {when} ({scheduled_date}) موعد انجام دارد.'
+
+
+def _process_batch(rows, today, leads, dry_run):
+    """
+    ارسال یادآوری‌های یک دسته بازرسی
+    همه فاصله‌هایی که موعدشان رسیده در دفتر ثبت می‌شوند ولی برای هر بازرسی فقط نزدیک‌ترین آن‌ها
+    اعلان می‌شود (بازرسی که دیر ثبت شده چند یادآوری هم‌زمان دریافت نمی‌کند)
+    """
+    sent = set(
+        InspectionReminder.objects
+        .filter(inspection_id__in=[row[0] for row in rows])
+        .values_list('inspection_id', 'member_id', 'lead_days')
+    )
+
+    ledger = []
+    notifications = []
+    for inspection_id, title, scheduled_date, member_id, user_id, company_name in rows:
+        days = (scheduled_date - today).days
+        due = [lead for lead in leads if lead >= days and (inspection_id, member_id, lead) not in sent]
+        if not due:
+            continue
+
+        ledger.extend(
+            InspectionReminder(inspection_id=inspection_id, member_id=member_id, lead_days=lead)
+            for lead in due
+        )
+        notifications.append(Notification(
+            user_id=user_id,
+            title='📋 یادآوری بازرسی',
+            message=_message(title, company_name, scheduled_date, days),
+            notification_type=Notification.NotificationType.INSPECTION_REMINDER,
+            related_object_id=inspection_id,
+            related_object_type='inspection'
+        ))
+
+    if not dry_run and ledger:
+        with transaction.atomic():
+            InspectionReminder.objects.bulk_create(ledger, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+    return len(notifications)
+
+
+def send_inspection_reminders(today=None, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    ارسال یادآوری بازرسی‌های پیش رو برای مسئولان آن‌ها
+    بازرسی‌ها با iterator و به صورت دسته‌ای خوانده می‌شوند؛ برای هر دسته یک کوئری دفتر یادآوری
+    و یک bulk_create برای دفتر و اعلان‌ها اجرا می‌شود
+    خروجی: (تعداد بازرسی‌های بررسی شده، تعداد یادآوری‌های ارسال شده)
+    """
+    today = today or timezone.localdate()
+    leads = lead_days()
+    if not leads:
+        return 0, 0
+
+    scanned = 0
+    reminded = 0
+    batch = []
+    for row in upcoming_inspections(today, leads[0]).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            reminded += _process_batch(batch, today, leads, dry_run)
+            scanned += len(batch)
+            batch = []
+    if batch:
+        reminded += _process_batch(batch, today, leads, dry_run)
+        scanned += len(batch)
+    return scanned, reminded
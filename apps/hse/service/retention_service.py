@@ -0,0 +1,157 @@
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import ArchivedIncident, ArchivedNotification, Incident, JobCheckpoint, Notification
+from . import audit_service, hotspot_service, rollup_service
+
+
+# سیاست نگهداری یک جدول: رکوردهای منطبق با conditions که age_field آن‌ها قدیمی‌تر از
+# مهلت سیاست است به archive_model منتقل و از جدول اصلی حذف می‌شوند
+Policy = namedtuple('Policy', ['name', 'label', 'model', 'archive_model', 'age_field', 'conditions', 'default_days'])
+
+POLICIES = {
+    policy.name: policy
+    for policy in [
+        Policy(
+            'notifications', 'اعلان‌های خوانده شده',
+            Notification, ArchivedNotification, 'created_at',
+            {'is_read': True}, 90
+        ),
+        # حادثه‌ای که وظیفه‌ای به آن ارجاع دارد بایگانی نمی‌شود تا ارتباط وظیفه از بین نرود
+        Policy(
+            'incidents', 'حوادث بسته شده',
+            Incident, ArchivedIncident, 'updated_at',
+            {'status': 'CLOSED', 'tasks__isnull': True}, 3 * 365
+        ),
+    ]
+}
+
+CHECKPOINT_PREFIX = 'retention'
+
+RunResult = namedtuple('RunResult', ['moved', 'batches', 'finished'])
+
+
+class RetentionError(Exception):
+    """خطای اجرای سیاست نگهداری"""
+
+
+def retention_days(policy):
+    return getattr(settings, 'HSE_RETENTION_DAYS', {}).get(policy.name, policy.default_days)
+
+
+def archive_fields(policy):
+    """ستون‌های مشترک جدول اصلی و بایگانی"""
+    return [field.attname for field in policy.archive_model._meta.concrete_fields if field.name != 'archived_at']
+
+
+def candidates(policy, cutoff):
+    return policy.model.objects.filter(**{f'{policy.age_field}__lt': cutoff}, **policy.conditions)
+
+
+def _checkpoint_name(policy):
+    return f'{CHECKPOINT_PREFIX}:{policy.name}'
+
+
+def _load_state(policy):
+    """وضعیت اجرای ناتمام قبلی: (cutoff، کلید آخرین رکورد منتقل شده) یا None"""
+    value = JobCheckpoint.objects.filter(name=_checkpoint_name(policy)).values_list('value', flat=True).first()
+    if not value:
+        return None
+    state = json.loads(value)
+    after = state.get('after')
+    return datetime.fromisoformat(state['cutoff']), ((datetime.fromisoformat(after[0]), after[1]) if after else None)
+
+
+def _save_state(policy, cutoff, after):
+    JobCheckpoint.objects.update_or_create(
+        name=_checkpoint_name(policy),
+        defaults={'value': json.dumps({
+            'cutoff': cutoff.isoformat(),
+            'after': [after[0].isoformat(), str(after[1])] if after else None,
+        })}
+    )
+
+
+def _clear_state(policy):
+    JobCheckpoint.objects.filter(name=_checkpoint_name(policy)).update(value='')
+
+
+def pending_count(policy, now=None):
+    """تعداد رکوردهای قابل بایگانی (برای --dry-run)"""
+    state = _load_state(policy)
+    cutoff = state[0] if state else (now or timezone.now()) - timedelta(days=retention_days(policy))
+    return candidates(policy, cutoff).count()
+
+
+def archive_batch(policy, cutoff, after, batch_size):
+    """
+    انتقال یک دسته به ترتیب (age_field, pk) پس از کلید after
+    درج در بایگانی، حذف از جدول اصلی و ذخیره مکان نما در یک تراکنش انجام می‌شود؛
+    قطع اجرا در هر لحظه رکوردی را دو بار منتقل یا گم نمی‌کند
+    خروجی: (تعداد، کلید آخرین رکورد)
+    """
+    fields = archive_fields(policy)
+    queryset = candidates(policy, cutoff)
+    if after:
+        age, pk = after
+        queryset = queryset.filter(Q(**{f'{policy.age_field}__gt': age}) | Q(**{policy.age_field: age, 'pk__gt': pk}))
+
+    # audit_context بیرون از تراکنش است تا سوابق حذف پس از commit با یک کوئری ثبت شوند؛
+    # تغییرات خلاصه آماری و کانون‌های حوادث هم در پایان دسته یک جا اعمال می‌شوند
+    with audit_service.audit_context(), transaction.atomic(), rollup_service.deferred(), hotspot_service.deferred():
+        rows = list(queryset.order_by(policy.age_field, 'pk').values(*fields)[:batch_size])
+        if not rows:
+            return 0, after
+
+        now = timezone.now()
+        policy.archive_model.objects.bulk_create(
+            [policy.archive_model(archived_at=now, **row) for row in rows],
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+        policy.model.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+
+        last = (rows[-1][policy.age_field], rows[-1]['id'])
+        _save_state(policy, cutoff, last)
+    return len(rows), last
+
+
+def apply_policy(policy, now=None, batch_size=None, sleep=None, max_batches=None):
+    """
+    اجرای یک سیاست نگهداری به صورت دسته‌ای و با مکث بین دسته‌ها
+    اگر اجرای قبلی ناتمام مانده (max_batches یا قطع پروسه) از همان cutoff و مکان نما ادامه می‌یابد
+    خروجی: RunResult(تعداد منتقل شده، تعداد دسته‌ها، تمام شده؟)
+    """
+    batch_size = batch_size or getattr(settings, 'HSE_RETENTION_BATCH_SIZE', 1000)
+    sleep = getattr(settings, 'HSE_RETENTION_SLEEP', 0) if sleep is None else sleep
+    if batch_size < 1:
+        raise RetentionError('اندازه دسته نامعتبر است')
+
+    state = _load_state(policy)
+    if state:
+        cutoff, after = state
+    else:
+        cutoff, after = (now or timezone.now()) - timedelta(days=retention_days(policy)), None
+
+    moved = batches = 0
+    while True:
+        count, after = archive_batch(policy, cutoff, after, batch_size)
+        if not count:
+            _clear_state(policy)
+            return RunResult(moved, batches, True)
+        moved += count
+        batches += 1
+        if count < batch_size:
+            _clear_state(policy)
+            return RunResult(moved, batches, True)
+        if max_batches and batches >= max_batches:
+            return RunResult(moved, batches, False)
+        if sleep:
+            time.sleep(sleep)
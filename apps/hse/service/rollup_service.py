@@ -0,0 +1,234 @@
+import contextvars
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import ExtractYear, TruncMonth
+from django.utils import timezone
+
+from ..models import Incident, IncidentRollup
+
+
+# ابعاد قابل گروه‌بندی و فیلتر؛ year تجمیع ماه‌ها در سطح سال است
+DIMENSIONS = ['department', 'month', 'year', 'incident_type', 'severity_level', 'status']
+FILTER_DIMENSIONS = ['department', 'incident_type', 'severity_level', 'status']
+
+# فیلدهای کلید به ترتیب: (company_id, department_id, month, incident_type, severity_level, status)
+KEY_FIELDS = ('company_id', 'department_id', 'incident_date', 'incident_type', 'severity_level', 'status')
+
+# تغییرات دسته‌ای (حذف گروهی، ورود داده) در پایان دسته با چند کوئری اعمال می‌شوند
+_pending = contextvars.ContextVar('hse_rollup_pending', default=None)
+
+
+class RollupError(Exception):
+    """خطای پارامترهای گزارش تجمیعی حوادث"""
+
+
+def month_of(value):
+    """ماه یک زمان با منطقه زمانی پیش‌فرض پروژه، مانند TruncMonth در بازسازی"""
+    return timezone.localtime(value, timezone.get_default_timezone()).date().replace(day=1)
+
+
+def key_of(instance):
+    """
+    کلید جدول خلاصه برای یک حادثه از __dict__ نمونه (بدون کوئری)
+    اگر یکی از فیلدها بارگذاری نشده باشد None
+    """
+    values = instance.__dict__
+    if any(field not in values for field in KEY_FIELDS) or values['incident_date'] is None:
+        return None
+    return (
+        values['company_id'], values['department_id'], month_of(values['incident_date']),
+        values['incident_type'], values['severity_level'], values['status'],
+    )
+
+
+def stored_key(incident_id):
+    row = Incident.objects.filter(pk=incident_id).values_list(*KEY_FIELDS).first()
+    return (row[0], row[1], month_of(row[2]), *row[3:]) if row else None
+
+
+def apply_deltas(deltas):
+    """
+    اعمال تغییرات {کلید: تغییر تعداد}
+    ردیف‌های موجود با یک کوئری خوانده و برای هر مقدار تغییر یک UPDATE اجرا می‌شود؛ ردیف‌های جدید با bulk_create
+    """
+    deltas = {key: delta for key, delta in deltas.items() if key and delta}
+    if not deltas:
+        return
+
+    pending = _pending.get()
+    if pending is not None:
+        pending.update(deltas)
+        return
+
+    companies = {key[0] for key in deltas}
+    months = {key[2] for key in deltas}
+    existing = {}
+    rows = IncidentRollup.objects.filter(company_id__in=companies, month__in=months).values_list(
+        'pk', 'company_id', 'department_id', 'month', 'incident_type', 'severity_level', 'status'
+    )
+    for pk, *key in rows:
+        existing.setdefault(tuple(key), pk)
+
+    by_delta = {}
+    created = []
+    for key, delta in deltas.items():
+        if key in existing:
+            by_delta.setdefault(delta, []).append(existing[key])
+        elif delta > 0:
+            # کاهش ردیفی که وجود ندارد (مثلاً در حذف شرکت) نادیده گرفته می‌شود
+            company_id, department_id, month, incident_type, severity_level, status = key
+            created.append(IncidentRollup(
+                company_id=company_id, department_id=department_id, month=month,
+                incident_type=incident_type, severity_level=severity_level, status=status, count=delta,
+            ))
+
+    for delta, pks in by_delta.items():
+        IncidentRollup.objects.filter(pk__in=pks).update(count=F('count') + delta)
+    if created:
+        IncidentRollup.objects.bulk_create(created)
+
+
+@contextmanager
+def deferred():
+    """
+    جمع کردن تغییرات داخل بلوک و اعمال همه آن‌ها در پایان
+    برای عملیات گروهی که سیگنال هر حادثه را جداگانه اجرا می‌کنند
+    """
+    token = _pending.set(Counter())
+    try:
+        yield
+    except BaseException:
+        _pending.reset(token)
+        raise
+    pending = _pending.get()
+    _pending.reset(token)
+    apply_deltas(pending)
+
+
+def record_change(old_key, new_key):
+    """انتقال یک حادثه از کلید قدیم به کلید جدید (None برای ایجاد یا حذف)"""
+    if old_key != new_key:
+        apply_deltas({new_key: 1, old_key: -1})
+
+
+def rebuild(company=None):
+    """
+    ساخت دوباره جدول خلاصه از روی جدول حوادث با یک GROUP BY
+    خروجی: تعداد ردیف‌های ساخته شده
+    """
+    incidents = Incident.objects.all()
+    rollups = IncidentRollup.objects.all()
+    if company is not None:
+        incidents = incidents.filter(company=company)
+        rollups = rollups.filter(company=company)
+
+    groups = (
+        incidents.order_by()
+        .annotate(month=TruncMonth('incident_date', output_field=DateField(), tzinfo=timezone.get_default_timezone()))
+        .values('company_id', 'department_id', 'month', 'incident_type', 'severity_level', 'status')
+        .annotate(count=Count('id'))
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = IncidentRollup.objects.bulk_create(
+            [IncidentRollup(**group) for group in groups.iterator()],
+            batch_size=1000
+        )
+    return len(created)
+
+
+# ==================== پرس‌وجو ====================
+
+def _parse_month(value):
+    try:
+        year, month = (int(part) for part in value.split('-')[:2])
+        return date(year, month, 1)
+    except (ValueError, TypeError, AttributeError):
+        raise RollupError(f'ماه «{value}» نامعتبر است (قالب: YYYY-MM)')
+
+
+def query(company, group_by=(), filters=None, start=None, end=None):
+    """
+    برش و تجمیع دلخواه از جدول خلاصه
+    group_by: زیرمجموعه‌ای از DIMENSIONS؛ filters: {بعد: لیست مقادیر}؛ start و end: ماه (شامل)
+    هزینه پرس‌وجو به تعداد ردیف‌های خلاصه بستگی دارد نه تعداد حوادث
+    خروجی: لیست {ابعاد...، count}
+    """
+    group_by = list(dict.fromkeys(group_by))
+    for dimension in group_by:
+        if dimension not in DIMENSIONS:
+            raise RollupError(f'بعد نامعتبر: {dimension}')
+
+    rows = IncidentRollup.objects.filter(company=company)
+    for dimension, values in (filters or {}).items():
+        if dimension not in FILTER_DIMENSIONS:
+            raise RollupError(f'فیلتر نامعتبر: {dimension}')
+        if values:
+            rows = rows.filter(**{f'{dimension}__in': values})
+    if start:
+        rows = rows.filter(month__gte=start)
+    if end:
+        rows = rows.filter(month__lte=end)
+
+    fields = {dimension: 'department_id' if dimension == 'department' else dimension for dimension in group_by}
+    if 'year' in fields:
+        rows = rows.annotate(year=ExtractYear('month'))
+
+    if not group_by:
+        return [{'count': rows.aggregate(count=Sum('count'))['count'] or 0}]
+
+    result = []
+    for row in rows.order_by(*fields.values()).values(*fields.values()).annotate(total=Sum('count')):
+        if not row['total']:
+            continue
+        item = {dimension: row[field] for dimension, field in fields.items()}
+        item['count'] = row['total']
+        result.append(item)
+    return result
+
+
+def parse_query(params):
+    """پارامترهای درخواست: group_by=month,status و فیلترها با مقادیر جدا شده با کاما، from و to به صورت YYYY-MM"""
+    group_by = [item for item in params.get('group_by', '').split(',') if item]
+    filters = {
+        dimension: [item for item in params.get(dimension, '').split(',') if item]
+        for dimension in FILTER_DIMENSIONS
+        if params.get(dimension)
+    }
+    try:
+        filters['department'] = [uuid.UUID(item) for item in filters.get('department', [])]
+    except ValueError:
+        raise RollupError('شناسه بخش نامعتبر است')
+    start = _parse_month(params['from']) if params.get('from') else None
+    end = _parse_month(params['to']) if params.get('to') else None
+    return group_by, filters, start, end
+
+
+def summary(company):
+    """تعداد کل، حل شده و شدید حوادث شرکت با یک پرس‌وجو روی جدول خلاصه"""
+    stats = {'total': 0, 'resolved': 0, 'severe': 0}
+    for row in query(company, ['status', 'severity_level']):
+        stats['total'] += row['count']
+        if row['status'] == 'RESOLVED':
+            stats['resolved'] += row['count']
+        if row['severity_level'] == 'SEVERE':
+            stats['severe'] += row['count']
+    return stats
+
+
+def monthly_counts(company, months=6, today=None):
+    """تعداد حوادث ماه‌های اخیر (شامل ماه جاری)، قدیمی‌ترین اول"""
+    current = month_of(today or timezone.now())
+    starts = []
+    for _ in range(months):
+        starts.append(current)
+        current = (current - timedelta(days=1)).replace(day=1)
+    starts.reverse()
+
+    counts = {row['month']: row['count'] for row in query(company, ['month'], start=starts[0], end=starts[-1])}
+    return [(start, counts.get(start, 0)) for start in starts]
@@ -0,0 +1,150 @@
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import CompanyMember, TrainingParticipation
+from . import audit_service
+from .compliance_service import bump_company_version
+
+
+ATTENDANCE_VALUES = {value for value, _ in TrainingParticipation.ATTENDANCE_CHOICES}
+
+# فیلدهایی که در ثبت حضور گروهی به‌روزرسانی می‌شوند
+ATTENDANCE_UPDATE_FIELDS = ['attendance_status', 'attended_at', 'test_score', 'participant_rating']
+
+BULK_BATCH_SIZE = 500
+
+
+class RosterError(Exception):
+    """خطای ورودی عملیات گروهی شرکت‌کنندگان"""
+
+
+def enrollment_candidates(company, department_id=None, positions=None):
+    """اعضای فعال شرکت بر اساس بخش و/یا سمت"""
+    members = CompanyMember.objects.filter(company=company, status='ACTIVE', is_active=True)
+    if department_id:
+        members = members.filter(department_id=department_id)
+    if positions:
+        members = members.filter(position__in=positions)
+    return members
+
+
+def enroll_members(training, members):
+    """
+    ثبت‌نام گروهی اعضا در آموزش
+    یک کوئری برای شناسه اعضا، یک کوئری برای ثبت‌نام‌های موجود و bulk_create با ignore_conflicts
+    خروجی: (تعداد ثبت‌نام جدید، تعداد ثبت‌نام قبلی)
+    """
+    member_ids = set(members.values_list('id', flat=True))
+    existing = set(
+        TrainingParticipation.objects.filter(training=training, participant_id__in=member_ids)
+        .values_list('participant_id', flat=True)
+    )
+    new_ids = member_ids - existing
+
+    # ignore_conflicts برای ثبت‌نام هم‌زمان همان عضو در درخواست دیگر (unique_together)
+    participations = [
+        TrainingParticipation(training=training, participant_id=member_id, attendance_status='REGISTERED')
+        for member_id in new_ids
+    ]
+    TrainingParticipation.objects.bulk_create(participations, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+    if new_ids:
+        # شناسه‌ها پیش از درج ساخته می‌شوند؛ فقط ردیف‌هایی که واقعاً درج شده‌اند در تاریخچه ثبت می‌شوند
+        inserted = set(
+            TrainingParticipation.objects.filter(id__in=[item.id for item in participations])
+            .values_list('id', flat=True)
+        )
+        audit_service.record_bulk_create(
+            training.company_id, TrainingParticipation, [item for item in participations if item.id in inserted]
+        )
+        bump_company_version(training.company_id)
+    return len(new_ids), len(existing)
+
+
+def _parse_int(value, minimum, maximum, label):
+    if value in (None, ''):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RosterError(f'{label} نامعتبر است')
+    if not minimum <= value <= maximum:
+        raise RosterError(f'{label} باید بین {minimum} و {maximum} باشد')
+    return value
+
+
+def update_attendance(training, rows):
+    """
+    ثبت حضور و نمره گروهی
+    rows: لیست {'id', 'attendance_status'?, 'test_score'?, 'rating'?}؛ کلیدی که ارسال نشده تغییر نمی‌کند
+    همه رکوردها با یک کوئری خوانده و با یک bulk_update ذخیره می‌شوند
+    خروجی: (تعداد رکوردهای به‌روز شده، لیست خطاها)
+    """
+    record_ids = []
+    for row in rows:
+        try:
+            record_ids.append(uuid.UUID(str(row.get('id'))))
+        except ValueError:
+            pass
+
+    records = TrainingParticipation.objects.filter(training=training).in_bulk(record_ids)
+    records = {str(record_id): record for record_id, record in records.items()}
+
+    now = timezone.now()
+    changed = {}
+    errors = []
+
+    for row in rows:
+        record = records.get(str(row.get('id')))
+        if record is None:
+            errors.append({'id': row.get('id'), 'error': 'رکورد حضور یافت نشد'})
+            continue
+
+        try:
+            status = row.get('attendance_status')
+            if status:
+                if not isinstance(status, str) or status not in ATTENDANCE_VALUES:
+                    raise RosterError('وضعیت حضور نامعتبر است')
+                record.attendance_status = status
+                if status == 'ATTENDED' and not record.attended_at:
+                    record.attended_at = now
+
+            if 'test_score' in row:
+                record.test_score = _parse_int(row['test_score'], 0, 100, 'نمره آزمون')
+            if 'rating' in row:
+                record.participant_rating = _parse_int(row['rating'], 1, 5, 'امتیاز')
+        except RosterError as error:
+            errors.append({'id': row.get('id'), 'error': str(error)})
+            continue
+
+        changed[record.id] = record
+
+    with transaction.atomic():
+        TrainingParticipation.objects.bulk_update(
+            list(changed.values()),
+            ATTENDANCE_UPDATE_FIELDS,
+            batch_size=BULK_BATCH_SIZE
+        )
+        audit_service.record_bulk_update(training.company_id, TrainingParticipation, changed.values())
+    if changed:
+        bump_company_version(training.company_id)
+    return len(changed), errors
+
+
+def attendance_rows_from_post(data, record_ids):
+    """
+    تبدیل فرم ثبت حضور گروهی (attendance_<id> / test_score_<id> / rating_<id>) به لیست ردیف‌ها
+    """
+    rows = []
+    for record_id in record_ids:
+        row = {'id': record_id}
+        if f'attendance_{record_id}' in data:
+            row['attendance_status'] = data.get(f'attendance_{record_id}')
+        if f'test_score_{record_id}' in data:
+            row['test_score'] = data.get(f'test_score_{record_id}')
+        if f'rating_{record_id}' in data:
+            row['rating'] = data.get(f'rating_{record_id}')
+        if len(row) > 1:
+            rows.append(row)
+    return rows
@@ -0,0 +1,332 @@
+import heapq
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+from operator import attrgetter
+
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from ..models import CompanyMember, Inspection, Training, TrainingParticipation
+
+
+KIND_TRAINING = 'training'
+KIND_INSPECTION = 'inspection'
+
+KIND_LABELS = {
+    KIND_TRAINING: 'آموزش',
+    KIND_INSPECTION: 'بازرسی',
+}
+
+# جلسات در این وضعیت‌ها زمان کسی را اشغال نمی‌کنند
+INACTIVE_TRAINING_STATUSES = ['CANCELLED']
+INACTIVE_INSPECTION_STATUSES = ['COMPLETED']
+
+# حداکثر بازه گزارش تداخل
+MAX_REPORT_DAYS = 366
+
+
+# بازه زمانی [start, end) یک جلسه و اعضایی که در آن حضور دارند
+Interval = namedtuple('Interval', ['start', 'end', 'kind', 'object_id', 'title', 'members'])
+
+
+def interval_key(interval):
+    return (interval.kind, str(interval.object_id))
+
+
+def day_bounds(date):
+    """بازه کامل یک روز به وقت محلی؛ بازرسی‌ها فقط تاریخ دارند و کل روز را اشغال می‌کنند"""
+    start = datetime.combine(date, time.min)
+    if timezone.is_naive(start) and timezone.now().tzinfo is not None:
+        start = timezone.make_aware(start)
+    return start, start + timedelta(days=1)
+
+
+def training_interval(training_id, title, scheduled_date, duration_minutes, members):
+    return Interval(
+        scheduled_date,
+        scheduled_date + timedelta(minutes=duration_minutes or 0),
+        KIND_TRAINING,
+        training_id,
+        title,
+        frozenset(member for member in members if member),
+    )
+
+
+def inspection_interval(inspection_id, title, scheduled_date, assigned_to_id):
+    start, end = day_bounds(scheduled_date)
+    return Interval(
+        start,
+        end,
+        KIND_INSPECTION,
+        inspection_id,
+        title,
+        frozenset([assigned_to_id] if assigned_to_id else []),
+    )
+
+
+def _local_date(value):
+    return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+
+def is_conflict(first, second):
+    """دو بازرسی هم‌روز برای یک بازرس تداخل محسوب نمی‌شوند؛ فقط جلسات آموزشی ساعت مشخص دارند"""
+    return not (first.kind == KIND_INSPECTION and second.kind == KIND_INSPECTION)
+
+
+def load_intervals(company, start, end, member_ids=None, exclude=None):
+    """
+    بارگذاری بازه‌های آموزش و بازرسی شرکت که با [start, end) هم‌پوشانی دارند
+    member_ids: فقط جلسات این اعضا (برای بررسی یک جلسه جدید)
+    exclude: (kind, object_id) جلسه‌ای که در حال ویرایش است
+    حداکثر چهار کوئری، مستقل از تعداد جلسات
+    """
+    # آموزشی که قبل از start شروع شده تا سقف طولانی‌ترین آموزش شرکت می‌تواند هنوز ادامه داشته باشد
+    longest = Training.objects.filter(company=company).aggregate(value=Max('duration_minutes'))['value'] or 0
+
+    trainings = (
+        Training.objects
+        .filter(
+            company=company,
+            scheduled_date__lt=end,
+            scheduled_date__gte=start - timedelta(minutes=longest),
+        )
+        .exclude(status__in=INACTIVE_TRAINING_STATUSES)
+    )
+    inspections = (
+        Inspection.objects
+        .filter(
+            company=company,
+            assigned_to__isnull=False,
+            scheduled_date__gte=_local_date(start),
+            scheduled_date__lte=_local_date(end),
+        )
+        .exclude(status__in=INACTIVE_INSPECTION_STATUSES)
+    )
+    if member_ids is not None:
+        member_ids = set(member_ids)
+        trainings = trainings.filter(
+            Q(instructor_id__in=member_ids) | Q(participation_records__participant_id__in=member_ids)
+        ).distinct()
+        inspections = inspections.filter(assigned_to_id__in=member_ids)
+    if exclude:
+        kind, object_id = exclude
+        if kind == KIND_TRAINING:
+            trainings = trainings.exclude(id=object_id)
+        elif kind == KIND_INSPECTION:
+            inspections = inspections.exclude(id=object_id)
+
+    training_rows = list(trainings.order_by().values_list('id', 'title', 'scheduled_date', 'duration_minutes', 'instructor_id'))
+
+    participants = defaultdict(set)
+    if training_rows:
+        records = TrainingParticipation.objects.filter(training_id__in=[row[0] for row in training_rows])
+        if member_ids is not None:
+            records = records.filter(participant_id__in=member_ids)
+        for training_id, participant_id in records.values_list('training_id', 'participant_id'):
+            participants[training_id].add(participant_id)
+
+    intervals = []
+    for training_id, title, scheduled_date, duration_minutes, instructor_id in training_rows:
+        members = participants[training_id] | {instructor_id}
+        if member_ids is not None:
+            members &= member_ids
+        interval = training_interval(training_id, title, scheduled_date, duration_minutes, members)
+        if interval.end > start and interval.members:
+            intervals.append(interval)
+
+    for inspection_id, title, scheduled_date, assigned_to_id in (
+        inspections.order_by().values_list('id', 'title', 'scheduled_date', 'assigned_to_id')
+    ):
+        interval = inspection_interval(inspection_id, title, scheduled_date, assigned_to_id)
+        if interval.start < end and interval.end > start:
+            intervals.append(interval)
+
+    return intervals
+
+
+class IntervalIndex:
+    """
+    نمایه بازه‌ها به تفکیک عضو
+    بازه‌های هر عضو بر اساس شروع مرتب و بیشینه پیشوندی پایان‌ها نگهداری می‌شود؛
+    جستجوی هم‌پوشانی با bisect روی شروع‌ها و توقف زودهنگام روی بیشینه پایان انجام می‌شود
+    """
+
+    def __init__(self, intervals):
+        by_member = defaultdict(list)
+        for interval in intervals:
+            for member_id in interval.members:
+                by_member[member_id].append(interval)
+
+        self._items = {}
+        self._starts = {}
+        self._max_ends = {}
+        for member_id, items in by_member.items():
+            items.sort(key=attrgetter('start'))
+            max_ends = []
+            current = None
+            for item in items:
+                current = item.end if current is None or item.end > current else current
+                max_ends.append(current)
+            self._items[member_id] = items
+            self._starts[member_id] = [item.start for item in items]
+            self._max_ends[member_id] = max_ends
+
+    def overlapping(self, member_id, start, end):
+        """بازه‌های عضو که با [start, end) هم‌پوشانی دارند"""
+        items = self._items.get(member_id)
+        if not items:
+            return []
+        max_ends = self._max_ends[member_id]
+        result = []
+        index = bisect_left(self._starts[member_id], end) - 1
+        while index >= 0 and max_ends[index] > start:
+            if items[index].end > start:
+                result.append(items[index])
+            index -= 1
+        return result
+
+    def conflicts(self, candidate):
+        """
+        تداخل‌های یک جلسه با جلسات نمایه
+        خروجی: لیست (بازه، مجموعه اعضای مشترک) به ترتیب زمان
+        """
+        found = {}
+        for member_id in candidate.members:
+            for other in self.overlapping(member_id, candidate.start, candidate.end):
+                if interval_key(other) == interval_key(candidate) or not is_conflict(candidate, other):
+                    continue
+                found.setdefault(interval_key(other), (other, set()))[1].add(member_id)
+        return sorted(found.values(), key=lambda item: item[0].start)
+
+
+def sweep_conflicts(intervals):
+    """
+    همه تداخل‌ها با sweep line به تفکیک عضو
+    بازه‌های هر عضو بر اساس شروع پیمایش می‌شوند و جلسات فعال در heap بر اساس پایان نگهداری می‌شوند
+    پیچیدگی: O(n log n + تعداد تداخل‌ها)
+    خروجی: {(key1, key2): (بازه اول، بازه دوم، مجموعه اعضا)}
+    """
+    by_member = defaultdict(list)
+    for interval in intervals:
+        for member_id in interval.members:
+            by_member[member_id].append(interval)
+
+    pairs = {}
+    for member_id, items in by_member.items():
+        items.sort(key=attrgetter('start'))
+        active = []
+        for sequence, interval in enumerate(items):
+            while active and active[0][0] <= interval.start:
+                heapq.heappop(active)
+            for _, _, other in active:
+                if not is_conflict(other, interval):
+                    continue
+                first, second = sorted((other, interval), key=lambda item: (item.start, interval_key(item)))
+                key = (interval_key(first), interval_key(second))
+                pairs.setdefault(key, (first, second, set()))[2].add(member_id)
+            heapq.heappush(active, (interval.end, sequence, interval))
+    return pairs
+
+
+def member_names(member_ids):
+    """نام اعضا با یک کوئری"""
+    return {
+        member_id: f'{name or ""} {family or ""}'.strip() or mobile
+        for member_id, name, family, mobile in CompanyMember.objects.filter(id__in=member_ids).values_list(
+            'id', 'user__name', 'user__family', 'user__mobileNumber'
+        )
+    }
+
+
+def find_conflicts(company, candidate):
+    """بررسی یک جلسه جدید یا ویرایش شده در برابر جلسات اعضای همان جلسه"""
+    if not candidate.members or candidate.end <= candidate.start:
+        return []
+    intervals = load_intervals(
+        company,
+        candidate.start,
+        candidate.end,
+        member_ids=candidate.members,
+        exclude=(candidate.kind, candidate.object_id) if candidate.object_id else None,
+    )
+    return IntervalIndex(intervals).conflicts(candidate)
+
+
+def conflicts_for_training(training):
+    if training.status in INACTIVE_TRAINING_STATUSES:
+        return []
+    members = set(TrainingParticipation.objects.filter(training=training).values_list('participant_id', flat=True))
+    members.add(training.instructor_id)
+    candidate = training_interval(training.id, training.title, training.scheduled_date, training.duration_minutes, members)
+    return find_conflicts(training.company, candidate)
+
+
+def conflicts_for_inspection(inspection):
+    if inspection.status in INACTIVE_INSPECTION_STATUSES:
+        return []
+    candidate = inspection_interval(inspection.id, inspection.title, inspection.scheduled_date, inspection.assigned_to_id)
+    return find_conflicts(inspection.company, candidate)
+
+
+def _format_time(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.strftime('%Y-%m-%d %H:%M')
+
+
+def serialize_interval(interval):
+    if interval.kind == KIND_INSPECTION:
+        # بازرسی ساعت ندارد و فقط تاریخ آن نمایش داده می‌شود
+        start = end = _format_time(interval.start)[:10]
+    else:
+        start, end = _format_time(interval.start), _format_time(interval.end)
+    return {
+        'kind': interval.kind,
+        'kind_label': KIND_LABELS[interval.kind],
+        'id': str(interval.object_id),
+        'title': interval.title,
+        'start': start,
+        'end': end,
+    }
+
+
+def serialize_conflicts(conflicts):
+    """تبدیل خروجی find_conflicts به داده قابل نمایش"""
+    names = member_names({member_id for _, members in conflicts for member_id in members})
+    return [
+        dict(serialize_interval(other), members=sorted(names.get(member_id, '') for member_id in members))
+        for other, members in conflicts
+    ]
+
+
+def conflict_messages(conflicts, limit=5):
+    """متن هشدارهای تداخل برای messages"""
+    items = serialize_conflicts(conflicts)
+    lines = [
+        f"تداخل زمانی با {item['kind_label']} «{item['title']}» ({item['start']}) برای {'، '.join(item['members'])}"
+        for item in items[:limit]
+    ]
+    if len(items) > limit:
+        lines.append(f'و {len(items) - limit} تداخل دیگر')
+    return lines
+
+
+def conflicts_report(company, start, end):
+    """
+    گزارش همه تداخل‌های شرکت در بازه [start, end)
+    خروجی: لیست {'first', 'second', 'members', 'overlap_start', 'overlap_end'} به ترتیب زمان
+    """
+    pairs = sweep_conflicts(load_intervals(company, start, end))
+    names = member_names({member_id for _, _, members in pairs.values() for member_id in members})
+
+    report = []
+    for first, second, members in sorted(pairs.values(), key=lambda item: (item[0].start, item[1].start)):
+        report.append({
+            'first': serialize_interval(first),
+            'second': serialize_interval(second),
+            'members': sorted(names.get(member_id, '') for member_id in members),
+            'overlap_start': _format_time(max(first.start, second.start)),
+            'overlap_end': _format_time(min(first.end, second.end)),
+        })
+    return report
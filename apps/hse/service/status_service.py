@@ -0,0 +1,186 @@
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Inspection, Notification, Task
+from . import audit_service
+
+
+# جدول انتقال وضعیت: وضعیت فعلی ← وضعیت‌های مجاز بعدی
+TASK_TRANSITIONS = {
+    'PENDING': {'IN_PROGRESS', 'COMPLETED', 'CANCELLED'},
+    'IN_PROGRESS': {'UNDER_REVIEW', 'COMPLETED', 'PENDING', 'CANCELLED'},
+    'UNDER_REVIEW': {'COMPLETED', 'IN_PROGRESS'},
+    'COMPLETED': {'IN_PROGRESS'},
+    'CANCELLED': {'PENDING'},
+}
+
+INSPECTION_TRANSITIONS = {
+    Inspection.DRAFT: {Inspection.IN_PROGRESS, Inspection.COMPLETED},
+    Inspection.IN_PROGRESS: {Inspection.COMPLETED, Inspection.DRAFT},
+    Inspection.COMPLETED: {Inspection.IN_PROGRESS},
+}
+
+COMPLETED_STATUS = 'COMPLETED'
+
+# سقف تعداد رکورد در یک درخواست گروهی
+MAX_BULK_IDS = 1000
+
+BULK_BATCH_SIZE = 1000
+
+# تنظیمات هر مدل: (جدول انتقال، برچسب‌ها، نوع شی در اعلان، عنوان شی)
+TARGETS = {
+    Task: (TASK_TRANSITIONS, dict(Task.STATUS_CHOICES), 'task', 'وظیفه'),
+    Inspection: (INSPECTION_TRANSITIONS, dict(Inspection.STATUS_CHOICES), 'inspection', 'بازرسی'),
+}
+
+
+class TransitionError(Exception):
+    """خطای تغییر وضعیت"""
+
+
+def allowed_targets(model, status):
+    """وضعیت‌هایی که از وضعیت فعلی قابل انتخاب هستند"""
+    transitions, labels = TARGETS[model][:2]
+    return [(value, label) for value, label in labels.items() if value in transitions.get(status, ())]
+
+
+def _parse_ids(ids):
+    parsed = []
+    for value in ids:
+        try:
+            parsed.append(uuid.UUID(str(value)))
+        except ValueError:
+            raise TransitionError('شناسه نامعتبر است')
+    if not parsed:
+        raise TransitionError('هیچ موردی انتخاب نشده است')
+    if len(parsed) > MAX_BULK_IDS:
+        raise TransitionError(f'حداکثر {MAX_BULK_IDS} مورد در هر درخواست قابل تغییر است')
+    return set(parsed)
+
+
+def build_notifications(model, rows, target, user):
+    """یک اعلان برای مسئول هر مورد؛ تغییری که خود مسئول انجام داده اعلان ندارد"""
+    _, labels, object_type, object_label = TARGETS[model]
+    changed_by = (user.full_name.strip() or user.mobileNumber) if user else ''
+    for object_id, title, assignee_id in rows:
+        if not assignee_id or (user and assignee_id == user.id):
+            continue
+        suffix = f' (توسط {changed_by})' if changed_by else ''
+        message = f'وضعیت {object_label} «{title}» به «{labels[target]}» تغییر کرد{suffix}.'
+        yield Notification(
+            user_id=assignee_id,
+            title=f'تغییر وضعیت {object_label}',
+            message=message,
+            notification_type=Notification.NotificationType.STATUS_CHANGED,
+            related_object_id=object_id,
+            related_object_type=object_type
+        )
+
+
+def _transition_changes(row, target, completed_date):
+    status, _, _, old_completed_date = row
+    changes = {'status': [status, target]}
+    if old_completed_date != completed_date:
+        changes['completed_date'] = [
+            audit_service.plain_value(old_completed_date), audit_service.plain_value(completed_date)
+        ]
+    return changes
+
+
+def bulk_transition(model, company, ids, target, user=None):
+    """
+    تغییر وضعیت گروهی وظایف یا بازرسی‌ها
+    وضعیت فعلی همه موارد با یک کوئری خوانده و با جدول انتقال بررسی می‌شود؛ موارد مجاز با یک
+    update() که completed_date را هم در همان دستور تنظیم می‌کند تغییر می‌کنند و اعلان مسئولان
+    با یک bulk_create ثبت می‌شود؛ اعلان و تاریخچه فقط برای ردیف‌هایی ساخته می‌شود که واقعاً تغییر کرده‌اند
+    خروجی: {'updated': تعداد، 'skipped': [{'id', 'error'}]}
+    """
+    transitions, labels = TARGETS[model][:2]
+    if not isinstance(target, str) or target not in labels:
+        raise TransitionError('وضعیت نامعتبر است')
+    ids = _parse_ids(ids)
+
+    rows = {
+        object_id: (status, title, assignee_id, old_completed_date)
+        for object_id, status, title, assignee_id, old_completed_date in (
+            model.objects.filter(company=company, id__in=ids)
+            .order_by()
+            .values_list('id', 'status', 'title', 'assigned_to__user_id', 'completed_date')
+        )
+    }
+
+    skipped = []
+    allowed = []
+    for object_id in ids:
+        if object_id not in rows:
+            skipped.append({'id': str(object_id), 'error': 'مورد یافت نشد'})
+            continue
+        status = rows[object_id][0]
+        if status == target:
+            skipped.append({'id': str(object_id), 'error': 'وضعیت تغییری نکرده است'})
+        elif target not in transitions.get(status, ()):
+            skipped.append({'id': str(object_id), 'error': f'تغییر از «{labels[status]}» به «{labels[target]}» مجاز نیست'})
+        else:
+            allowed.append(object_id)
+
+    if not allowed:
+        return {'updated': 0, 'skipped': skipped}
+
+    # تاریخ تکمیل با ورود به وضعیت تکمیل تنظیم و با خروج از آن پاک می‌شود
+    completed_date = timezone.localdate() if target == COMPLETED_STATUS else None
+    sources = [status for status, targets in transitions.items() if target in targets]
+
+    with transaction.atomic():
+        # شرط وضعیت مبدأ جلوی تغییر مواردی را می‌گیرد که هم‌زمان به وضعیت غیرمجاز رفته‌اند؛
+        # ردیف‌های قابل تغییر قفل و دوباره خوانده می‌شوند تا اعلان و تاریخچه با update() یکی باشد
+        locked = {
+            object_id: (status, old_completed_date)
+            for object_id, status, old_completed_date in (
+                model.objects.select_for_update()
+                .filter(company=company, id__in=allowed, status__in=sources)
+                .order_by()
+                .values_list('id', 'status', 'completed_date')
+            )
+        }
+        for object_id in allowed:
+            if object_id in locked:
+                status, old_completed_date = locked[object_id]
+                rows[object_id] = (status,) + rows[object_id][1:3] + (old_completed_date,)
+            else:
+                skipped.append({'id': str(object_id), 'error': 'وضعیت مورد هم‌زمان تغییر کرده است'})
+        changed = [object_id for object_id in allowed if object_id in locked]
+        if not changed:
+            return {'updated': 0, 'skipped': skipped}
+
+        # update() فیلد auto_now را مقداردهی نمی‌کند
+        updated = (
+            model.objects
+            .filter(id__in=changed)
+            .update(status=target, completed_date=completed_date, updated_at=timezone.now())
+        )
+        notifications = list(build_notifications(
+            model,
+            [(object_id, rows[object_id][1], rows[object_id][2]) for object_id in changed],
+            target,
+            user
+        ))
+        Notification.objects.bulk_create(notifications, batch_size=BULK_BATCH_SIZE)
+        # update() سیگنال ندارد؛ تاریخچه از همان مقادیر خوانده شده ساخته می‌شود
+        audit_service.record_bulk(
+            getattr(company, 'pk', company),
+            model,
+            [(object_id, _transition_changes(rows[object_id], target, completed_date)) for object_id in changed],
+            getattr(user, 'pk', None)
+        )
+
+    return {'updated': updated, 'skipped': skipped}
+
+
+def transition(instance, target, user=None):
+    """تغییر وضعیت یک مورد از همان مسیر گروهی"""
+    result = bulk_transition(type(instance), instance.company_id, [instance.id], target, user)
+    if result['skipped']:
+        raise TransitionError(result['skipped'][0]['error'])
+    return result['updated']
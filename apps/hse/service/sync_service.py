@@ -0,0 +1,309 @@
+import base64
+import json
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import SET_NULL, Max, Q
+from django.utils import timezone
+
+from ..forms import IncidentForm, InspectionForm, TaskForm
+from ..models import (
+    AuditLog, CompanyDepartment, CompanyMember, Incident, Inspection, Task, Training
+)
+from . import audit_service, status_service
+
+
+# موجودیت‌های همگام‌سازی؛ columns: (نام ستون خروجی، مسیر فیلد در values_list)
+Entity = namedtuple('Entity', ['name', 'model', 'columns'])
+
+ENTITIES = [
+    Entity('departments', CompanyDepartment, [
+        ('id', 'id'), ('name', 'name'), ('manager_id', 'manager_id'),
+        ('description', 'description'), ('is_active', 'is_active'), ('updated_at', 'updated_at'),
+    ]),
+    Entity('members', CompanyMember, [
+        ('id', 'id'), ('user_id', 'user_id'), ('name', 'user__name'), ('family', 'user__family'),
+        ('mobile', 'user__mobileNumber'), ('department_id', 'department_id'), ('position', 'position'),
+        ('status', 'status'), ('is_active', 'is_active'), ('updated_at', 'updated_at'),
+    ]),
+    Entity('incidents', Incident, [
+        ('id', 'id'), ('title', 'title'), ('description', 'description'), ('incident_type', 'incident_type'),
+        ('severity_level', 'severity_level'), ('status', 'status'), ('department_id', 'department_id'),
+        ('reporter_id', 'reporter_id'), ('incident_date', 'incident_date'), ('location', 'location'),
+        ('updated_at', 'updated_at'),
+    ]),
+    Entity('inspections', Inspection, [
+        ('id', 'id'), ('title', 'title'), ('description', 'description'), ('priority', 'priority'),
+        ('status', 'status'), ('department_id', 'department_id'), ('assigned_to_id', 'assigned_to_id'),
+        ('scheduled_date', 'scheduled_date'), ('completed_date', 'completed_date'),
+        ('checklist_id', 'checklist_id'), ('updated_at', 'updated_at'),
+    ]),
+    Entity('tasks', Task, [
+        ('id', 'id'), ('title', 'title'), ('description', 'description'), ('priority', 'priority'),
+        ('status', 'status'), ('department_id', 'department_id'), ('assigned_to_id', 'assigned_to_id'),
+        ('due_date', 'due_date'), ('completed_date', 'completed_date'),
+        ('related_inspection_id', 'related_inspection_id'), ('related_incident_id', 'related_incident_id'),
+        ('updated_at', 'updated_at'),
+    ]),
+    Entity('trainings', Training, [
+        ('id', 'id'), ('title', 'title'), ('training_type', 'training_type'), ('status', 'status'),
+        ('department_id', 'department_id'), ('scheduled_date', 'scheduled_date'),
+        ('duration_minutes', 'duration_minutes'), ('instructor_id', 'instructor_id'), ('updated_at', 'updated_at'),
+    ]),
+]
+
+ENTITY_BY_TYPE = {audit_service.object_type(entity.model): entity for entity in ENTITIES}
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+# حداکثر عملیات در یک درخواست ارسال
+MAX_UPLOAD_OPERATIONS = 200
+
+# عملیات ایجاد آفلاین: نوع ← (مدل، فرم)
+CREATABLE = {
+    'incident': (Incident, IncidentForm),
+    'inspection': (Inspection, InspectionForm),
+    'task': (Task, TaskForm),
+}
+TRANSITIONABLE = {'inspection': Inspection, 'task': Task}
+
+
+class SyncError(Exception):
+    """خطای پارامترهای همگام‌سازی"""
+
+
+def set_null_references():
+    """
+    ستون‌های همگام‌سازی که با حذف شی مرجع (SET NULL) بدون سیگنال خالی می‌شوند
+    خروجی: {مدل مرجع: [(مدل همگام، نام فیلد)]}
+    """
+    references = {}
+    for entity in ENTITIES:
+        synced = {path for _, path in entity.columns}
+        for field in entity.model._meta.concrete_fields:
+            if field.is_relation and field.remote_field.on_delete is SET_NULL and field.attname in synced:
+                references.setdefault(field.related_model, []).append((entity.model, field.name))
+    return references
+
+
+def settle_seconds():
+    """
+    رکوردهایی که در این چند ثانیه اخیر تغییر کرده‌اند در دور بعد ارسال می‌شوند؛
+    تراکنشی که updated_at کوچک‌تری دارد اما دیرتر commit می‌شود از مکان نما جا نمی‌ماند
+    """
+    return getattr(settings, 'HSE_SYNC_SETTLE_SECONDS', 2)
+
+
+def page_size(value):
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise SyncError('تعداد رکوردها نامعتبر است')
+    return max(1, min(value, MAX_PAGE_SIZE))
+
+
+# ==================== دریافت تغییرات ====================
+
+def encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(value):
+    """
+    مکان نما: {'e': {نام موجودیت: [updated_at, id]}, 'd': شناسه آخرین سابقه حذف}
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(value.encode('ascii')))
+        positions = {
+            name: (datetime.fromisoformat(position[0]), uuid.UUID(position[1]))
+            for name, position in state.get('e', {}).items()
+        }
+        return positions, int(state.get('d') or 0)
+    except (ValueError, TypeError, AttributeError, IndexError, UnicodeError):
+        raise SyncError('مکان نما نامعتبر است')
+
+
+def changed_rows(entity, company, after, until, limit):
+    """تغییرات یک موجودیت به ترتیب (updated_at, id) از نمایه (company, updated_at)"""
+    rows = entity.model.objects.filter(company=company, updated_at__lte=until)
+    if after:
+        updated_at, object_id = after
+        rows = rows.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=object_id))
+    return list(
+        rows.order_by('updated_at', 'id').values_list(*[path for _, path in entity.columns])[:limit]
+    )
+
+
+def tombstones(company, after_id, limit):
+    """حذف‌ها از روی سوابق DELETE تاریخچه تغییرات"""
+    return list(
+        AuditLog.objects
+        .filter(company=company, action=AuditLog.DELETE, object_type__in=list(ENTITY_BY_TYPE), id__gt=after_id)
+        .order_by('id')
+        .values_list('id', 'object_type', 'object_id')[:limit]
+    )
+
+
+def changes_since(company, cursor=None, limit=DEFAULT_PAGE_SIZE, now=None):
+    """
+    تغییرات شرکت از مکان نمای کلاینت
+    هر موجودیت یک کوئری با حداکثر limit رکورد؛ اگر هر کدام پر باشد has_more برقرار است
+    و کلاینت با مکان نمای جدید دوباره درخواست می‌دهد
+    بدون مکان نما: همگام‌سازی کامل اولیه (بدون حذف‌ها)
+    """
+    until = (now or timezone.now()) - timedelta(seconds=settle_seconds())
+    if cursor:
+        positions, deleted_after = decode_cursor(cursor)
+    else:
+        # حذف‌های قبل از شروع همگام‌سازی اولیه برای کلاینت اهمیتی ندارند
+        positions = {}
+        deleted_after = AuditLog.objects.filter(company=company).aggregate(value=Max('id'))['value'] or 0
+
+    has_more = False
+    entities = {}
+    new_positions = dict(positions)
+    for entity in ENTITIES:
+        rows = changed_rows(entity, company, positions.get(entity.name), until, limit)
+        if len(rows) == limit:
+            has_more = True
+        if rows:
+            updated_index = len(entity.columns) - 1
+            new_positions[entity.name] = (rows[-1][updated_index], rows[-1][0])
+        entities[entity.name] = {
+            'columns': [name for name, _ in entity.columns],
+            'rows': rows,
+        }
+
+    deleted = {entity.name: [] for entity in ENTITIES}
+    removed = tombstones(company, deleted_after, limit) if cursor else []
+    if len(removed) == limit:
+        has_more = True
+    for entry_id, object_type, object_id in removed:
+        deleted[ENTITY_BY_TYPE[object_type].name].append(object_id)
+        deleted_after = entry_id
+
+    return {
+        'entities': entities,
+        'deleted': deleted,
+        'has_more': has_more,
+        'cursor': encode_cursor({
+            'e': {
+                name: [updated_at.isoformat(), str(object_id)]
+                for name, (updated_at, object_id) in new_positions.items()
+            },
+            'd': deleted_after,
+        }),
+    }
+
+
+# ==================== ارسال عملیات آفلاین ====================
+
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _create(company, user, member_id, model, form_class, object_id, data, existing):
+    """ایجاد یک شی با شناسه تولید شده در کلاینت؛ تکرار همان عملیات نتیجه exists دارد"""
+    if object_id in existing:
+        if existing[object_id] != company.id:
+            return {'result': 'error', 'error': 'این شناسه متعلق به شرکت دیگری است'}
+        return {'result': 'exists'}
+
+    if model is Incident and member_id:
+        # مانند فرم وب، عضو جاری گزارش‌دهنده ثبت می‌شود
+        data = {**data, 'reporter': str(member_id)}
+    form = form_class(data, company=company)
+    if not form.is_valid():
+        return {'result': 'error', 'errors': form.errors.get_json_data()}
+
+    instance = form.save(commit=False)
+    instance.id = object_id
+    instance.company = company
+    if model is not Incident:
+        instance.created_by = user
+
+    try:
+        with transaction.atomic():
+            instance.save(force_insert=True)
+    except IntegrityError:
+        # همان عملیات هم‌زمان از درخواست دیگری ثبت شده است
+        return {'result': 'exists'}
+    existing[object_id] = company.id
+    return {'result': 'created'}
+
+
+def _transition(company, user, model, object_id, target):
+    current = model.objects.filter(company=company, id=object_id).values_list('status', flat=True).first()
+    if current is None:
+        return {'result': 'error', 'error': 'مورد یافت نشد'}
+    if current == target:
+        return {'result': 'unchanged'}
+    try:
+        status_service.bulk_transition(model, company, [object_id], target, user)
+    except status_service.TransitionError as error:
+        return {'result': 'error', 'error': str(error)}
+    current = model.objects.filter(id=object_id).values_list('status', flat=True).first()
+    if current != target:
+        return {'result': 'error', 'error': 'این تغییر وضعیت مجاز نیست'}
+    return {'result': 'updated'}
+
+
+def apply_operations(company, user, operations):
+    """
+    اعمال صف عملیات آفلاین به ترتیب ارسال
+    operations: [{'op': 'create', 'type', 'id', 'data'} | {'op': 'status', 'type', 'id', 'status'}]
+    شناسه‌های موجود هر نوع با یک کوئری خوانده می‌شوند؛ هر عملیات تراکنش جداگانه دارد
+    تا خطای یک مورد بقیه صف را متوقف نکند
+    خروجی: لیست نتیجه هر عملیات به همان ترتیب
+    """
+    if not isinstance(operations, list):
+        raise SyncError('لیست عملیات نامعتبر است')
+    if len(operations) > MAX_UPLOAD_OPERATIONS:
+        raise SyncError(f'حداکثر {MAX_UPLOAD_OPERATIONS} عملیات در هر درخواست مجاز است')
+
+    creates = {}
+    for operation in operations:
+        if isinstance(operation, dict) and operation.get('op') == 'create' and operation.get('type') in CREATABLE:
+            object_id = _parse_uuid(operation.get('id'))
+            if object_id:
+                creates.setdefault(operation['type'], set()).add(object_id)
+
+    existing = {}
+    for object_type, ids in creates.items():
+        model = CREATABLE[object_type][0]
+        existing[object_type] = dict(model.objects.filter(id__in=ids).values_list('id', 'company_id'))
+
+    member_id = None
+    if 'incident' in creates:
+        member_id = CompanyMember.objects.filter(company=company, user=user).values_list('id', flat=True).first()
+
+    results = []
+    for operation in operations:
+        if not isinstance(operation, dict):
+            results.append({'id': None, 'result': 'error', 'error': 'عملیات نامعتبر است'})
+            continue
+        object_type = operation.get('type')
+        object_id = _parse_uuid(operation.get('id'))
+        result = {'id': str(object_id) if object_id else operation.get('id'), 'type': object_type}
+
+        if object_id is None:
+            result.update(result='error', error='شناسه نامعتبر است')
+        elif operation.get('op') == 'create' and object_type in CREATABLE:
+            model, form_class = CREATABLE[object_type]
+            data = operation.get('data') if isinstance(operation.get('data'), dict) else {}
+            result.update(_create(company, user, member_id, model, form_class, object_id, data, existing[object_type]))
+        elif operation.get('op') == 'status' and object_type in TRANSITIONABLE:
+            result.update(_transition(company, user, TRANSITIONABLE[object_type], object_id, operation.get('status')))
+        else:
+            result.update(result='error', error='نوع عملیات پشتیبانی نمی‌شود')
+        results.append(result)
+    return results
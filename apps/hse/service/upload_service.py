@@ -0,0 +1,309 @@
+import base64
+import binascii
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import ChunkedUpload, MediaBlob, Training
+from ..storage import blob_name
+
+
+# فایل‌های نیمه‌کاره زیر این مسیر از MEDIA_ROOT نگهداری می‌شوند
+PARTIAL_UPLOAD_DIR = 'uploads/partial'
+
+# اندازه بلوک خواندن بدنه درخواست و محاسبه چک‌سام
+READ_BLOCK_SIZE = 1024 * 1024
+
+CHUNKED_UPLOAD_FIELDS = [field for field, _ in ChunkedUpload.FIELD_CHOICES]
+
+# کد وضعیت پروتکل tus برای عدم تطابق چک‌سام تکه
+STATUS_CHECKSUM_MISMATCH = 460
+
+
+class UploadError(Exception):
+    """خطای آپلود همراه با کد وضعیت HTTP"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.offset = offset
+
+
+def max_upload_size():
+    return getattr(settings, 'HSE_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+
+
+def max_chunk_size():
+    return getattr(settings, 'HSE_UPLOAD_MAX_CHUNK_SIZE', 16 * 1024 ** 2)
+
+
+def upload_expiry_hours():
+    return getattr(settings, 'HSE_UPLOAD_EXPIRY_HOURS', 72)
+
+
+def partial_path(upload):
+    """مسیر فایل نیمه‌کاره روی دیسک"""
+    return default_storage.path(f'{PARTIAL_UPLOAD_DIR}/{upload.id}.part')
+
+
+def company_has_blob(company_id, name):
+    """
+    آیا آموزش‌های همین شرکت به blob ارجاع دارند
+    رد شدن از ارسال داده فقط با داشتن هش کافی نیست؛ در غیر این صورت هر کسی که هش فایل شرکت
+    دیگری را بداند می‌تواند آن را به آموزش خود وصل کند
+    """
+    return Training.objects.filter(company_id=company_id).filter(Q(video=name) | Q(attachment=name)).exists()
+
+
+def create_upload(company, user, field, filename, total_size, checksum='', training=None):
+    """ایجاد آپلود جدید و فایل خالی آن"""
+    if field not in CHUNKED_UPLOAD_FIELDS:
+        raise UploadError('نوع فایل نامعتبر است')
+
+    filename = os.path.basename(str(filename or '').replace('\\', '/')).strip()
+    if not filename:
+        raise UploadError('نام فایل الزامی است')
+
+    try:
+        total_size = int(total_size)
+    except (TypeError, ValueError):
+        raise UploadError('حجم فایل نامعتبر است')
+    if total_size < 0:
+        raise UploadError('حجم فایل نامعتبر است')
+    if total_size > max_upload_size():
+        raise UploadError('حجم فایل بیش از حد مجاز است', status=413)
+
+    checksum = (checksum or '').strip().lower()
+    if checksum and (len(checksum) != 64 or any(char not in '0123456789abcdef' for char in checksum)):
+        raise UploadError('چک‌سام باید SHA-256 به صورت hex باشد')
+
+    # اگر همین محتوا قبلاً در آموزش‌های همین شرکت ذخیره شده باشد آپلود بلافاصله تکمیل می‌شود
+    name = blob_name(checksum, filename) if checksum else None
+    if (
+        name
+        and MediaBlob.objects.filter(name=name, size=total_size).exists()
+        and company_has_blob(company.id, name)
+    ):
+        return ChunkedUpload.objects.create(
+            company=company,
+            created_by=user,
+            training=training,
+            field=field,
+            filename=filename[:255],
+            total_size=total_size,
+            offset=total_size,
+            checksum=checksum,
+            status='COMPLETED',
+            completed_at=timezone.now(),
+        )
+
+    upload = ChunkedUpload.objects.create(
+        company=company,
+        created_by=user,
+        training=training,
+        field=field,
+        filename=filename[:255],
+        total_size=total_size,
+        checksum=checksum,
+    )
+
+    path = partial_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def parse_chunk_checksum(header):
+    """
+    تجزیه هدر Upload-Checksum به شکل tus: 'sha256 <base64>'
+    خروجی: digest باینری یا None
+    """
+    if not header:
+        return None
+    try:
+        algorithm, value = header.split(None, 1)
+        if algorithm.lower() != 'sha256':
+            raise ValueError(algorithm)
+        return base64.b64decode(value.strip(), validate=True)
+    except (ValueError, binascii.Error):
+        raise UploadError('هدر Upload-Checksum نامعتبر است')
+
+
+def append_chunk(upload_id, offset, stream, length, chunk_checksum=None):
+    """
+    افزودن یک تکه به انتهای فایل نیمه‌کاره
+    بدنه درخواست بلوک به بلوک مستقیماً روی دیسک نوشته می‌شود؛ اگر چک‌سام تکه
+    مطابقت نداشته باشد فایل به offset قبلی برگردانده می‌شود
+    خروجی: آپلود با offset جدید
+    """
+    if length is None or length < 0:
+        raise UploadError('هدر Content-Length الزامی است', status=411)
+    if length > max_chunk_size():
+        raise UploadError('حجم تکه بیش از حد مجاز است', status=413)
+
+    with transaction.atomic():
+        # قفل ردیف تا دو درخواست هم‌زمان روی یک آپلود ننویسند
+        upload = ChunkedUpload.objects.select_for_update().get(id=upload_id)
+
+        if upload.status != 'UPLOADING':
+            raise UploadError('این آپلود قابل ادامه نیست', status=409, offset=upload.offset)
+        if offset != upload.offset:
+            raise UploadError('offset با وضعیت سرور مطابقت ندارد', status=409, offset=upload.offset)
+        if upload.offset + length > upload.total_size:
+            raise UploadError('حجم تکه از حجم اعلام شده فایل بیشتر است', status=413, offset=upload.offset)
+
+        digest = hashlib.sha256()
+        received = 0
+        with open(partial_path(upload), 'r+b') as file:
+            file.seek(upload.offset)
+            try:
+                while received < length:
+                    block = stream.read(min(READ_BLOCK_SIZE, length - received))
+                    if not block:
+                        break
+                    file.write(block)
+                    digest.update(block)
+                    received += len(block)
+
+                if chunk_checksum is not None and digest.digest() != chunk_checksum:
+                    raise UploadError(
+                        'چک‌سام تکه مطابقت ندارد',
+                        status=STATUS_CHECKSUM_MISMATCH,
+                        offset=upload.offset
+                    )
+            except Exception:
+                file.truncate(upload.offset)
+                raise
+
+            # قطع اتصال وسط تکه: بخش دریافت شده نگه داشته می‌شود تا کلاینت از همان‌جا ادامه دهد
+            file.truncate(upload.offset + received)
+
+        upload.offset += received
+        upload.save(update_fields=['offset', 'updated_at'])
+        return upload
+
+
+def complete_upload(upload):
+    """بررسی حجم و چک‌سام کل فایل و تکمیل آپلود"""
+    if upload.status == 'COMPLETED':
+        return upload
+    if upload.status != 'UPLOADING':
+        raise UploadError('این آپلود قابل تکمیل نیست', status=409)
+    if upload.offset != upload.total_size:
+        raise UploadError('فایل به طور کامل دریافت نشده است', status=409, offset=upload.offset)
+
+    path = partial_path(upload)
+    if os.path.getsize(path) != upload.total_size:
+        raise UploadError('حجم فایل روی سرور با حجم اعلام شده مطابقت ندارد', status=409)
+
+    if upload.checksum:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(READ_BLOCK_SIZE), b''):
+                digest.update(block)
+        if digest.hexdigest() != upload.checksum:
+            raise UploadError('چک‌سام فایل مطابقت ندارد', status=STATUS_CHECKSUM_MISMATCH)
+
+    upload.status = 'COMPLETED'
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['status', 'completed_at', 'updated_at'])
+    return upload
+
+
+def attach_upload(upload, training):
+    """
+    اتصال فایل تکمیل شده به فیلد آموزش
+    فایل فقط برای هش خوانده و به مخزن blob جابه‌جا (rename) می‌شود و دوباره کپی نمی‌شود
+    """
+    if upload.status != 'COMPLETED':
+        raise UploadError('آپلود هنوز تکمیل نشده است', status=409)
+    if upload.company_id != training.company_id:
+        raise UploadError('آپلود متعلق به این شرکت نیست', status=403)
+
+    storage = Training._meta.get_field(upload.field).storage
+    path = partial_path(upload)
+    if os.path.exists(path):
+        name = storage.save_existing(path, upload.filename)
+    else:
+        # تکمیل شده بدون دریافت داده: محتوا از قبل در مخزن موجود است
+        name = blob_name(upload.checksum, upload.filename)
+        if not MediaBlob.objects.filter(name=name).exists() or not company_has_blob(training.company_id, name):
+            raise UploadError('فایل آپلود شده یافت نشد', status=409)
+
+    setattr(training, upload.field, name)
+    training.save(update_fields=[upload.field, 'updated_at'])
+
+    upload.training = training
+    upload.status = 'ATTACHED'
+    upload.save(update_fields=['training', 'status', 'updated_at'])
+    return training
+
+
+def attach_form_uploads(data, training, user):
+    """
+    اتصال آپلودهای تکه‌ای که شناسه آن‌ها در فرم ایجاد/ویرایش آموزش
+    با نام‌های video_upload و attachment_upload ارسال شده است
+    """
+    for field in CHUNKED_UPLOAD_FIELDS:
+        upload_id = data.get(f'{field}_upload')
+        if not upload_id:
+            continue
+        try:
+            upload = ChunkedUpload.objects.get(
+                id=upload_id,
+                company_id=training.company_id,
+                created_by=user,
+                field=field
+            )
+        except (ChunkedUpload.DoesNotExist, ValueError):
+            continue
+        if upload.status == 'UPLOADING' and upload.offset == upload.total_size:
+            complete_upload(upload)
+        attach_upload(upload, training)
+
+
+def cancel_upload(upload):
+    """لغو آپلود و حذف فایل نیمه‌کاره"""
+    if upload.status not in ('UPLOADING', 'COMPLETED'):
+        raise UploadError('این آپلود قابل لغو نیست', status=409)
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
+    upload.status = 'CANCELLED'
+    upload.save(update_fields=['status', 'updated_at'])
+    return upload
+
+
+def expire_uploads(cutoff, batch_size=500, dry_run=False):
+    """
+    حذف دسته‌ای آپلودهای رها شده (متصل نشده به آموزش) که از cutoff تغییری نداشته‌اند و فایل نیمه‌کاره آن‌ها
+    خروجی: تعداد آپلودهای حذف شده
+    """
+    removed = 0
+    abandoned = ChunkedUpload.objects.filter(updated_at__lt=cutoff).exclude(status='ATTACHED')
+    last_id = None
+    while True:
+        batch = abandoned.filter(id__gt=last_id) if last_id else abandoned
+        ids = list(batch.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        last_id = ids[-1]
+
+        if not dry_run:
+            # شرط دوباره روی updated_at: تکه‌ای که در این فاصله رسیده آپلود را زنده نگه می‌دارد
+            abandoned.filter(id__in=ids).delete()
+            kept = set(ChunkedUpload.objects.filter(id__in=ids).values_list('id', flat=True))
+            ids = [upload_id for upload_id in ids if upload_id not in kept]
+            for upload_id in ids:
+                try:
+                    os.remove(default_storage.path(f'{PARTIAL_UPLOAD_DIR}/{upload_id}.part'))
+                except FileNotFoundError:
+                    pass
+        removed += len(ids)
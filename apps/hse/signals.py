@@ -0,0 +1,193 @@
+# apps/hse/signals.py
+from collections import Counter
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    AuditLog, CompanyDepartment, CompanyMember, Incident, IncidentRollup, MediaBlob, Training,
+    TrainingParticipation,
+)
+from .service import audit_service, duplicate_service, hotspot_service, rollup_service, sync_service
+from .service.compliance_service import bump_company_version, training_company_id
+from .storage import is_blob_name
+
+
+TRAINING_MEDIA_FIELDS = ('video', 'attachment')
+
+
+def _media_names(values):
+    return Counter(name for name in values if is_blob_name(name))
+
+
+def _apply_blob_refs(added, removed):
+    """اعمال تغییر تعداد ارجاع blobها؛ هر مقدار تغییر با یک UPDATE"""
+    deltas = Counter(added)
+    deltas.subtract(removed)
+
+    by_delta = {}
+    for name, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(name)
+
+    now = timezone.now()
+    for delta, names in by_delta.items():
+        blobs = MediaBlob.objects.filter(name__in=names)
+        if delta < 0:
+            # جلوگیری از منفی شدن شمارنده در صورت ناهمخوانی قبلی
+            blobs = blobs.filter(ref_count__gte=-delta)
+        blobs.update(ref_count=F('ref_count') + delta, updated_at=now)
+
+
+@receiver(pre_save, sender=Training)
+def remember_training_media(sender, instance, **kwargs):
+    """نگه داشتن نام فایل‌های قبلی آموزش برای محاسبه تغییر ارجاع‌ها"""
+    old = None
+    if not instance._state.adding:
+        old = Training.objects.filter(pk=instance.pk).values_list(*TRAINING_MEDIA_FIELDS).first()
+    instance._old_media_names = _media_names(old or ())
+
+
+@receiver(post_save, sender=Training)
+def update_training_media_refs(sender, instance, **kwargs):
+    new = _media_names(getattr(instance, field).name for field in TRAINING_MEDIA_FIELDS)
+    old = getattr(instance, '_old_media_names', Counter())
+    if new != old:
+        _apply_blob_refs(new, old)
+    instance._old_media_names = new
+
+
+@receiver(post_delete, sender=Training)
+def release_training_media_refs(sender, instance, **kwargs):
+    _apply_blob_refs(
+        Counter(),
+        _media_names(getattr(instance, field).name for field in TRAINING_MEDIA_FIELDS)
+    )
+
+
+@receiver(post_save, sender=Training)
+@receiver(post_delete, sender=Training)
+@receiver(post_save, sender=CompanyMember)
+@receiver(post_delete, sender=CompanyMember)
+def invalidate_compliance_matrix(sender, instance, **kwargs):
+    bump_company_version(instance.company_id)
+
+
+@receiver(post_save, sender=TrainingParticipation)
+@receiver(post_delete, sender=TrainingParticipation)
+def invalidate_compliance_matrix_for_participation(sender, instance, **kwargs):
+    # بدون بارگذاری آموزش برای هر حضور (حذف گروهی حضورها)
+    company_id = training_company_id(instance.training_id)
+    if company_id:
+        bump_company_version(company_id)
+
+
+# ==================== تاریخچه تغییرات ====================
+
+def remember_audit_snapshot(sender, instance, **kwargs):
+    """مقادیر بارگذاری شده نمونه برای محاسبه تفاوت در زمان ذخیره (بدون کوئری)"""
+    instance._audit_snapshot = audit_service.snapshot(instance)
+
+
+def record_audit_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = audit_service.snapshot(instance)
+    if created:
+        changes = audit_service.created_changes(sender, current)
+        action = AuditLog.CREATE
+    else:
+        changes = audit_service.diff(sender, getattr(instance, '_audit_snapshot', {}), current)
+        action = AuditLog.UPDATE
+
+    instance._audit_snapshot = current
+    if changes or created:
+        audit_service.record_instance(instance, action, changes)
+
+
+def record_audit_delete(sender, instance, **kwargs):
+    audit_service.record_instance(instance, AuditLog.DELETE, {})
+
+
+for audited_model in audit_service.AUDITED_MODELS:
+    post_init.connect(remember_audit_snapshot, sender=audited_model, dispatch_uid=f'audit_init_{audited_model.__name__}')
+    post_save.connect(record_audit_save, sender=audited_model, dispatch_uid=f'audit_save_{audited_model.__name__}')
+    post_delete.connect(record_audit_delete, sender=audited_model, dispatch_uid=f'audit_delete_{audited_model.__name__}')
+
+
+# ==================== همگام‌سازی ====================
+
+SYNC_SET_NULL_REFERENCES = sync_service.set_null_references()
+
+
+def touch_set_null_references(sender, instance, **kwargs):
+    """
+    ردیف‌های همگامی که با حذف این شی خالی می‌شوند پیش از حذف updated_at تازه می‌گیرند؛
+    SET NULL با update() بدون auto_now انجام می‌شود و در غیر این صورت به کلاینت‌ها نمی‌رسد
+    """
+    now = timezone.now()
+    for model, field in SYNC_SET_NULL_REFERENCES[sender]:
+        model.objects.filter(**{field: instance}).update(updated_at=now)
+
+
+for referenced_model in SYNC_SET_NULL_REFERENCES:
+    pre_delete.connect(
+        touch_set_null_references, sender=referenced_model, dispatch_uid=f'sync_set_null_{referenced_model.__name__}'
+    )
+
+
+# ==================== خلاصه آماری حوادث ====================
+
+@receiver(post_init, sender=Incident)
+def remember_rollup_key(sender, instance, **kwargs):
+    instance._rollup_key = None if instance._state.adding else rollup_service.key_of(instance)
+
+
+@receiver(pre_save, sender=Incident)
+def load_rollup_key(sender, instance, raw=False, **kwargs):
+    # نمونه‌ای که با only() بارگذاری شده کلید قبلی ندارد؛ مقدار ذخیره شده خوانده می‌شود
+    if not raw and not instance._state.adding and instance._rollup_key is None:
+        instance._rollup_key = rollup_service.stored_key(instance.pk)
+
+
+@receiver(post_save, sender=Incident)
+def update_incident_rollup(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    key = rollup_service.key_of(instance)
+    if key is None:
+        key = rollup_service.stored_key(instance.pk)
+    rollup_service.record_change(None if created else instance._rollup_key, key)
+    instance._rollup_key = key
+
+
+@receiver(post_save, sender=Incident)
+def record_incident_location(sender, instance, created, raw=False, **kwargs):
+    # خلاصه کانون‌ها با ایجاد و حذف حوادث به‌روز می‌شود؛ ویرایش محل با rebuild_location_hotspots اعمال می‌شود
+    if created and not raw:
+        hotspot_service.record([instance])
+
+
+@receiver(post_delete, sender=Incident)
+def remove_incident_location(sender, instance, **kwargs):
+    hotspot_service.remove([instance])
+
+
+@receiver(post_save, sender=Incident)
+def index_incident_signature(sender, instance, raw=False, **kwargs):
+    # نمونه‌ای که متن آن بارگذاری نشده (only) متنش هم تغییر نکرده است
+    if not raw and all(field in instance.__dict__ for field in duplicate_service.TEXT_FIELDS):
+        duplicate_service.index([instance])
+
+
+@receiver(post_delete, sender=Incident)
+def remove_from_incident_rollup(sender, instance, **kwargs):
+    rollup_service.record_change(instance._rollup_key or rollup_service.key_of(instance), None)
+
+
+@receiver(post_delete, sender=CompanyDepartment)
+def detach_incident_rollup_department(sender, instance, **kwargs):
+    # حوادث بخش حذف شده بدون سیگنال (SET NULL) به "بدون بخش" منتقل شده‌اند؛ خلاصه هم همین‌طور
+    IncidentRollup.objects.filter(department_id=instance.pk).update(department=None)
@@ -0,0 +1,113 @@
+# apps/hse/storage.py
+"""
+ذخیره‌سازی آدرس‌دهی شده با محتوا برای فایل‌های آموزش
+هر فایل هنگام دریافت هش (SHA-256) می‌شود و فقط یک بار با نام هش خود
+زیر blobs/ ذخیره می‌شود؛ آپلود دوباره همان فیلم یا PDF فضای جدیدی نمی‌گیرد
+"""
+import hashlib
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+
+BLOB_DIR = 'blobs'
+TMP_DIR = f'{BLOB_DIR}/tmp'
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def blob_name(digest, filename):
+    """نام فایل blob: blobs/ab/<digest>.<ext>"""
+    extension = os.path.splitext(filename)[1].lower()[:16]
+    return f'{BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(f'{BLOB_DIR}/') and not name.startswith(f'{TMP_DIR}/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    ذخیره‌ساز فایل با حذف نسخه‌های تکراری
+    نام ورودی فقط برای پسوند و نام اصلی استفاده می‌شود و نام نهایی از هش محتوا ساخته می‌شود
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # نام نهایی در _save از هش ساخته می‌شود؛ نیازی به بررسی تکراری بودن نام نیست
+        return name
+
+    def _save(self, name, content):
+        tmp_path = self.path(f'{TMP_DIR}/{uuid.uuid4().hex}')
+        os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+
+        # هش و نوشتن هم‌زمان در یک عبور روی محتوا
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+        return self.store_path(tmp_path, name, digest.hexdigest(), size)
+
+    def save_existing(self, path, name):
+        """
+        انتقال فایلی که از قبل روی دیسک است (مثلاً آپلود تکه‌ای) به مخزن blob
+        فایل فقط برای هش خوانده می‌شود و سپس جابه‌جا یا در صورت تکراری بودن حذف می‌شود
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(READ_BLOCK_SIZE), b''):
+                digest.update(block)
+                size += len(block)
+        return self.store_path(path, name, digest.hexdigest(), size)
+
+    def store_path(self, path, name, digest, size):
+        """ثبت blob با هش مشخص؛ فایل path جابه‌جا یا حذف می‌شود"""
+        from .models import MediaBlob
+
+        target_name = blob_name(digest, name)
+        target_path = self.path(target_name)
+
+        if os.path.exists(target_path):
+            # محتوای تکراری: نسخه موجود استفاده می‌شود
+            self._remove(path)
+        else:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            os.replace(path, target_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(target_path, self.file_permissions_mode)
+
+        blob, created = MediaBlob.objects.get_or_create(
+            name=target_name,
+            defaults={
+                'digest': digest,
+                'size': size,
+                'original_name': os.path.basename(name)[:255],
+            }
+        )
+        if not created:
+            # تمدید مهلت تا GC این blob را پیش از ثبت ارجاع جدید حذف نکند
+            MediaBlob.objects.filter(pk=blob.pk).update(updated_at=timezone.now())
+
+        return target_name
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+training_media_storage = ContentAddressedStorage()
@@ -1,3 +1,474 @@
-from django.test import TestCase
+import random
+from collections import Counter
+from datetime import date, datetime, timedelta
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.user.model.user import CustomUser
+from .models import (
+    AuditLog, ChecklistItem, ChecklistResponse, ChecklistTemplate, Company, CompanyMember, Incident,
+    IncidentSignature, Inspection, InspectionSchedule, LocationSketch, Training, TrainingParticipation,
+)
+from .service import (
+    benchmark_service, checklist_service, duplicate_service, hotspot_service, import_service,
+    inspection_schedule_service, roster_service, schedule_service,
+)
+
+
+def schedule(frequency, start_date, interval=1, weekdays='', end_date=None):
+    return InspectionSchedule(
+        frequency=frequency, start_date=start_date, interval=interval, weekdays=weekdays, end_date=end_date
+    )
+
+
+def occurrences(item, start, end):
+    return list(inspection_schedule_service.occurrences(item, start, end))
+
+
+class ScheduleOccurrencesTests(SimpleTestCase):
+    """رخدادهای برنامه‌های دوره‌ای بازرسی"""
+
+    def test_first_occurrence_is_start_date(self):
+        item = schedule('DAILY', date(2026, 1, 10), interval=3)
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 1), date(2026, 1, 16)),
+            [date(2026, 1, 10), date(2026, 1, 13), date(2026, 1, 16)]
+        )
+
+    def test_daily_interval_is_anchored_to_start_date(self):
+        item = schedule('DAILY', date(2026, 1, 1), interval=2)
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 4), date(2026, 1, 10)),
+            [date(2026, 1, 5), date(2026, 1, 7), date(2026, 1, 9)]
+        )
+
+    def test_weekly_keeps_start_weekday(self):
+        item = schedule('WEEKLY', date(2026, 1, 1))
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 2), date(2026, 1, 20)),
+            [date(2026, 1, 8), date(2026, 1, 15)]
+        )
+
+    def test_monthly_clamps_to_month_end_without_drift(self):
+        item = schedule('MONTHLY', date(2026, 1, 31))
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 1), date(2026, 5, 31)),
+            [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30), date(2026, 5, 31)]
+        )
+
+    def test_monthly_clamps_to_leap_day(self):
+        item = schedule('MONTHLY', date(2028, 1, 31))
+        self.assertEqual(occurrences(item, date(2028, 2, 1), date(2028, 2, 29)), [date(2028, 2, 29)])
+
+    def test_monthly_interval_starts_mid_cycle(self):
+        item = schedule('MONTHLY', date(2025, 11, 30), interval=3)
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 1), date(2026, 12, 31)),
+            [date(2026, 2, 28), date(2026, 5, 30), date(2026, 8, 30), date(2026, 11, 30)]
+        )
+
+    def test_custom_weekdays_skip_days_before_start(self):
+        # ۷ ژانویه ۲۰۲۶ چهارشنبه است؛ دوشنبه همان هفته قبل از شروع برنامه است
+        item = schedule('CUSTOM', date(2026, 1, 7), weekdays='0,2')
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 1), date(2026, 1, 14)),
+            [date(2026, 1, 7), date(2026, 1, 12), date(2026, 1, 14)]
+        )
+
+    def test_custom_interval_is_anchored_to_start_week(self):
+        item = schedule('CUSTOM', date(2026, 1, 7), interval=2, weekdays='0,2')
+        # پنجره از هفته فرد (بیرون از چرخه) شروع می‌شود و به هفته بعدی چرخه می‌رود
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 12), date(2026, 2, 4)),
+            [date(2026, 1, 19), date(2026, 1, 21), date(2026, 2, 2), date(2026, 2, 4)]
+        )
+
+    def test_custom_without_weekdays_has_no_occurrences(self):
+        self.assertEqual(occurrences(schedule('CUSTOM', date(2026, 1, 1)), date(2026, 1, 1), date(2026, 3, 1)), [])
+
+    def test_end_date_limits_window(self):
+        item = schedule('DAILY', date(2026, 1, 1), end_date=date(2026, 1, 3))
+        self.assertEqual(
+            occurrences(item, date(2026, 1, 1), date(2026, 1, 31)),
+            [date(2026, 1, 1), date(2026, 1, 2), date(2026, 1, 3)]
+        )
+        self.assertEqual(occurrences(item, date(2026, 1, 4), date(2026, 1, 31)), [])
+
+
+class ScheduleMaterializeTests(TestCase):
+    """ساخت بازرسی‌های برنامه دوره‌ای"""
+
+    def setUp(self):
+        user = CustomUser.objects.create(mobileNumber='09120000003')
+        company = Company.objects.create(user=user, name='شرکت', activity_field='نفت')
+        self.schedule = InspectionSchedule.objects.create(
+            company=company, title='بازرسی روزانه', frequency='DAILY', start_date=date(2026, 1, 1)
+        )
+
+    def test_counts_only_inserted_occurrences(self):
+        today = date(2026, 1, 1)
+        self.assertEqual(inspection_schedule_service.materialize([self.schedule], today, days=4), 5)
+
+        # بازسازی از ابتدا: تاریخ‌های موجود با ignore_conflicts رد می‌شوند و شمرده نمی‌شوند
+        self.schedule.generated_until = None
+        self.assertEqual(inspection_schedule_service.materialize([self.schedule], today, days=6), 2)
+        self.assertEqual(Inspection.objects.filter(schedule=self.schedule).count(), 7)
+
+
+def interval(kind, object_id, start, minutes, members):
+    start = datetime(2026, 1, 1) + timedelta(minutes=start)
+    return schedule_service.Interval(
+        start, start + timedelta(minutes=minutes), kind, object_id, str(object_id), frozenset(members)
+    )
+
+
+def brute_force_conflicts(intervals):
+    pairs = {}
+    for index, first in enumerate(intervals):
+        for second in intervals[index + 1:]:
+            shared = first.members & second.members
+            if shared and first.start < second.end and second.start < first.end \
+                    and schedule_service.is_conflict(first, second):
+                first_item, second_item = sorted(
+                    (first, second), key=lambda item: (item.start, schedule_service.interval_key(item))
+                )
+                key = (schedule_service.interval_key(first_item), schedule_service.interval_key(second_item))
+                pairs[key] = (first_item, second_item, set(shared))
+    return pairs
+
+
+class ScheduleConflictTests(SimpleTestCase):
+    """نمایه بازه‌ها و تشخیص تداخل جلسات"""
+
+    TRAINING = schedule_service.KIND_TRAINING
+    INSPECTION = schedule_service.KIND_INSPECTION
+
+    def random_intervals(self, count, seed):
+        generator = random.Random(seed)
+        return [
+            interval(
+                generator.choice([self.TRAINING, self.TRAINING, self.INSPECTION]),
+                number,
+                generator.randrange(0, 5000),
+                generator.randrange(1, 400),
+                generator.sample(range(8), generator.randrange(1, 4)),
+            )
+            for number in range(count)
+        ]
+
+    def test_touching_intervals_do_not_overlap(self):
+        first = interval(self.TRAINING, 1, 0, 60, [1])
+        second = interval(self.TRAINING, 2, 60, 60, [1])
+        index = schedule_service.IntervalIndex([first, second])
+        self.assertEqual(index.overlapping(1, second.start, second.end), [second])
+        self.assertEqual(schedule_service.sweep_conflicts([first, second]), {})
+
+    def test_long_interval_found_behind_short_ones(self):
+        long_item = interval(self.TRAINING, 1, 0, 1000, [1])
+        short_items = [interval(self.TRAINING, number, number * 10, 5, [1]) for number in range(2, 20)]
+        index = schedule_service.IntervalIndex([long_item] + short_items)
+        query = interval(self.TRAINING, 99, 900, 10, [1])
+        self.assertEqual(index.overlapping(1, query.start, query.end), [long_item])
+        self.assertEqual(index.overlapping(2, query.start, query.end), [])
+
+    def test_overlapping_matches_brute_force(self):
+        intervals = self.random_intervals(300, seed=1)
+        index = schedule_service.IntervalIndex(intervals)
+        generator = random.Random(2)
+        for _ in range(200):
+            query = interval(self.TRAINING, 'q', generator.randrange(0, 5000), generator.randrange(1, 400), [])
+            member = generator.randrange(8)
+            expected = {
+                item.object_id for item in intervals
+                if member in item.members and item.start < query.end and query.start < item.end
+            }
+            found = {item.object_id for item in index.overlapping(member, query.start, query.end)}
+            self.assertEqual(found, expected)
+
+    def test_conflicts_report_shared_members_and_skip_self(self):
+        first = interval(self.TRAINING, 1, 0, 120, [1, 2, 3])
+        second = interval(self.TRAINING, 2, 60, 120, [2, 3, 4])
+        index = schedule_service.IntervalIndex([first, second])
+        self.assertEqual(index.conflicts(first), [(second, {2, 3})])
+
+    def test_same_day_inspections_do_not_conflict(self):
+        first = interval(self.INSPECTION, 1, 0, 24 * 60, [1])
+        second = interval(self.INSPECTION, 2, 0, 24 * 60, [1])
+        training = interval(self.TRAINING, 3, 600, 60, [1])
+        pairs = schedule_service.sweep_conflicts([first, second, training])
+        self.assertEqual(set(pairs), {(('inspection', '1'), ('training', '3')), (('inspection', '2'), ('training', '3'))})
+
+    def test_sweep_matches_brute_force(self):
+        intervals = self.random_intervals(400, seed=3)
+        self.assertEqual(schedule_service.sweep_conflicts(intervals), brute_force_conflicts(intervals))
+
+
+class HotspotSketchTests(SimpleTestCase):
+    """خلاصه Space-Saving محل حوادث"""
+
+    def assert_bounds(self, counters, floor, truth):
+        for key, true_count in truth.items():
+            if key in counters:
+                count, error, _ = counters[key]
+                self.assertLessEqual(count - error, true_count)
+                self.assertLessEqual(true_count, count)
+            else:
+                self.assertLessEqual(true_count, floor)
+
+    def test_eviction_inherits_smallest_count_as_error(self):
+        counters = {}
+        for key in ['a', 'a', 'a', 'b', 'b']:
+            self.assertEqual(hotspot_service.add_occurrence(counters, key, key, 2), 0)
+        self.assertEqual(hotspot_service.add_occurrence(counters, 'c', 'c', 2), 2)
+        self.assertEqual(counters, {'a': [3, 0, 'a'], 'c': [3, 2, 'c']})
+
+    def test_bounds_hold_with_additions_and_removals(self):
+        generator = random.Random(4)
+        keys = [f'k{number}' for number in range(40)]
+        weights = [20] * 3 + [1] * 37
+        counters, floor, truth, stream = {}, 0, Counter(), []
+        for step in range(3000):
+            if stream and generator.random() < 0.3:
+                key = stream.pop(generator.randrange(len(stream)))
+                truth[key] -= 1
+                hotspot_service.remove_occurrence(counters, key)
+            else:
+                key = generator.choices(keys, weights)[0]
+                stream.append(key)
+                truth[key] += 1
+                floor = max(floor, hotspot_service.add_occurrence(counters, key, key, 10))
+            self.assertLessEqual(len(counters), 10)
+            if step % 100 == 0:
+                self.assert_bounds(counters, floor, truth)
+        self.assert_bounds(counters, floor, truth)
+
+    def test_removing_last_occurrence_drops_key(self):
+        counters = {}
+        hotspot_service.add_occurrence(counters, 'a', 'a', 5)
+        hotspot_service.remove_occurrence(counters, 'a')
+        hotspot_service.remove_occurrence(counters, 'missing')
+        self.assertEqual(counters, {})
+
+
+class HotspotQueryTests(TestCase):
+    """ادغام خلاصه‌های روزانه در پرس‌وجوی کانون‌ها"""
+
+    def setUp(self):
+        user = CustomUser.objects.create(mobileNumber='09120000001')
+        self.company = Company.objects.create(user=user, name='شرکت', activity_field='نفت')
+
+    def test_merge_adds_floor_of_days_missing_a_key(self):
+        LocationSketch.objects.create(
+            company=self.company, day=date(2026, 1, 1), total=9, floor=2,
+            counters={'انبار': [5, 0, 'انبار'], 'کارگاه': [2, 1, 'کارگاه']}
+        )
+        LocationSketch.objects.create(
+            company=self.company, day=date(2026, 1, 2), total=4,
+            counters={'کارگاه': [4, 0, 'کارگاه']}
+        )
+        LocationSketch.objects.create(
+            company=self.company, day=date(2026, 2, 1), total=7, counters={'سالن': [7, 0, 'سالن']}
+        )
+
+        result = hotspot_service.hotspots(self.company, date(2026, 1, 1), date(2026, 1, 31))
+        self.assertEqual(result['total'], 13)
+        self.assertEqual(
+            [(item['key'], item['count'], item['error']) for item in result['hotspots']],
+            [('کارگاه', 6, 1), ('انبار', 5, 0)]
+        )
+
+    def test_limit_and_tie_order(self):
+        LocationSketch.objects.create(
+            company=self.company, day=date(2026, 1, 1), total=6,
+            counters={'ب': [3, 1, 'ب'], 'الف': [3, 1, 'الف'], 'ج': [3, 0, 'ج']}
+        )
+        result = hotspot_service.hotspots(self.company, date(2026, 1, 1), date(2026, 1, 1), limit=2)
+        self.assertEqual([item['key'] for item in result['hotspots']], ['ج', 'الف'])
+
+
+class PercentileRankTests(SimpleTestCase):
+    """صدک شاخص شرکت‌ها در گروه هم‌حوزه"""
+
+    def test_ties_and_nan(self):
+        codes = np.array([0, 0, 0, 0, 1, 1, 1])
+        values = np.array([1.0, 2.0, 2.0, np.nan, 5.0, 3.0, 4.0])
+        ranks, medians = benchmark_service.percentile_ranks(codes, values)
+        np.testing.assert_allclose(ranks, [100 / 6, 200 / 3, 200 / 3, np.nan, 500 / 6, 100 / 6, 50])
+        np.testing.assert_allclose(medians, [2.0, 4.0])
+
+    def test_group_without_values_has_nan_median(self):
+        ranks, medians = benchmark_service.percentile_ranks(np.array([0, 1]), np.array([7.0, np.nan]))
+        np.testing.assert_allclose(ranks, [50, np.nan])
+        np.testing.assert_allclose(medians, [7.0, np.nan])
+
+    def test_empty_and_all_nan(self):
+        ranks, medians = benchmark_service.percentile_ranks(np.array([], dtype=np.int64), np.array([]))
+        self.assertEqual((ranks.size, medians.size), (0, 0))
+        ranks, medians = benchmark_service.percentile_ranks(np.array([0, 0]), np.array([np.nan, np.nan]))
+        self.assertTrue(np.isnan(ranks).all() and np.isnan(medians).all())
+
+    def test_matches_brute_force(self):
+        generator = np.random.default_rng(5)
+        codes = generator.integers(0, 6, 500)
+        values = generator.integers(0, 20, 500).astype(float)
+        values[generator.random(500) < 0.1] = np.nan
+        ranks, medians = benchmark_service.percentile_ranks(codes, values)
+
+        for code in range(6):
+            group = values[(codes == code) & ~np.isnan(values)]
+            self.assertAlmostEqual(medians[code], np.median(group))
+            for position in np.flatnonzero((codes == code) & ~np.isnan(values)):
+                below = (group < values[position]).sum()
+                equal = (group == values[position]).sum()
+                self.assertAlmostEqual(ranks[position], (below + 0.5 * equal) * 100 / group.size)
+        self.assertTrue(np.isnan(ranks[np.isnan(values)]).all())
+
+
+class CandidatePairTests(SimpleTestCase):
+    """جفت‌های نامزد LSH گزارش‌های تکراری"""
+
+    def brute_force(self, company_codes, seconds, keys, window):
+        pairs = set()
+        for first in range(len(seconds)):
+            for second in range(first + 1, len(seconds)):
+                if company_codes[first] == company_codes[second] \
+                        and abs(seconds[first] - seconds[second]) <= window \
+                        and (keys[first] == keys[second]).any():
+                    pairs.add((first, second))
+        return pairs
+
+    def test_same_bucket_within_window(self):
+        company_codes = np.array([0, 0, 0, 1])
+        seconds = np.array([0.0, 50.0, 500.0, 10.0])
+        keys = np.array([[1, 2], [3, 2], [1, 9], [1, 2]], dtype=np.int64)
+        pairs = duplicate_service.candidate_pairs(company_codes, seconds, keys, 100)
+        self.assertEqual(pairs.tolist(), [[0, 1]])
+
+    def test_no_pairs(self):
+        pairs = duplicate_service.candidate_pairs(np.array([0]), np.array([0.0]), np.array([[1]]), 100)
+        self.assertEqual(pairs.shape, (0, 2))
+
+    def test_matches_brute_force(self):
+        generator = np.random.default_rng(6)
+        count = 300
+        company_codes = generator.integers(0, 3, count)
+        seconds = generator.integers(0, 10_000, count).astype(float)
+        keys = generator.integers(0, 25, (count, 4))
+        pairs = duplicate_service.candidate_pairs(company_codes, seconds, keys, 1_000)
+        self.assertEqual({tuple(pair) for pair in pairs.tolist()}, self.brute_force(company_codes, seconds, keys, 1_000))
+        self.assertTrue((pairs[:, 0] < pairs[:, 1]).all())
+        self.assertEqual(len(pairs), len({tuple(pair) for pair in pairs.tolist()}))
+
+
+class DuplicateClusterTests(TestCase):
+    """گروه‌بندی گزارش‌های تکراری یک رویداد"""
+
+    def setUp(self):
+        user = CustomUser.objects.create(mobileNumber='09120000002')
+        self.company = Company.objects.create(user=user, name='شرکت', activity_field='نفت')
+        self.reporter = CompanyMember.objects.create(company=self.company, user=user)
+        self.now = timezone.now()
+
+    def report(self, title, description, location, days_ago=0, company=None):
+        return Incident.objects.create(
+            company=company or self.company,
+            title=title,
+            description=description,
+            incident_type='OCCURRED',
+            incident_date=self.now - timedelta(days=days_ago),
+            location=location,
+            reporter=self.reporter,
+        )
+
+    def test_reports_of_one_event_join_the_earliest(self):
+        first = self.report('نشت گاز در انبار', 'بوی گاز از کنار مخزن شماره ۲ حس شد', 'انبار شماره ۳', days_ago=3)
+        second = self.report('نشت گاز در انبار', 'بوی گاز از کنار مخزن شماره 2 حس شد', 'انبار شماره 3', days_ago=2)
+        third = self.report('نشت گاز انبار', 'بوی گاز کنار مخزن شماره ۲', 'انبار ۳', days_ago=1)
+        self.report('سقوط از ارتفاع', 'کارگر از داربست طبقه دوم سقوط کرد', 'ساختمان اداری', days_ago=2)
+        later = self.report('نشت گاز در انبار', 'بوی گاز از کنار مخزن شماره ۲ حس شد', 'انبار شماره ۳', days_ago=-60)
+
+        groups = duplicate_service.cluster(self.company, dry_run=True)
+        self.assertEqual(groups, [[first.pk, second.pk, third.pk]])
+        self.assertFalse(IncidentSignature.objects.exclude(cluster=None).exists())
+
+        duplicate_service.cluster(self.company)
+        self.assertEqual(
+            set(IncidentSignature.objects.filter(cluster=first.pk).values_list('pk', flat=True)),
+            {first.pk, second.pk, third.pk}
+        )
+        self.assertIsNone(IncidentSignature.objects.get(pk=later.pk).cluster)
+
+    def test_reports_of_other_companies_are_not_grouped(self):
+        other_user = CustomUser.objects.create(mobileNumber='09120000003')
+        other = Company.objects.create(user=other_user, name='شرکت دیگر', activity_field='نفت')
+        self.report('آتش‌سوزی تابلو برق', 'تابلو برق سالن تولید دچار حریق شد', 'سالن تولید')
+        self.report('آتش‌سوزی تابلو برق', 'تابلو برق سالن تولید دچار حریق شد', 'سالن تولید', company=other)
+        self.assertEqual(duplicate_service.cluster(dry_run=True), [])
+
+
+class BulkAuditTests(TestCase):
+    """تاریخچه تغییراتی که با bulk_create/bulk_update (بدون سیگنال) ذخیره می‌شوند"""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create(mobileNumber='09120000004')
+        self.company = Company.objects.create(user=self.user, name='شرکت', activity_field='نفت')
+        self.member = CompanyMember.objects.create(company=self.company, user=self.user)
+
+    def entries(self, model, action):
+        return AuditLog.objects.filter(company=self.company, object_type=model._meta.model_name, action=action)
+
+    def test_update_attendance(self):
+        training = Training.objects.create(company=self.company, title='آموزش', scheduled_date=timezone.now())
+        participation = TrainingParticipation.objects.create(training=training, participant=self.member)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            roster_service.update_attendance(
+                training, [{'id': str(participation.id), 'attendance_status': 'ATTENDED', 'test_score': '90'}]
+            )
+
+        entry = self.entries(TrainingParticipation, AuditLog.UPDATE).get()
+        self.assertEqual(entry.object_id, participation.id)
+        self.assertEqual(entry.changes['attendance_status'], ['REGISTERED', 'ATTENDED'])
+        self.assertEqual(entry.changes['test_score'], [None, 90])
+
+    def test_submit_responses(self):
+        template = ChecklistTemplate.objects.create(company=self.company, title='چک‌لیست')
+        first = ChecklistItem.objects.create(template=template, order=1, text='کپسول آتش‌نشانی')
+        second = ChecklistItem.objects.create(template=template, order=2, text='جعبه کمک‌های اولیه')
+        inspection = Inspection.objects.create(
+            company=self.company, title='بازرسی', checklist=template, scheduled_date=date(2026, 1, 1)
+        )
+        answered = ChecklistResponse.objects.create(inspection=inspection, item=first, result=ChecklistResponse.PASS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            checklist_service.submit_responses(inspection, [
+                {'item': str(first.id), 'result': ChecklistResponse.FAIL},
+                {'item': str(second.id), 'result': ChecklistResponse.PASS},
+            ], self.user)
+
+        updated = self.entries(ChecklistResponse, AuditLog.UPDATE).get()
+        self.assertEqual(updated.object_id, answered.id)
+        self.assertEqual(updated.changes['result'], [ChecklistResponse.PASS, ChecklistResponse.FAIL])
+        created = self.entries(ChecklistResponse, AuditLog.CREATE).get()
+        self.assertEqual(created.object_id, ChecklistResponse.objects.get(item=second).id)
+        self.assertEqual(created.changes['result'], [None, ChecklistResponse.PASS])
+
+    def test_import(self):
+        importer = import_service.InspectionImporter(self.company, self.user)
+        valid, errors = importer.validate_batch([
+            (2, {'title': 'بازرسی انبار', 'scheduled_date': '2026-01-10'}),
+            (3, {'title': 'بازرسی کارگاه', 'scheduled_date': '2026-01-11'}),
+        ])
+        self.assertEqual(errors, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            importer.save_batch([instance for _, _, instance in valid])
+
+        entries = self.entries(Inspection, AuditLog.CREATE)
+        self.assertEqual(
+            {entry.object_id: entry.changes['title'][1] for entry in entries},
+            {instance.id: instance.title for _, _, instance in valid}
+        )
+        self.assertEqual({entry.user_id for entry in entries}, {self.user.pk})
@@ -26,10 +26,14 @@ urlpatterns = [
     path('companies/<uuid:company_id>/inspections/create/', views.inspection_create, name='inspection_create'),
     path('companies/<uuid:company_id>/inspections/<uuid:inspection_id>/', views.inspection_detail, name='inspection_detail'),
     path('companies/<uuid:company_id>/inspections/<uuid:inspection_id>/update-status/', views.inspection_update_status, name='inspection_update_status'),
+    path('companies/<uuid:company_id>/inspections/bulk-status/', views.inspection_bulk_status, name='inspection_bulk_status'),
 
     # ========== Incident URLs ==========
     path('companies/<uuid:company_id>/incidents/', views.incident_list, name='incident_list'),
     path('companies/<uuid:company_id>/incidents/create/', views.incident_create, name='incident_create'),
+    path('companies/<uuid:company_id>/incidents/rollup/', views.incident_rollup_api, name='incident_rollup_api'),
+    path('companies/<uuid:company_id>/incidents/hotspots/', views.incident_hotspots_api, name='incident_hotspots_api'),
+    path('companies/<uuid:company_id>/incidents/duplicates/', views.incident_duplicates_api, name='incident_duplicates_api'),
     path('companies/<uuid:company_id>/incidents/<uuid:incident_id>/', views.incident_detail, name='incident_detail'),
 
     # ========== Task URLs ==========
@@ -37,10 +41,12 @@ urlpatterns = [
     path('companies/<uuid:company_id>/tasks/create/', views.task_create, name='task_create'),
     path('companies/<uuid:company_id>/tasks/<uuid:task_id>/', views.task_detail, name='task_detail'),
     path('companies/<uuid:company_id>/tasks/<uuid:task_id>/update-status/', views.task_update_status, name='task_update_status'),
+    path('companies/<uuid:company_id>/tasks/bulk-status/', views.task_bulk_status, name='task_bulk_status'),
 
     # ========== Invitation URLs ==========
     path('companies/<uuid:company_id>/invitations/', views.invitation_list, name='invitation_list'),
     path('companies/<uuid:company_id>/invitations/create/', views.invitation_create, name='invitation_create'),
+    path('companies/<uuid:company_id>/invitations/bulk/', views.invitation_bulk_create, name='invitation_bulk_create'),
 
     # ========== Notification URLs ==========
     path('notifications/', views.notification_list, name='notification_list'),
@@ -105,6 +111,148 @@ urlpatterns = [
          views.training_update_participation,
          name='training_update_participation'),
 
+    path('companies/<uuid:company_id>/trainings/<uuid:training_id>/enroll-bulk/',
+         views.training_enroll_bulk,
+         name='training_enroll_bulk'),
+
+    path('companies/<uuid:company_id>/trainings/<uuid:training_id>/attendance-bulk/',
+         views.training_attendance_bulk,
+         name='training_attendance_bulk'),
+
+    path('companies/<uuid:company_id>/trainings/<uuid:training_id>/certificates/issue/',
+         views.training_certificates_issue,
+         name='training_certificates_issue'),
+
+    path('companies/<uuid:company_id>/trainings/<uuid:training_id>/certificates/<uuid:participation_id>/',
+         views.training_certificate,
+         name='training_certificate'),
+
+    # ========== Export URLs ==========
+    path('companies/<uuid:company_id>/incidents/export/', views.incident_export, name='incident_export'),
+    path('companies/<uuid:company_id>/inspections/export/', views.inspection_export, name='inspection_export'),
+    path('companies/<uuid:company_id>/tasks/export/', views.task_export, name='task_export'),
+    path('companies/<uuid:company_id>/trainings/export/', views.training_export, name='training_export'),
+    path('companies/<uuid:company_id>/trainings/participations/export/',
+         views.training_participation_export,
+         name='training_participation_export'),
+
+    # ========== Training Media URLs ==========
+    path('companies/<uuid:company_id>/trainings/<uuid:training_id>/media/<str:field>/',
+         views.training_media,
+         name='training_media'),
+
+    # ========== Upload URLs ==========
+    path('companies/<uuid:company_id>/uploads/', views.upload_create, name='upload_create'),
+    path('companies/<uuid:company_id>/uploads/<uuid:upload_id>/', views.upload_detail, name='upload_detail'),
+    path('companies/<uuid:company_id>/uploads/<uuid:upload_id>/complete/',
+         views.upload_complete,
+         name='upload_complete'),
+
+    # ========== Training Compliance URLs ==========
+    path('companies/<uuid:company_id>/trainings/compliance/',
+         views.training_compliance,
+         name='training_compliance'),
+    path('companies/<uuid:company_id>/trainings/compliance/api/',
+         views.training_compliance_api,
+         name='training_compliance_api'),
+    path('companies/<uuid:company_id>/trainings/compliance/export/',
+         views.training_compliance_export,
+         name='training_compliance_export'),
+
+    # ========== Inspection Schedule URLs ==========
+    path('companies/<uuid:company_id>/inspections/schedules/',
+         views.inspection_schedule_list,
+         name='inspection_schedule_list'),
+    path('companies/<uuid:company_id>/inspections/schedules/create/',
+         views.inspection_schedule_create,
+         name='inspection_schedule_create'),
+    path('companies/<uuid:company_id>/inspections/schedules/<uuid:schedule_id>/update/',
+         views.inspection_schedule_update,
+         name='inspection_schedule_update'),
+    path('companies/<uuid:company_id>/inspections/schedules/<uuid:schedule_id>/delete/',
+         views.inspection_schedule_delete,
+         name='inspection_schedule_delete'),
+
+    # ========== Inspection Calendar URLs ==========
+    path('companies/<uuid:company_id>/inspections/calendar/',
+         views.inspection_calendar,
+         name='inspection_calendar'),
+    path('companies/<uuid:company_id>/inspections/calendar/api/',
+         views.inspection_calendar_api,
+         name='inspection_calendar_api'),
+
+    # ========== Checklist URLs ==========
+    path('companies/<uuid:company_id>/inspections/checklists/',
+         views.checklist_template_list,
+         name='checklist_template_list'),
+    path('companies/<uuid:company_id>/inspections/checklists/create/',
+         views.checklist_template_create,
+         name='checklist_template_create'),
+    path('companies/<uuid:company_id>/inspections/checklists/stats/',
+         views.checklist_stats,
+         name='checklist_stats'),
+    path('companies/<uuid:company_id>/inspections/checklists/<uuid:template_id>/update/',
+         views.checklist_template_update,
+         name='checklist_template_update'),
+    path('companies/<uuid:company_id>/inspections/checklists/<uuid:template_id>/delete/',
+         views.checklist_template_delete,
+         name='checklist_template_delete'),
+    path('companies/<uuid:company_id>/inspections/<uuid:inspection_id>/checklist/',
+         views.inspection_checklist,
+         name='inspection_checklist'),
+    path('companies/<uuid:company_id>/inspections/<uuid:inspection_id>/checklist/assign/',
+         views.inspection_checklist_assign,
+         name='inspection_checklist_assign'),
+
+    # ========== Task Board URLs ==========
+    path('companies/<uuid:company_id>/tasks/board/',
+         views.task_board,
+         name='task_board'),
+    path('companies/<uuid:company_id>/tasks/board/api/',
+         views.task_board_api,
+         name='task_board_api'),
+    path('companies/<uuid:company_id>/tasks/board/<uuid:task_id>/move/',
+         views.task_board_move,
+         name='task_board_move'),
+
+    # ========== Schedule Conflict URLs ==========
+    path('companies/<uuid:company_id>/schedule/conflicts/',
+         views.schedule_conflicts,
+         name='schedule_conflicts'),
+    path('companies/<uuid:company_id>/schedule/conflicts/api/',
+         views.schedule_conflicts_api,
+         name='schedule_conflicts_api'),
+    path('companies/<uuid:company_id>/schedule/conflicts/check/',
+         views.schedule_conflicts_check,
+         name='schedule_conflicts_check'),
+
+    # ========== Audit History URLs ==========
+    path('companies/<uuid:company_id>/history/api/',
+         views.audit_history_api,
+         name='audit_history_api'),
+
+    # ========== Sync URLs ==========
+    path('companies/<uuid:company_id>/sync/',
+         views.sync_changes,
+         name='sync_changes'),
+    path('companies/<uuid:company_id>/sync/upload/',
+         views.sync_upload,
+         name='sync_upload'),
+
+    # ========== Read-only API URLs ==========
+    path('companies/<uuid:company_id>/api/<str:resource>/',
+         views.api_list,
+         name='api_list'),
+    path('companies/<uuid:company_id>/api/<str:resource>/<uuid:object_id>/',
+         views.api_detail,
+         name='api_detail'),
+
+    # ========== Import URLs ==========
+    path('companies/<uuid:company_id>/imports/', views.import_create, name='import_create'),
+    path('companies/<uuid:company_id>/imports/<uuid:job_id>/', views.import_detail, name='import_detail'),
+    path('companies/<uuid:company_id>/imports/<uuid:job_id>/progress/', views.import_progress, name='import_progress'),
+    path('companies/<uuid:company_id>/imports/<uuid:job_id>/errors/', views.import_errors, name='import_errors'),
+
 
   path('ai-assistant/', views.ai_assistant, name='ai_assistant'),
      path('servicelist/',views.serviceLst,name='servicelist'),
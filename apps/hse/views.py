@@ -15,7 +15,8 @@ from django.urls import reverse
 
 from .models import (
     Company, CompanyDepartment, CompanyMember, Inspection,
-    Incident, Task, Invitation, Notification, HSEReport
+    Incident, Task, Invitation, Notification, HSEReport,
+    ArchivedIncident, ArchivedNotification, CompanyBenchmark
 )
 from .forms import (
     CompanyForm, CompanyDepartmentForm, CompanyMemberForm,
@@ -24,6 +25,11 @@ from .forms import (
 )
 
 from .decorators import login_required_company_member,require_company_access,company_access,company_member_access
+from .filters import (
+    filter_inspections, filter_incidents, filter_tasks,
+    filter_trainings, filter_training_participations
+)
+from .service import duplicate_service, hotspot_service, rollup_service
 
 # ==================== Company Views ====================
 
@@ -127,13 +133,8 @@ def company_detail(request, company_id):
         'in_progress': inspections.filter(status='IN_PROGRESS').count(),
     }
 
-    # آمار حوادث
-    incidents = company.incidents.all()
-    incident_stats = {
-        'total': incidents.count(),
-        'resolved': incidents.filter(status='RESOLVED').count(),
-        'severe': incidents.filter(severity_level='SEVERE').count(),
-    }
+    # آمار حوادث از جدول خلاصه آماری
+    incident_stats = rollup_service.summary(company)
 
     # آمار وظایف
     tasks = company.tasks.all()
@@ -446,26 +447,21 @@ def member_add(request, company_id):
 
 
 # ==================== Inspection Views ====================
+from .models import ChecklistResponse, ChecklistTemplate
+from .service import checklist_service, schedule_service, status_service
 
 # apps/hse/views.py
 @login_required_company_member
 def inspection_list(request, company_id):
     company = get_object_or_404(Company, id=company_id)
 
-    inspections = Inspection.objects.filter(company=company)
+    inspections = filter_inspections(request, Inspection.objects.filter(company=company))
 
     # فیلترها
     status_filter = request.GET.get('status')
     priority_filter = request.GET.get('priority')
     department_filter = request.GET.get('department')
 
-    if status_filter:
-        inspections = inspections.filter(status=status_filter)
-    if priority_filter:
-        inspections = inspections.filter(priority=priority_filter)
-    if department_filter:
-        inspections = inspections.filter(department_id=department_filter)
-
     departments = CompanyDepartment.objects.filter(company=company)
 
     context = {
@@ -500,6 +496,10 @@ def inspection_detail(request, company_id, inspection_id):
         'company': company,
         'inspection': inspection,
         'inspection_status_choices': Inspection.STATUS_CHOICES,  # این خط اضافه شود
+        'checklist_items': checklist_service.checklist_items(inspection),
+        'checklist_stats': checklist_service.inspection_stats(inspection) if inspection.checklist_id else None,
+        'checklist_templates': ChecklistTemplate.objects.filter(company=company, is_active=True),
+        'result_choices': ChecklistResponse.RESULT_CHOICES,
     }
     return render(request, 'hse/inspection/detail.html', context)
 
@@ -517,6 +517,10 @@ def inspection_create(request, company_id):
             inspection.created_by = request.user
             inspection.save()
             messages.success(request, 'بازرسی با موفقیت ایجاد شد.')
+
+            # هشدار تداخل با آموزش‌های همان روز مسئول بازرسی
+            for warning in schedule_service.conflict_messages(schedule_service.conflicts_for_inspection(inspection)):
+                messages.warning(request, warning)
             return redirect('hse:inspection_detail', company_id=company.id, inspection_id=inspection.id)
     else:
         form = InspectionForm(company=company)
@@ -536,17 +540,61 @@ def inspection_update_status(request, company_id, inspection_id):
     company = get_object_or_404(Company, id=company_id)
     inspection = get_object_or_404(Inspection, id=inspection_id, company=company)
 
-    new_status = request.POST.get('status')
-    if new_status in dict(Inspection.Status.choices):
-        inspection.status = new_status
+    try:
+        status_service.transition(inspection, request.POST.get('status'), request.user)
+        messages.success(request, 'وضعیت بازرسی بروزرسانی شد.')
+    except status_service.TransitionError as error:
+        messages.error(request, str(error))
 
-        if new_status == 'COMPLETED':
-            inspection.completed_date = timezone.now().date()
+    return redirect('hse:inspection_detail', company_id=company.id, inspection_id=inspection.id)
 
-        inspection.save()
-        messages.success(request, 'وضعیت بازرسی بروزرسانی شد.')
 
-    return redirect('inspection_detail', company_id=company.id, inspection_id=inspection.id)
+def _bulk_status_input(request):
+    """ورودی تغییر وضعیت گروهی: JSON {"ids": [...], "status": ...} یا فرم با چند ids"""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None, None
+        ids = data.get('ids')
+        return (ids if isinstance(ids, list) else None), data.get('status')
+    return request.POST.getlist('ids'), request.POST.get('status')
+
+
+def _bulk_status_response(request, model, company, list_url):
+    """اجرای تغییر وضعیت گروهی و پاسخ JSON یا بازگشت به لیست"""
+    wants_json = (
+        request.content_type == 'application/json'
+        or request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    )
+    ids, target = _bulk_status_input(request)
+
+    try:
+        if ids is None:
+            raise status_service.TransitionError('داده ارسالی نامعتبر است')
+        result = status_service.bulk_transition(model, company, ids, target, request.user)
+    except status_service.TransitionError as error:
+        if wants_json:
+            return JsonResponse({'success': False, 'error': str(error)}, status=400)
+        messages.error(request, str(error))
+        return redirect(list_url)
+
+    if wants_json:
+        return JsonResponse({'success': True, **result})
+
+    if result['updated']:
+        messages.success(request, f"وضعیت {result['updated']} مورد بروزرسانی شد.")
+    if result['skipped']:
+        messages.warning(request, f"{len(result['skipped'])} مورد به دلیل انتقال غیرمجاز تغییر نکرد.")
+    return redirect(list_url)
+
+
+@login_required_company_member
+@require_POST
+def inspection_bulk_status(request, company_id):
+    """تغییر وضعیت گروهی بازرسی‌ها"""
+    company = get_object_or_404(Company, id=company_id)
+    return _bulk_status_response(request, Inspection, company, reverse('hse:inspection_list', args=[company.id]))
 
 
 # ==================== Incident Views ====================
@@ -555,24 +603,19 @@ def inspection_update_status(request, company_id, inspection_id):
 def incident_list(request, company_id):
     """لیست حوادث"""
     company = get_object_or_404(Company, id=company_id)
-    incidents = company.incidents.all().select_related(
+
+    # حوادث بایگانی شده (دستور apply_retention) فقط با archived=1 خوانده می‌شوند
+    archived = request.GET.get('archived') == '1'
+    source = ArchivedIncident.objects.filter(company=company) if archived else company.incidents.all()
+    incidents = filter_incidents(request, source).select_related(
         'department', 'reporter__user'
-    ).order_by('-incident_date')
+    )
 
     # فیلترها
     status_filter = request.GET.get('status', '')
     severity_filter = request.GET.get('severity', '')
     type_filter = request.GET.get('type', '')
 
-    if status_filter:
-        incidents = incidents.filter(status=status_filter)
-
-    if severity_filter:
-        incidents = incidents.filter(severity_level=severity_filter)
-
-    if type_filter:
-        incidents = incidents.filter(incident_type=type_filter)
-
     # آمارها
     stats = {
         'total': incidents.count(),
@@ -591,7 +634,8 @@ def incident_list(request, company_id):
         'status_filter': status_filter,
         'severity_filter': severity_filter,
         'type_filter': type_filter,
-        'page_title': f'حوادث شرکت {company.name}'
+        'archived': archived,
+        'page_title': f'حوادث بایگانی شده شرکت {company.name}' if archived else f'حوادث شرکت {company.name}'
     }
     return render(request, 'hse/incident/list.html', context)
 
@@ -625,71 +669,136 @@ def incident_create(request, company_id):
     """گزارش حادثه جدید"""
     company = get_object_or_404(Company, id=company_id)
 
+    duplicates = []
     if request.method == 'POST':
         form = IncidentForm(request.POST, company=company)
         if form.is_valid():
             incident = form.save(commit=False)
             incident.company = company
 
-            # اگر کاربر عضو شرکت است، به عنوان گزارش‌دهنده ثبت می‌شود
-            try:
-                member = CompanyMember.objects.get(company=company, user=request.user)
-                incident.reporter = member
-            except CompanyMember.DoesNotExist:
-                pass
+            # گزارش احتمالاً تکراری: حوادث مشابه نمایش داده می‌شود تا کاربر ثبت را تأیید کند
+            if not request.POST.get('confirm_duplicate'):
+                duplicates = duplicate_service.suggest(
+                    company, incident.title, incident.description, incident.location, incident.incident_date
+                )
 
-            incident.save()
-            messages.success(request, 'حادثه با موفقیت گزارش شد.')
-            return redirect('hse:incident_detail', company_id=company.id, incident_id=incident.id)
+            if not duplicates:
+                # اگر کاربر عضو شرکت است، به عنوان گزارش‌دهنده ثبت می‌شود
+                try:
+                    member = CompanyMember.objects.get(company=company, user=request.user)
+                    incident.reporter = member
+                except CompanyMember.DoesNotExist:
+                    pass
+
+                incident.save()
+                messages.success(request, 'حادثه با موفقیت گزارش شد.')
+                return redirect('hse:incident_detail', company_id=company.id, incident_id=incident.id)
     else:
         form = IncidentForm(company=company)
 
     context = {
         'form': form,
         'company': company,
+        'duplicates': duplicates,
         'page_title': 'گزارش حادثه جدید'
     }
     return render(request, 'hse/incident/create.html', context)
 
 
+@login_required_company_member
+@require_GET
+def incident_rollup_api(request, company_id):
+    """
+    آمار تجمیعی حوادث از جدول خلاصه آماری
+    group_by=month,severity_level (ابعاد: department، month، year، incident_type، severity_level، status)
+    فیلترها: department، incident_type، severity_level، status (چند مقدار با کاما) و from/to به صورت YYYY-MM
+    """
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        group_by, filters, start, end = rollup_service.parse_query(request.GET)
+        rows = rollup_service.query(company, group_by, filters, start, end)
+    except rollup_service.RollupError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    return JsonResponse({'success': True, 'rows': rows, 'total': sum(row['count'] for row in rows)})
+
+
+@login_required_company_member
+@require_GET
+def incident_hotspots_api(request, company_id):
+    """
+    پرتکرارترین محل‌های وقوع حادثه در بازه from تا to (YYYY-MM-DD، پیش‌فرض ۹۰ روز اخیر)
+    از خلاصه‌های روزانه خوانده می‌شود، نه از جدول حوادث
+    """
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        start, end = hotspot_service.parse_window(request.GET)
+        result = hotspot_service.hotspots(company, start, end, hotspot_service.limit_value(request.GET.get('limit')))
+    except hotspot_service.HotspotError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    return JsonResponse({'success': True, 'from': start, 'to': end, **result})
+
+
+@login_required_company_member
+@require_GET
+def incident_duplicates_api(request, company_id):
+    """
+    حوادث مشابه یک گزارش در حال ثبت (پارامترهای title، description، location و incident_date)
+    از سطل‌های LSH امضاهای MinHash خوانده می‌شود، نه با مقایسه متن همه حوادث
+    """
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        incident_date = duplicate_service.parse_date(request.GET.get('incident_date'))
+    except duplicate_service.DuplicateError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    matches = duplicate_service.suggest(
+        company,
+        request.GET.get('title', ''),
+        request.GET.get('description', ''),
+        request.GET.get('location', ''),
+        incident_date
+    )
+    return JsonResponse({
+        'success': True,
+        'duplicates': [
+            {
+                'id': match.incident.id,
+                'title': match.incident.title,
+                'location': match.incident.location,
+                'incident_date': match.incident.incident_date,
+                'status': match.incident.get_status_display(),
+                'similarity': match.similarity,
+                'url': reverse('hse:incident_detail', args=[company.id, match.incident.id]),
+            }
+            for match in matches
+        ]
+    })
+
+
 # ==================== Task Views ====================
 @login_required_company_member
 def task_list(request, company_id):
     """لیست وظایف"""
     company = get_object_or_404(Company, id=company_id)
-    tasks = company.tasks.all().select_related(
+    tasks = filter_tasks(request, company, company.tasks.all()).select_related(
         'department', 'assigned_to__user', 'created_by',
         'related_inspection', 'related_incident'
-    ).order_by('-created_at')
+    )
 
     # فیلترها
     status_filter = request.GET.get('status', '')
     priority_filter = request.GET.get('priority', '')
     assigned_to_filter = request.GET.get('assigned_to', '')
 
-    if status_filter:
-        tasks = tasks.filter(status=status_filter)
-
-    if priority_filter:
-        tasks = tasks.filter(priority=priority_filter)
-
-    if assigned_to_filter:
-        tasks = tasks.filter(assigned_to_id=assigned_to_filter)
-
-    # وظایف شخصی کاربر
-    if request.GET.get('my_tasks'):
-        try:
-            member = CompanyMember.objects.get(company=company, user=request.user)
-            tasks = tasks.filter(assigned_to=member)
-        except CompanyMember.DoesNotExist:
-            pass
-
     members = company.members.filter(is_active=True)
 
     context = {
         'company': company,
         'tasks': tasks,
         'members': members,
+        'task_status_choices': Task.STATUS_CHOICES,
         'status_filter': status_filter,
         'priority_filter': priority_filter,
         'assigned_to_filter': assigned_to_filter,
@@ -770,17 +879,21 @@ def task_update_status(request, company_id, task_id):
     company = get_object_or_404(Company, id=company_id)
     task = get_object_or_404(Task, id=task_id, company=company)
 
-    new_status = request.POST.get('status')
-    if new_status in dict(Task.Status.choices):
-        task.status = new_status
+    try:
+        status_service.transition(task, request.POST.get('status'), request.user)
+        messages.success(request, 'وضعیت وظیفه بروزرسانی شد.')
+    except status_service.TransitionError as error:
+        messages.error(request, str(error))
 
-        if new_status == 'COMPLETED':
-            task.completed_date = timezone.now().date()
+    return redirect('hse:task_detail', company_id=company.id, task_id=task.id)
 
-        task.save()
-        messages.success(request, 'وضعیت وظیفه بروزرسانی شد.')
 
-    return redirect('task_detail', company_id=company.id, task_id=task.id)
+@login_required_company_member
+@require_POST
+def task_bulk_status(request, company_id):
+    """تغییر وضعیت گروهی وظایف؛ مثلاً بستن یکجای وظایف اقدام اصلاحی"""
+    company = get_object_or_404(Company, id=company_id)
+    return _bulk_status_response(request, Task, company, reverse('hse:task_list', args=[company.id]))
 
 
 # ======from django.shortcuts import render, get_object_or_404, redirect
@@ -1202,11 +1315,14 @@ def invitation_cancel(request, invitation_id):
 @login_required_company_member
 def notification_list(request):
     """لیست اعلان‌های کاربر با قابلیت پذیرش/رد مستقیم دعوت‌ها"""
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+    # اعلان‌های خوانده شده قدیمی به جدول بایگانی منتقل می‌شوند و با archived=1 نمایش داده می‌شوند
+    archived = request.GET.get('archived') == '1'
+    source = ArchivedNotification if archived else Notification
+    notifications = source.objects.filter(user=request.user).order_by('-created_at')
 
     # محاسبه آمار
     total_count = notifications.count()
-    unread_count = notifications.filter(is_read=False).count()
+    unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
 
     # برای هر اعلان دعوت، اطلاعات دعوت را نیز بگیریم
     notifications_with_invitation = []
@@ -1218,7 +1334,7 @@ def notification_list(request):
         }
 
         # اگر اعلان مربوط به دعوت است، اطلاعات دعوت را بگیر
-        if notification.notification_type == 'INVITATION' and notification.related_object_id:
+        if not archived and notification.notification_type == 'INVITATION' and notification.related_object_id:
             try:
                 invitation = Invitation.objects.get(id=notification.related_object_id)
                 notification_data['invitation'] = invitation
@@ -1252,7 +1368,8 @@ def notification_list(request):
 
     context = {
         'page_obj': page_obj,
-        'page_title': 'اعلان‌ها',
+        'page_title': 'اعلان‌های بایگانی شده' if archived else 'اعلان‌ها',
+        'archived': archived,
         'total_count': total_count,
         'unread_count': unread_count,
     }
@@ -1341,7 +1458,7 @@ def dashboard(request, company_id):
         'departments': company.departments.filter(is_active=True).count(),
         'members': company.members.filter(is_active=True).count(),
         'inspections': company.inspections.count(),
-        'incidents': company.incidents.count(),
+        'incidents': rollup_service.query(company)[0]['count'],
         'tasks': company.tasks.count(),
         'completed_tasks': company.tasks.filter(status='COMPLETED').count(),
     }
@@ -1358,26 +1475,18 @@ def dashboard(request, company_id):
         status__in=['PENDING', 'IN_PROGRESS']
     ).order_by('due_date')[:5]
 
-    # آمار ماهانه حوادث
-    today = timezone.now()
-    six_months_ago = today - timedelta(days=180)
-
-    monthly_incidents = []
-    for i in range(6):
-        month_start = today.replace(day=1) - timedelta(days=30*i)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    # مقایسه با شرکت‌های هم‌حوزه (آخرین اجرای دستور compute_benchmarks)
+    benchmark = CompanyBenchmark.objects.filter(company=company).first()
 
-        count = company.incidents.filter(
-            incident_date__range=[month_start, month_end]
-        ).count()
-
-        monthly_incidents.append({
+    # آمار ماهانه حوادث (شش ماه اخیر) با یک پرس‌وجو روی جدول خلاصه آماری
+    monthly_incidents = [
+        {
             'month': month_start.strftime('%Y-%m'),
             'name': month_start.strftime('%b'),
             'count': count
-        })
-
-    monthly_incidents.reverse()
+        }
+        for month_start, count in rollup_service.monthly_counts(company, 6)
+    ]
 
     context = {
         'company': company,
@@ -1386,6 +1495,7 @@ def dashboard(request, company_id):
         'recent_incidents': recent_incidents,
         'urgent_tasks': urgent_tasks,
         'monthly_incidents': monthly_incidents,
+        'benchmark': benchmark,
         'page_title': f'داشبورد {company.name}'
     }
     return render(request, 'hse/dashboard.html', context)
@@ -1400,7 +1510,6 @@ def get_company_stats(request, company_id):
 
     # محاسبه آمار
     inspections = company.inspections.all()
-    incidents = company.incidents.all()
     tasks = company.tasks.all()
 
     stats = {
@@ -1409,11 +1518,7 @@ def get_company_stats(request, company_id):
             'completed': inspections.filter(status='COMPLETED').count(),
             'in_progress': inspections.filter(status='IN_PROGRESS').count(),
         },
-        'incidents': {
-            'total': incidents.count(),
-            'resolved': incidents.filter(status='RESOLVED').count(),
-            'severe': incidents.filter(severity_level='SEVERE').count(),
-        },
+        'incidents': rollup_service.summary(company),
         'tasks': {
             'total': tasks.count(),
             'completed': tasks.filter(status='COMPLETED').count(),
@@ -1635,26 +1740,23 @@ from .forms import TrainingCreateForm, TrainingUpdateForm
 
 # ========== Training URLs ==========
 from .models import Training,TrainingCategory,TrainingParticipation
+import os
+from .service import certificate_service, media_service, roster_service, upload_service
 
 @login_required_company_member
 def training_list(request, company_id):
     """لیست آموزش‌ها"""
     company = get_object_or_404(Company, id=company_id)
 
-    trainings = Training.objects.filter(company=company)
+    trainings = filter_trainings(request, Training.objects.filter(company=company)).annotate(
+        participant_count=Count('participation_records')
+    )
 
     # فیلترها
     type_filter = request.GET.get('training_type')
     status_filter = request.GET.get('status')
     department_filter = request.GET.get('department')
 
-    if type_filter:
-        trainings = trainings.filter(training_type=type_filter)
-    if status_filter:
-        trainings = trainings.filter(status=status_filter)
-    if department_filter:
-        trainings = trainings.filter(department_id=department_filter)
-
     departments = CompanyDepartment.objects.filter(company=company)
 
     context = {
@@ -1683,7 +1785,18 @@ def training_create(request, company_id):
             training.created_by = request.user
             training.save()
             form.save_m2m()  # برای ذخیره شرکت‌کنندگان
+
+            # فایل‌های حجیمی که به صورت تکه‌ای آپلود شده‌اند
+            try:
+                upload_service.attach_form_uploads(request.POST, training, request.user)
+            except upload_service.UploadError as error:
+                messages.error(request, error.message)
+
             messages.success(request, 'آموزش با موفقیت ایجاد شد.')
+
+            # هشدار تداخل زمانی مدرس و شرکت‌کنندگان با جلسات دیگر
+            for warning in schedule_service.conflict_messages(schedule_service.conflicts_for_training(training)):
+                messages.warning(request, warning)
             return redirect('hse:training_list', company_id=company.id)
     else:
         form = TrainingCreateForm()
@@ -1714,13 +1827,24 @@ def training_detail(request, company_id, training_id):
     participants = training.participants.all()
 
     # سوابق حضور
-    participation_records = TrainingParticipation.objects.filter(training=training)
+    participation_records = TrainingParticipation.objects.filter(training=training).select_related(
+        'participant__user', 'participant__department'
+    )
+
+    # اعضایی که هنوز ثبت‌نام نشده‌اند (برای افزودن شرکت‌کننده)
+    members = roster_service.enrollment_candidates(company).exclude(
+        training_participations__training=training
+    ).select_related('user', 'department')
 
     context = {
         'company': company,
         'training': training,
         'participants': participants,
         'participation_records': participation_records,
+        'members': members,
+        'departments': CompanyDepartment.objects.filter(company=company),
+        'position_choices': CompanyMember.Position.choices,
+        'attendance_choices': TrainingParticipation.ATTENDANCE_CHOICES,
     }
     return render(request, 'hse/training/detail.html', context)
 
@@ -1739,7 +1863,18 @@ def training_update(request, company_id, training_id):
                 training.completion_date = timezone.now()
 
             form.save()
+
+            # فایل‌های حجیمی که به صورت تکه‌ای آپلود شده‌اند
+            try:
+                upload_service.attach_form_uploads(request.POST, training, request.user)
+            except upload_service.UploadError as error:
+                messages.error(request, error.message)
+
             messages.success(request, 'آموزش با موفقیت به‌روزرسانی شد.')
+
+            # هشدار تداخل زمانی مدرس و شرکت‌کنندگان با جلسات دیگر
+            for warning in schedule_service.conflict_messages(schedule_service.conflicts_for_training(training)):
+                messages.warning(request, warning)
             return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
     else:
         form = TrainingUpdateForm(instance=training)
@@ -1875,6 +2010,139 @@ def training_update_participation(request, company_id, training_id, participatio
     return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
 
 
+@login_required_company_member
+@require_POST
+def training_enroll_bulk(request, company_id, training_id):
+    """ثبت‌نام گروهی اعضای یک بخش و/یا سمت در آموزش"""
+    company = get_object_or_404(Company, id=company_id)
+    training = get_object_or_404(Training, id=training_id, company=company)
+
+    department_id = request.POST.get('department')
+    positions = [
+        position for position in request.POST.getlist('positions')
+        if position in CompanyMember.Position.values
+    ]
+
+    if not department_id and not positions and not request.POST.get('all_members'):
+        messages.error(request, 'لطفاً بخش یا سمت را انتخاب کنید.')
+        return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
+
+    if department_id:
+        try:
+            department_id = uuid.UUID(department_id)
+        except ValueError:
+            messages.error(request, 'بخش انتخاب شده نامعتبر است.')
+            return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
+        get_object_or_404(CompanyDepartment, id=department_id, company=company)
+
+    created, existing = roster_service.enroll_members(
+        training,
+        roster_service.enrollment_candidates(company, department_id, positions)
+    )
+
+    if created:
+        messages.success(request, f'{created} نفر با موفقیت ثبت‌نام شدند.')
+    if existing:
+        messages.info(request, f'{existing} نفر از قبل ثبت‌نام شده بودند.')
+    if not created and not existing:
+        messages.warning(request, 'عضو فعالی با این مشخصات یافت نشد.')
+
+    return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
+
+
+@login_required_company_member
+@require_POST
+def training_attendance_bulk(request, company_id, training_id):
+    """
+    ثبت حضور و نمره گروهی
+    ورودی فرم: record (تکرار شونده) + attendance_<id> / test_score_<id> / rating_<id>
+    یا JSON: {"records": [{"id", "attendance_status", "test_score", "rating"}, ...]}
+    """
+    company = get_object_or_404(Company, id=company_id)
+    training = get_object_or_404(Training, id=training_id, company=company)
+
+    is_json = request.content_type == 'application/json'
+    if is_json:
+        try:
+            rows = json.loads(request.body or '{}').get('records', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'JSON نامعتبر است'}, status=400)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return JsonResponse({'success': False, 'error': 'records باید لیستی از رکوردها باشد'}, status=400)
+    else:
+        rows = roster_service.attendance_rows_from_post(request.POST, request.POST.getlist('record'))
+
+    updated, errors = roster_service.update_attendance(training, rows)
+
+    if is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({'success': not errors, 'updated': updated, 'errors': errors})
+
+    if updated:
+        messages.success(request, f'حضور {updated} شرکت‌کننده به‌روزرسانی شد.')
+    for error in errors[:5]:
+        messages.error(request, error['error'])
+
+    return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
+
+
+@login_required_company_member
+@require_POST
+def training_certificates_issue(request, company_id, training_id):
+    """صدور گروهی گواهی برای شرکت‌کنندگان حاضر با نمره حداقل"""
+    company = get_object_or_404(Company, id=company_id)
+    training = get_object_or_404(Training, id=training_id, company=company)
+
+    min_score = request.POST.get('min_score')
+    try:
+        min_score = int(min_score) if min_score not in (None, '') else None
+    except ValueError:
+        messages.error(request, 'حداقل نمره نامعتبر است.')
+        return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
+
+    try:
+        result = certificate_service.issue_certificates(
+            training,
+            min_score=min_score,
+            file_format=request.POST.get('format', 'png'),
+            max_renders=certificate_service.web_max_renders()
+        )
+    except certificate_service.CertificateError as error:
+        messages.error(request, str(error))
+    else:
+        if result['eligible']:
+            messages.success(
+                request,
+                f"گواهی {result['eligible']} نفر صادر شد "
+                f"({result['rendered']} فایل جدید، {result['cached']} فایل از قبل موجود)."
+            )
+        else:
+            messages.warning(request, 'شرکت‌کننده واجد شرایطی برای صدور گواهی یافت نشد.')
+
+    return redirect('hse:training_detail', company_id=company.id, training_id=training.id)
+
+
+@login_required_company_member
+@require_http_methods(["GET", "HEAD"])
+def training_certificate(request, company_id, training_id, participation_id):
+    """دانلود گواهی یک شرکت‌کننده"""
+    company = get_object_or_404(Company, id=company_id)
+    training = get_object_or_404(Training, id=training_id, company=company)
+    participation = get_object_or_404(
+        TrainingParticipation.objects.select_related('participant__user'),
+        id=participation_id,
+        training=training,
+        certificate_issued=True
+    )
+
+    extension = os.path.splitext(participation.certificate_file.name or '')[1]
+    return media_service.serve_field_file(
+        request,
+        participation.certificate_file,
+        as_attachment=True,
+        filename=f'certificate-{participation.participant.user.full_name.strip() or participation.id}{extension}'
+    )
+
+
 @login_required_company_member
 def ai_assistant(request):
     """صفحه دستیار هوشمند HSE"""
@@ -2144,4 +2412,1309 @@ def member_delete(request, company_id, member_id):
         'page_title': f'حذف عضو - {member.user.full_name}'
     }
 
-    return render(request, 'hse/company/member_delete.html', context)
\ No newline at end of file
+    return render(request, 'hse/company/member_delete.html', context)
+
+# ==================== Export Views ====================
+from .service import export_service
+
+
+def _export_format(request):
+    """فرمت خروجی درخواست شده (csv یا xlsx)"""
+    file_format = request.GET.get('format', 'csv').lower()
+    return file_format if file_format in ('csv', 'xlsx') else 'csv'
+
+
+@login_required_company_member
+@require_GET
+def incident_export(request, company_id):
+    """خروجی استریمی حوادث با فیلترهای صفحه لیست"""
+    company = get_object_or_404(Company, id=company_id)
+    incidents = filter_incidents(request, company.incidents.all())
+
+    return export_service.export_response(
+        incidents,
+        export_service.INCIDENT_COLUMNS,
+        filename=f'incidents-{timezone.now():%Y%m%d}',
+        file_format=_export_format(request),
+        sheet_name='Incidents',
+    )
+
+
+@login_required_company_member
+@require_GET
+def inspection_export(request, company_id):
+    """خروجی استریمی بازرسی‌ها با فیلترهای صفحه لیست"""
+    company = get_object_or_404(Company, id=company_id)
+    inspections = filter_inspections(request, company.inspections.all())
+
+    return export_service.export_response(
+        inspections,
+        export_service.INSPECTION_COLUMNS,
+        filename=f'inspections-{timezone.now():%Y%m%d}',
+        file_format=_export_format(request),
+        sheet_name='Inspections',
+    )
+
+
+@login_required_company_member
+@require_GET
+def task_export(request, company_id):
+    """خروجی استریمی وظایف با فیلترهای صفحه لیست"""
+    company = get_object_or_404(Company, id=company_id)
+    tasks = filter_tasks(request, company, company.tasks.all())
+
+    return export_service.export_response(
+        tasks,
+        export_service.TASK_COLUMNS,
+        filename=f'tasks-{timezone.now():%Y%m%d}',
+        file_format=_export_format(request),
+        sheet_name='Tasks',
+    )
+
+
+@login_required_company_member
+@require_GET
+def training_export(request, company_id):
+    """خروجی استریمی آموزش‌ها با فیلترهای صفحه لیست"""
+    company = get_object_or_404(Company, id=company_id)
+    trainings = filter_trainings(request, company.trainings.all())
+
+    return export_service.export_response(
+        trainings,
+        export_service.TRAINING_COLUMNS,
+        filename=f'trainings-{timezone.now():%Y%m%d}',
+        file_format=_export_format(request),
+        sheet_name='Trainings',
+    )
+
+
+@login_required_company_member
+@require_GET
+def training_participation_export(request, company_id):
+    """خروجی استریمی سوابق حضور در آموزش‌ها"""
+    company = get_object_or_404(Company, id=company_id)
+    participations = filter_training_participations(
+        request,
+        TrainingParticipation.objects.filter(training__company=company)
+    )
+
+    return export_service.export_response(
+        participations,
+        export_service.TRAINING_PARTICIPATION_COLUMNS,
+        filename=f'training-participations-{timezone.now():%Y%m%d}',
+        file_format=_export_format(request),
+        sheet_name='Participations',
+    )
+
+
+# ==================== Import Views ====================
+from django.http import StreamingHttpResponse
+from .forms import ImportJobForm
+from .models import ImportJob
+from .service import import_service
+
+
+@login_required_company_member
+def import_create(request, company_id):
+    """بارگذاری فایل ورود گروهی و اعتبارسنجی اولیه"""
+    company = get_object_or_404(Company, id=company_id)
+
+    if request.method == 'POST':
+        form = ImportJobForm(request.POST, request.FILES)
+        if form.is_valid():
+            job = form.save(commit=False)
+            job.company = company
+            job.created_by = request.user
+            job.save()
+
+            import_service.validate_job(job)
+            return redirect('hse:import_detail', company_id=company.id, job_id=job.id)
+    else:
+        form = ImportJobForm()
+
+    importers = [
+        {
+            'kind': kind,
+            'label': label,
+            'columns': [column for _, column in import_service.IMPORTERS[kind].fields],
+        }
+        for kind, label in ImportJob.KIND_CHOICES
+    ]
+
+    context = {
+        'company': company,
+        'form': form,
+        'importers': importers,
+        'recent_jobs': company.import_jobs.select_related('created_by')[:10],
+        'page_title': 'ورود گروهی اطلاعات'
+    }
+    return render(request, 'hse/import/create.html', context)
+
+
+@login_required_company_member
+def import_detail(request, company_id, job_id):
+    """پیش‌نمایش نتیجه اعتبارسنجی و تایید ورود"""
+    company = get_object_or_404(Company, id=company_id)
+    job = get_object_or_404(ImportJob, id=job_id, company=company)
+
+    if request.method == 'POST':
+        if job.status != 'VALIDATED':
+            messages.error(request, 'این عملیات قبلاً اجرا شده یا قابل اجرا نیست.')
+        elif not job.valid_rows:
+            messages.error(request, 'هیچ ردیف معتبری برای ورود وجود ندارد.')
+        else:
+            try:
+                import_service.run_job(job)
+                messages.success(request, f'{job.created_rows} ردیف با موفقیت وارد شد.')
+            except import_service.ImportFileError as e:
+                job.refresh_from_db()
+                messages.error(request, str(e))
+            except Exception as e:
+                messages.error(request, f'خطا در ورود اطلاعات: {str(e)}')
+
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({
+                'success': job.status == 'COMPLETED',
+                'status': job.status,
+                'created_rows': job.created_rows,
+            })
+        return redirect('hse:import_detail', company_id=company.id, job_id=job.id)
+
+    importer = import_service.IMPORTERS[job.kind]
+
+    context = {
+        'company': company,
+        'job': job,
+        'columns': [column for _, column in importer.fields],
+        'errors': job.errors[:100],
+        'page_title': f'ورود گروهی {job.get_kind_display()}'
+    }
+    return render(request, 'hse/import/detail.html', context)
+
+
+@login_required_company_member
+@require_GET
+def import_progress(request, company_id, job_id):
+    """وضعیت پیشرفت عملیات ورود (برای AJAX)"""
+    job = get_object_or_404(
+        ImportJob.objects.only(
+            'status', 'total_rows', 'valid_rows', 'processed_rows', 'created_rows', 'error_count'
+        ),
+        id=job_id,
+        company_id=company_id
+    )
+
+    return JsonResponse({
+        'status': job.status,
+        'total_rows': job.total_rows,
+        'valid_rows': job.valid_rows,
+        'processed_rows': job.processed_rows,
+        'created_rows': job.created_rows,
+        'error_count': job.error_count,
+        'progress': job.progress_percent,
+    })
+
+
+@login_required_company_member
+@require_GET
+def import_errors(request, company_id, job_id):
+    """دانلود گزارش خطاهای ردیف به ردیف"""
+    company = get_object_or_404(Company, id=company_id)
+    job = get_object_or_404(ImportJob, id=job_id, company=company)
+
+    labels = dict(import_service.IMPORTERS[job.kind].fields)
+    rows = (
+        [error['row'], labels.get(error['field'], error['field']), error['message']]
+        for error in job.errors
+    )
+
+    response = StreamingHttpResponse(
+        export_service.iter_csv(['ردیف', 'ستون', 'خطا'], rows),
+        content_type=export_service.CSV_CONTENT_TYPE
+    )
+    response['Content-Disposition'] = f'attachment; filename="import-errors-{job.id}.csv"'
+    return response
+
+
+# ==================== Bulk Invitation Views ====================
+from .forms import BulkInvitationForm
+from .service import invitation_service
+
+
+@login_required_company_member
+def invitation_bulk_create(request, company_id):
+    """
+    دعوت گروهی اعضا
+    ورودی می‌تواند فرم (متن یا فایل) یا JSON به شکل
+    {"mobiles": [...], "position": "...", "department": "...", "message": "..."} باشد
+    """
+    company = get_object_or_404(Company, id=company_id)
+    results = None
+    summary = None
+
+    if request.method == 'POST':
+        is_json = request.content_type == 'application/json'
+
+        if is_json:
+            try:
+                payload = json.loads(request.body or '{}')
+            except ValueError:
+                return JsonResponse({'success': False, 'error': 'JSON نامعتبر است'}, status=400)
+            if not isinstance(payload, dict) or not isinstance(payload.get('mobiles', []), list):
+                return JsonResponse({'success': False, 'error': 'ساختار JSON نامعتبر است'}, status=400)
+
+            form = BulkInvitationForm({
+                'mobile_numbers': '\n'.join(str(mobile) for mobile in payload.get('mobiles', [])),
+                'position': payload.get('position', CompanyMember.Position.WORKER),
+                'department': payload.get('department') or '',
+                'message': payload.get('message', ''),
+            }, company=company)
+        else:
+            form = BulkInvitationForm(request.POST, request.FILES, company=company)
+
+        if form.is_valid():
+            raw_mobiles = invitation_service.parse_mobile_text(form.cleaned_data['mobile_numbers'])
+            mobile_file = form.cleaned_data.get('mobile_file')
+            if mobile_file and len(raw_mobiles) <= invitation_service.MAX_BULK_INVITATIONS:
+                try:
+                    raw_mobiles += invitation_service.parse_mobile_file(
+                        mobile_file, mobile_file.name,
+                        limit=invitation_service.MAX_BULK_INVITATIONS - len(raw_mobiles)
+                    )
+                except import_service.ImportFileError as error:
+                    form.add_error('mobile_file', str(error))
+
+            if len(raw_mobiles) > invitation_service.MAX_BULK_INVITATIONS:
+                form.add_error(
+                    None,
+                    f'حداکثر {invitation_service.MAX_BULK_INVITATIONS} شماره در هر درخواست مجاز است'
+                )
+            elif not form.errors:
+                results = invitation_service.bulk_invite(
+                    company,
+                    request.user,
+                    raw_mobiles,
+                    position=form.cleaned_data['position'],
+                    department=form.cleaned_data['department'],
+                    message=form.cleaned_data['message'],
+                )
+                summary = invitation_service.summarize(results)
+
+        if is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            if results is None:
+                return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+            return JsonResponse({'success': True, 'summary': summary, 'results': results})
+
+        if results is not None:
+            created = summary[invitation_service.OUTCOME_INVITED] + summary[invitation_service.OUTCOME_SAVED]
+            messages.success(request, f'{created} دعوت‌نامه از {summary["total"]} شماره ثبت شد.')
+    else:
+        form = BulkInvitationForm(company=company)
+
+    context = {
+        'company': company,
+        'form': form,
+        'results': results,
+        'summary': summary,
+        'page_title': 'دعوت گروهی اعضا'
+    }
+    return render(request, 'hse/invitation/bulk_create.html', context)
+
+
+# ==================== Training Media Views ====================
+from django.http import Http404
+
+TRAINING_MEDIA_FIELDS = ('video', 'attachment')
+
+
+@login_required_company_member
+@require_http_methods(["GET", "HEAD"])
+def training_media(request, company_id, training_id, field):
+    """
+    ارسال فیلم/ضمیمه آموزش فقط برای اعضای شرکت
+    پشتیبانی از Range برای جابه‌جایی در پخش فیلم و واگذاری ارسال به nginx/apache
+    """
+    if field not in TRAINING_MEDIA_FIELDS:
+        raise Http404('فایل یافت نشد')
+
+    company = get_object_or_404(Company, id=company_id)
+    training = get_object_or_404(Training, id=training_id, company=company)
+
+    # نام فایل روی دیسک هش محتواست؛ برای دانلود از عنوان آموزش استفاده می‌شود
+    field_file = getattr(training, field)
+    extension = os.path.splitext(field_file.name or '')[1]
+
+    return media_service.serve_field_file(
+        request,
+        field_file,
+        as_attachment=request.GET.get('download') == '1',
+        filename=f'{training.title}{extension}'
+    )
+
+
+# ==================== Chunked Upload Views ====================
+from .models import ChunkedUpload
+
+
+def _upload_response(upload, status=200):
+    """پاسخ JSON وضعیت آپلود به همراه هدرهای tus"""
+    response = JsonResponse({
+        'success': True,
+        'upload_id': str(upload.id),
+        'field': upload.field,
+        'filename': upload.filename,
+        'offset': upload.offset,
+        'total_size': upload.total_size,
+        'status': upload.status,
+        'progress': upload.progress_percent,
+        'url': reverse('hse:upload_detail', args=[upload.company_id, upload.id]),
+    }, status=status)
+    response['Upload-Offset'] = str(upload.offset)
+    response['Upload-Length'] = str(upload.total_size)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def _upload_error(error):
+    """پاسخ JSON خطای آپلود"""
+    data = {'success': False, 'error': error.message}
+    if error.offset is not None:
+        data['offset'] = error.offset
+    response = JsonResponse(data, status=error.status)
+    if error.offset is not None:
+        response['Upload-Offset'] = str(error.offset)
+    return response
+
+
+def _upload_training(company, value):
+    """آموزش مقصد آپلود از شناسه ارسالی؛ شناسه نامعتبر None برمی‌گرداند و آموزش ناموجود ۴۰۴ است"""
+    try:
+        training_id = uuid.UUID(str(value))
+    except ValueError:
+        return None
+    return get_object_or_404(Training, id=training_id, company=company)
+
+
+@login_required_company_member
+@require_POST
+def upload_create(request, company_id):
+    """
+    شروع آپلود تکه‌ای
+    ورودی JSON: {"field": "video|attachment", "filename", "size", "checksum"?, "training"?}
+    """
+    company = get_object_or_404(Company, id=company_id)
+
+    try:
+        payload = json.loads(request.body or '{}')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'JSON نامعتبر است'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'success': False, 'error': 'ساختار JSON نامعتبر است'}, status=400)
+
+    training = None
+    if payload.get('training'):
+        training = _upload_training(company, payload['training'])
+        if training is None:
+            return JsonResponse({'success': False, 'error': 'شناسه آموزش نامعتبر است'}, status=400)
+
+    try:
+        upload = upload_service.create_upload(
+            company,
+            request.user,
+            field=payload.get('field'),
+            filename=payload.get('filename'),
+            total_size=payload.get('size', request.headers.get('Upload-Length')),
+            checksum=payload.get('checksum', ''),
+            training=training
+        )
+    except upload_service.UploadError as error:
+        return _upload_error(error)
+
+    response = _upload_response(upload, status=201)
+    response['Location'] = reverse('hse:upload_detail', args=[company.id, upload.id])
+    return response
+
+
+@login_required_company_member
+@require_http_methods(["GET", "HEAD", "PATCH", "DELETE"])
+def upload_detail(request, company_id, upload_id):
+    """
+    وضعیت آپلود (GET/HEAD)، ارسال تکه (PATCH) و لغو (DELETE)
+    PATCH: بدنه خام تکه با هدرهای Upload-Offset و در صورت تمایل Upload-Checksum
+    """
+    company = get_object_or_404(Company, id=company_id)
+    upload = get_object_or_404(ChunkedUpload, id=upload_id, company=company, created_by=request.user)
+
+    try:
+        if request.method == 'PATCH':
+            try:
+                offset = int(request.headers.get('Upload-Offset', ''))
+                length = int(request.headers.get('Content-Length', ''))
+            except ValueError:
+                return JsonResponse({'success': False, 'error': 'هدرهای Upload-Offset و Content-Length الزامی است'}, status=400)
+
+            upload = upload_service.append_chunk(
+                upload.id,
+                offset,
+                request,
+                length,
+                upload_service.parse_chunk_checksum(request.headers.get('Upload-Checksum'))
+            )
+        elif request.method == 'DELETE':
+            upload = upload_service.cancel_upload(upload)
+    except upload_service.UploadError as error:
+        return _upload_error(error)
+
+    return _upload_response(upload)
+
+
+@login_required_company_member
+@require_POST
+def upload_complete(request, company_id, upload_id):
+    """
+    پایان آپلود: بررسی حجم و چک‌سام و در صورت ارسال training اتصال فایل به آموزش
+    """
+    company = get_object_or_404(Company, id=company_id)
+    upload = get_object_or_404(ChunkedUpload, id=upload_id, company=company, created_by=request.user)
+
+    try:
+        payload = json.loads(request.body or '{}')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'JSON نامعتبر است'}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({'success': False, 'error': 'ساختار JSON نامعتبر است'}, status=400)
+
+    training = upload.training
+    if payload.get('training'):
+        training = _upload_training(company, payload['training'])
+        if training is None:
+            return JsonResponse({'success': False, 'error': 'شناسه آموزش نامعتبر است'}, status=400)
+
+    try:
+        upload = upload_service.complete_upload(upload)
+        if training:
+            upload_service.attach_upload(upload, training)
+    except upload_service.UploadError as error:
+        return _upload_error(error)
+
+    return _upload_response(upload)
+
+
+# ==================== Training Compliance Views ====================
+from .service import compliance_service
+
+COMPLIANCE_PAGE_SIZE = 100
+
+
+def _compliance_selection(request, matrix):
+    """فیلترهای ماتریس انطباق (بخش، انواع آموزش، فقط کمبودها)"""
+    types = [value for value in request.GET.getlist('type') if value in compliance_service.TRAINING_TYPES]
+    return compliance_service.select_rows(
+        matrix,
+        department_id=request.GET.get('department') or None,
+        types=types,
+        gaps_only=request.GET.get('gaps') == '1'
+    )
+
+
+@login_required_company_member
+@require_GET
+def training_compliance(request, company_id):
+    """ماتریس انطباق آموزشی اعضا (عضو × نوع آموزش)"""
+    company = get_object_or_404(Company, id=company_id)
+    matrix = compliance_service.get_matrix(company)
+    columns, rows = _compliance_selection(request, matrix)
+
+    page_obj = Paginator(rows, COMPLIANCE_PAGE_SIZE).get_page(request.GET.get('page'))
+    table = [
+        {
+            'member': matrix['members'][i],
+            'cells': [
+                {
+                    'status': matrix['status'][i][j],
+                    'label': compliance_service.STATUS_LABELS[matrix['status'][i][j]],
+                    'completed': matrix['completed'][i][j],
+                }
+                for j in columns
+            ],
+        }
+        for i in page_obj.object_list
+    ]
+
+    total_members = len(matrix['members'])
+    coverage = [
+        {
+            'label': compliance_service.TRAINING_TYPE_LABELS[matrix['types'][j]],
+            'count': matrix['coverage'][j],
+            'percent': round(matrix['coverage'][j] * 100 / total_members) if total_members else 0,
+        }
+        for j in columns
+    ]
+
+    query = request.GET.copy()
+    query.pop('page', None)
+
+    context = {
+        'company': company,
+        'table': table,
+        'coverage': coverage,
+        'page_obj': page_obj,
+        'total_members': total_members,
+        'filtered_count': len(rows),
+        'departments': CompanyDepartment.objects.filter(company=company),
+        'training_type_choices': Training.TRAINING_TYPE_CHOICES,
+        'selected_types': request.GET.getlist('type'),
+        'department_filter': request.GET.get('department', ''),
+        'gaps_filter': request.GET.get('gaps') == '1',
+        'query_string': query.urlencode(),
+        'status_attended': compliance_service.STATUS_ATTENDED,
+        'status_registered': compliance_service.STATUS_REGISTERED,
+    }
+    return render(request, 'hse/training/compliance.html', context)
+
+
+@login_required_company_member
+@require_GET
+def training_compliance_api(request, company_id):
+    """
+    ماتریس انطباق به صورت JSON
+    status[i][j] رتبه بهترین وضعیت است: 0 بدون سابقه، 1 غایب، 2 معذور، 3 ثبت‌نام، 4 گذرانده
+    """
+    company = get_object_or_404(Company, id=company_id)
+    matrix = compliance_service.get_matrix(company)
+    columns, rows = _compliance_selection(request, matrix)
+
+    try:
+        offset = max(0, int(request.GET.get('offset', 0)))
+        limit = min(1000, max(1, int(request.GET.get('limit', 500))))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'offset/limit نامعتبر است'}, status=400)
+
+    page = rows[offset:offset + limit]
+    return JsonResponse({
+        'success': True,
+        'version': matrix['version'],
+        'types': [matrix['types'][j] for j in columns],
+        'status_labels': compliance_service.STATUS_LABELS,
+        'total': len(rows),
+        'offset': offset,
+        'members': [matrix['members'][i] for i in page],
+        'status': [[matrix['status'][i][j] for j in columns] for i in page],
+        'completed': [[matrix['completed'][i][j] for j in columns] for i in page],
+        'coverage': {matrix['types'][j]: matrix['coverage'][j] for j in columns},
+    })
+
+
+@login_required_company_member
+@require_GET
+def training_compliance_export(request, company_id):
+    """خروجی CSV/XLSX کمبودهای آموزشی (هر ردیف: عضو و نوع آموزشی که نگذرانده)"""
+    company = get_object_or_404(Company, id=company_id)
+    matrix = compliance_service.get_matrix(company)
+    columns, rows = _compliance_selection(request, matrix)
+
+    return export_service.stream_response(
+        ['نام', 'بخش', 'نوع آموزش', 'بهترین وضعیت'],
+        compliance_service.iter_gaps(matrix, columns, rows),
+        filename=f'training-gaps-{timezone.now():%Y%m%d}',
+        file_format=_export_format(request),
+        sheet_name='Gaps',
+    )
+
+
+# ==================== Schedule Conflict Views ====================
+
+def _parse_schedule_datetime(value):
+    """تاریخ یا تاریخ و زمان ISO به datetime آگاه از منطقه زمانی"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@login_required_company_member
+@require_GET
+def schedule_conflicts_check(request, company_id):
+    """
+    بررسی لحظه‌ای تداخل جلسه در حال ایجاد/ویرایش (فرم آموزش و بازرسی)
+    پارامترها برای آموزش: kind=training، scheduled_date، duration_minutes، instructor، participants (چندتایی)
+    پارامترها برای بازرسی: kind=inspection، scheduled_date، assigned_to
+    object_id: شناسه جلسه‌ای که ویرایش می‌شود
+    """
+    company = get_object_or_404(Company, id=company_id)
+    kind = request.GET.get('kind')
+    start = _parse_schedule_datetime(request.GET.get('scheduled_date'))
+    if start is None:
+        return JsonResponse({'success': False, 'error': 'تاریخ برنامه‌ریزی نامعتبر است'}, status=400)
+
+    object_id = request.GET.get('object_id') or None
+    try:
+        if object_id:
+            object_id = uuid.UUID(object_id)
+        if kind == schedule_service.KIND_TRAINING:
+            duration = int(request.GET.get('duration_minutes') or 0)
+            member_ids = [request.GET.get('instructor')] + request.GET.getlist('participants')
+            member_ids = [uuid.UUID(member_id) for member_id in member_ids if member_id]
+            candidate = schedule_service.training_interval(object_id, '', start, duration, member_ids)
+        elif kind == schedule_service.KIND_INSPECTION:
+            assigned_to = request.GET.get('assigned_to')
+            candidate = schedule_service.inspection_interval(
+                object_id, '', start.date(), uuid.UUID(assigned_to) if assigned_to else None
+            )
+        else:
+            return JsonResponse({'success': False, 'error': 'نوع جلسه نامعتبر است'}, status=400)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'پارامترها نامعتبر است'}, status=400)
+
+    conflicts = schedule_service.find_conflicts(company, candidate)
+    return JsonResponse({
+        'success': True,
+        'count': len(conflicts),
+        'conflicts': schedule_service.serialize_conflicts(conflicts),
+    })
+
+
+def _conflict_window(request):
+    """بازه گزارش تداخل از پارامترهای from/to (پیش‌فرض: ۳۰ روز آینده)"""
+    start = _parse_schedule_datetime(request.GET.get('from'))
+    end = _parse_schedule_datetime(request.GET.get('to'))
+    if start is None:
+        start = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+    if end is None or end <= start:
+        end = start + timedelta(days=30)
+    end = min(end, start + timedelta(days=schedule_service.MAX_REPORT_DAYS))
+    return start, end
+
+
+@login_required_company_member
+@require_GET
+def schedule_conflicts(request, company_id):
+    """گزارش تداخل‌های زمانی آموزش‌ها و بازرسی‌ها در یک بازه"""
+    company = get_object_or_404(Company, id=company_id)
+    start, end = _conflict_window(request)
+    report = schedule_service.conflicts_report(company, start, end)
+
+    paginator = Paginator(report, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
+
+    context = {
+        'company': company,
+        'page_obj': page_obj,
+        'conflicts': page_obj.object_list,
+        'total': len(report),
+        'window_start': timezone.localtime(start).date(),
+        'window_end': timezone.localtime(end).date(),
+        'query_string': query_params.urlencode(),
+    }
+    return render(request, 'hse/training/conflicts.html', context)
+
+
+@login_required_company_member
+@require_GET
+def schedule_conflicts_api(request, company_id):
+    """گزارش تداخل‌های زمانی به صورت JSON"""
+    company = get_object_or_404(Company, id=company_id)
+    start, end = _conflict_window(request)
+    report = schedule_service.conflicts_report(company, start, end)
+    return JsonResponse({
+        'success': True,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'count': len(report),
+        'conflicts': report,
+    })
+
+
+# ==================== Inspection Schedule Views ====================
+import calendar
+from .forms import InspectionScheduleForm
+from .models import InspectionSchedule
+from .service import inspection_schedule_service
+
+
+@login_required_company_member
+def inspection_schedule_list(request, company_id):
+    """لیست برنامه‌های بازرسی دوره‌ای"""
+    company = get_object_or_404(Company, id=company_id)
+    schedules = (
+        InspectionSchedule.objects
+        .filter(company=company)
+        .select_related('department', 'assigned_to__user')
+        .annotate(occurrence_count=Count('occurrences'))
+    )
+
+    context = {
+        'company': company,
+        'schedules': schedules,
+        'horizon_days': inspection_schedule_service.horizon_days(),
+    }
+    return render(request, 'hse/inspection/schedule_list.html', context)
+
+
+@login_required_company_member
+def inspection_schedule_create(request, company_id):
+    """ایجاد برنامه بازرسی دوره‌ای"""
+    company = get_object_or_404(Company, id=company_id)
+
+    if request.method == 'POST':
+        form = InspectionScheduleForm(request.POST, company=company)
+        if form.is_valid():
+            schedule = form.save(commit=False)
+            schedule.company = company
+            schedule.created_by = request.user
+            schedule.save()
+
+            created = 0
+            if schedule.is_active:
+                created = inspection_schedule_service.materialize([schedule])
+            messages.success(request, f'برنامه بازرسی ایجاد شد و {created} بازرسی تا افق برنامه‌ریزی ساخته شد.')
+            return redirect('hse:inspection_schedule_list', company_id=company.id)
+    else:
+        form = InspectionScheduleForm(company=company)
+
+    context = {
+        'company': company,
+        'form': form,
+        'page_title': 'برنامه بازرسی دوره‌ای جدید',
+    }
+    return render(request, 'hse/inspection/schedule_form.html', context)
+
+
+@login_required_company_member
+def inspection_schedule_update(request, company_id, schedule_id):
+    """ویرایش برنامه بازرسی دوره‌ای؛ بازرسی‌های شروع نشده آینده هم به‌روز می‌شوند"""
+    company = get_object_or_404(Company, id=company_id)
+    schedule = get_object_or_404(InspectionSchedule, id=schedule_id, company=company)
+
+    if request.method == 'POST':
+        form = InspectionScheduleForm(request.POST, instance=schedule, company=company)
+        if form.is_valid():
+            schedule = form.save()
+            inspection_schedule_service.apply_changes(schedule, form.changed_data)
+            messages.success(request, 'برنامه بازرسی با موفقیت به‌روزرسانی شد.')
+            return redirect('hse:inspection_schedule_list', company_id=company.id)
+    else:
+        form = InspectionScheduleForm(instance=schedule, company=company)
+
+    context = {
+        'company': company,
+        'form': form,
+        'schedule': schedule,
+        'page_title': 'ویرایش برنامه بازرسی دوره‌ای',
+    }
+    return render(request, 'hse/inspection/schedule_form.html', context)
+
+
+@login_required_company_member
+@require_POST
+def inspection_schedule_delete(request, company_id, schedule_id):
+    """حذف برنامه و بازرسی‌های شروع نشده آینده آن (بازرسی‌های گذشته حفظ می‌شوند)"""
+    company = get_object_or_404(Company, id=company_id)
+    schedule = get_object_or_404(InspectionSchedule, id=schedule_id, company=company)
+
+    deleted, _ = inspection_schedule_service.future_occurrences(schedule).delete()
+    schedule.delete()
+    messages.success(request, f'برنامه بازرسی حذف شد ({deleted} بازرسی آینده حذف شد).')
+    return redirect('hse:inspection_schedule_list', company_id=company.id)
+
+
+def _calendar_month(request):
+    """ماه تقویم از پارامتر month=YYYY-MM (پیش‌فرض: ماه جاری)"""
+    try:
+        year, month = (int(part) for part in request.GET.get('month', '').split('-'))
+        return date(year, month, 1)
+    except ValueError:
+        return timezone.localdate().replace(day=1)
+
+
+@login_required_company_member
+@require_GET
+def inspection_calendar(request, company_id):
+    """تقویم ماهانه بازرسی‌ها شامل رخدادهای آینده برنامه‌های دوره‌ای"""
+    company = get_object_or_404(Company, id=company_id)
+    month_start = _calendar_month(request)
+    month_end = month_start.replace(day=calendar.monthrange(month_start.year, month_start.month)[1])
+
+    events_by_day = {}
+    for event in inspection_schedule_service.calendar_events(company, month_start, month_end):
+        events_by_day.setdefault(event['date'], []).append(event)
+
+    # هفته‌ها از شنبه شروع می‌شوند
+    weeks = [
+        [{'date': day, 'in_month': day.month == month_start.month, 'events': events_by_day.get(day, [])} for day in week]
+        for week in calendar.Calendar(firstweekday=calendar.SATURDAY).monthdatescalendar(month_start.year, month_start.month)
+    ]
+
+    context = {
+        'company': company,
+        'weeks': weeks,
+        'month_start': month_start,
+        'previous_month': (month_start - timedelta(days=1)).strftime('%Y-%m'),
+        'next_month': (month_end + timedelta(days=1)).strftime('%Y-%m'),
+        'today': timezone.localdate(),
+        'weekday_names': ['شنبه', 'یکشنبه', 'دوشنبه', 'سه‌شنبه', 'چهارشنبه', 'پنجشنبه', 'جمعه'],
+    }
+    return render(request, 'hse/inspection/calendar.html', context)
+
+
+@login_required_company_member
+@require_GET
+def inspection_calendar_api(request, company_id):
+    """رویدادهای تقویم بازرسی در بازه from/to به صورت JSON (حداکثر یک سال)"""
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        start = date.fromisoformat(request.GET.get('from', ''))
+        end = date.fromisoformat(request.GET.get('to', ''))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'پارامترهای from و to باید تاریخ YYYY-MM-DD باشند'}, status=400)
+    if end < start or (end - start).days > 366:
+        return JsonResponse({'success': False, 'error': 'بازه تاریخ نامعتبر است'}, status=400)
+
+    events = inspection_schedule_service.calendar_events(company, start, end)
+    for event in events:
+        event['date'] = event['date'].isoformat()
+    return JsonResponse({'success': True, 'count': len(events), 'events': events})
+
+
+# ==================== Inspection Checklist Views ====================
+from django.db import transaction
+from .forms import ChecklistTemplateForm
+
+
+@login_required_company_member
+def checklist_template_list(request, company_id):
+    """لیست چک‌لیست‌های بازرسی"""
+    company = get_object_or_404(Company, id=company_id)
+    templates = ChecklistTemplate.objects.filter(company=company).annotate(
+        item_count=Count('items', filter=Q(items__is_active=True), distinct=True),
+        inspection_count=Count('inspections', distinct=True),
+    )
+
+    context = {
+        'company': company,
+        'templates': templates,
+    }
+    return render(request, 'hse/inspection/checklist_list.html', context)
+
+
+def _save_checklist_template(request, company, form):
+    """ذخیره چک‌لیست و بندهای آن؛ در صورت خطای بندها None برمی‌گرداند"""
+    try:
+        items = checklist_service.parse_item_lines(form.cleaned_data['items_text'])
+    except checklist_service.ChecklistError as error:
+        form.add_error('items_text', str(error))
+        return None
+    if not items:
+        form.add_error('items_text', 'حداقل یک بند وارد کنید.')
+        return None
+
+    with transaction.atomic():
+        template = form.save(commit=False)
+        template.company = company
+        if not template.created_by_id:
+            template.created_by = request.user
+        template.save()
+        checklist_service.save_items(template, items)
+    return template
+
+
+@login_required_company_member
+def checklist_template_create(request, company_id):
+    """ایجاد چک‌لیست بازرسی"""
+    company = get_object_or_404(Company, id=company_id)
+
+    if request.method == 'POST':
+        form = ChecklistTemplateForm(request.POST)
+        if form.is_valid() and _save_checklist_template(request, company, form):
+            messages.success(request, 'چک‌لیست با موفقیت ایجاد شد.')
+            return redirect('hse:checklist_template_list', company_id=company.id)
+    else:
+        form = ChecklistTemplateForm()
+
+    context = {
+        'company': company,
+        'form': form,
+        'page_title': 'چک‌لیست جدید',
+    }
+    return render(request, 'hse/inspection/checklist_form.html', context)
+
+
+@login_required_company_member
+def checklist_template_update(request, company_id, template_id):
+    """ویرایش چک‌لیست؛ بندهای پاسخ داده شده حذف نمی‌شوند و فقط غیرفعال می‌شوند"""
+    company = get_object_or_404(Company, id=company_id)
+    template = get_object_or_404(ChecklistTemplate, id=template_id, company=company)
+
+    if request.method == 'POST':
+        form = ChecklistTemplateForm(request.POST, instance=template)
+        if form.is_valid() and _save_checklist_template(request, company, form):
+            messages.success(request, 'چک‌لیست با موفقیت به‌روزرسانی شد.')
+            return redirect('hse:checklist_template_list', company_id=company.id)
+    else:
+        form = ChecklistTemplateForm(instance=template, initial={
+            'items_text': checklist_service.items_as_text(template)
+        })
+
+    context = {
+        'company': company,
+        'form': form,
+        'template': template,
+        'page_title': 'ویرایش چک‌لیست',
+    }
+    return render(request, 'hse/inspection/checklist_form.html', context)
+
+
+@login_required_company_member
+@require_POST
+def checklist_template_delete(request, company_id, template_id):
+    """حذف چک‌لیستی که هنوز پاسخی ندارد"""
+    company = get_object_or_404(Company, id=company_id)
+    template = get_object_or_404(ChecklistTemplate, id=template_id, company=company)
+
+    if ChecklistResponse.objects.filter(item__template=template).exists():
+        messages.error(request, 'این چک‌لیست در بازرسی‌ها پاسخ داده شده است؛ به جای حذف آن را غیرفعال کنید.')
+    else:
+        template.delete()
+        messages.success(request, 'چک‌لیست حذف شد.')
+    return redirect('hse:checklist_template_list', company_id=company.id)
+
+
+@login_required_company_member
+@require_POST
+def inspection_checklist_assign(request, company_id, inspection_id):
+    """انتخاب چک‌لیست برای بازرسی"""
+    company = get_object_or_404(Company, id=company_id)
+    inspection = get_object_or_404(Inspection, id=inspection_id, company=company)
+
+    checklist_id = request.POST.get('checklist')
+    if checklist_id:
+        try:
+            checklist_id = uuid.UUID(checklist_id)
+        except ValueError:
+            messages.error(request, 'چک‌لیست انتخاب شده نامعتبر است.')
+            return redirect('hse:inspection_detail', company_id=company.id, inspection_id=inspection.id)
+        inspection.checklist = get_object_or_404(ChecklistTemplate, id=checklist_id, company=company)
+    else:
+        inspection.checklist = None
+    inspection.save(update_fields=['checklist', 'updated_at'])
+    messages.success(request, 'چک‌لیست بازرسی به‌روزرسانی شد.')
+    return redirect('hse:inspection_detail', company_id=company.id, inspection_id=inspection.id)
+
+
+@login_required_company_member
+@require_http_methods(['GET', 'POST'])
+def inspection_checklist(request, company_id, inspection_id):
+    """
+    چک‌لیست بازرسی در یک رفت و برگشت
+    GET: بندها و پاسخ‌های فعلی به صورت JSON
+    POST فرم: item (تکرار شونده) + result_<id> / note_<id>
+    POST JSON: {"responses": [{"item", "result", "note"}, ...]}
+    همه پاسخ‌ها در یک تراکنش ذخیره می‌شوند و در صورت هر خطا هیچ پاسخی ذخیره نمی‌شود
+    """
+    company = get_object_or_404(Company, id=company_id)
+    inspection = get_object_or_404(Inspection, id=inspection_id, company=company)
+
+    if request.method == 'GET':
+        return JsonResponse({
+            'success': True,
+            'checklist': str(inspection.checklist_id) if inspection.checklist_id else None,
+            'items': [
+                {
+                    'id': str(item.id),
+                    'category': item.category,
+                    'text': item.text,
+                    'result': item.response.result if item.response else None,
+                    'note': item.response.note if item.response else '',
+                }
+                for item in checklist_service.checklist_items(inspection)
+            ],
+            'stats': checklist_service.inspection_stats(inspection),
+        })
+
+    is_json = request.content_type == 'application/json'
+    if is_json:
+        try:
+            rows = json.loads(request.body or '{}').get('responses', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'JSON نامعتبر است'}, status=400)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return JsonResponse({'success': False, 'error': 'responses باید لیستی از پاسخ‌ها باشد'}, status=400)
+    else:
+        rows = checklist_service.responses_from_post(request.POST, request.POST.getlist('item'))
+
+    try:
+        saved, errors = checklist_service.submit_responses(inspection, rows, request.user)
+    except checklist_service.ChecklistError as error:
+        saved, errors = 0, [{'item': None, 'error': str(error)}]
+
+    if is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse(
+            {
+                'success': not errors,
+                'saved': saved,
+                'errors': errors,
+                'stats': checklist_service.inspection_stats(inspection),
+            },
+            status=400 if errors else 200
+        )
+
+    if errors:
+        for error in errors[:5]:
+            messages.error(request, error['error'])
+    else:
+        messages.success(request, f'{saved} پاسخ چک‌لیست ذخیره شد.')
+    return redirect('hse:inspection_detail', company_id=company.id, inspection_id=inspection.id)
+
+
+@login_required_company_member
+@require_GET
+def checklist_stats(request, company_id):
+    """درصد انطباق چک‌لیست‌ها به تفکیک بخش و بازرسی"""
+    company = get_object_or_404(Company, id=company_id)
+
+    start = end = None
+    try:
+        if request.GET.get('from'):
+            start = date.fromisoformat(request.GET['from'])
+        if request.GET.get('to'):
+            end = date.fromisoformat(request.GET['to'])
+    except ValueError:
+        messages.error(request, 'تاریخ نامعتبر است.')
+
+    inspections = Inspection.objects.filter(company=company, checklist__isnull=False)
+    if start:
+        inspections = inspections.filter(scheduled_date__gte=start)
+    if end:
+        inspections = inspections.filter(scheduled_date__lte=end)
+    inspections = checklist_service.annotate_pass_rates(
+        inspections.select_related('department', 'checklist')
+    ).order_by('-scheduled_date')
+
+    paginator = Paginator(inspections, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    for inspection in page_obj:
+        inspection.pass_rate = checklist_service.pass_rate(inspection.pass_count, inspection.fail_count)
+
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
+
+    context = {
+        'company': company,
+        'departments': checklist_service.department_stats(company, start, end),
+        'failing_items': checklist_service.failing_items(company),
+        'page_obj': page_obj,
+        'start': start,
+        'end': end,
+        'query_string': query_params.urlencode(),
+    }
+    return render(request, 'hse/inspection/checklist_stats.html', context)
+
+
+# ==================== Task Board Views ====================
+from .service import board_service
+
+
+@login_required_company_member
+def task_board(request, company_id):
+    """برد کانبان وظایف؛ کارت‌ها از task_board_api بارگذاری می‌شوند"""
+    company = get_object_or_404(Company, id=company_id)
+
+    context = {
+        'company': company,
+        'columns': Task.STATUS_CHOICES,
+        'members': company.members.filter(is_active=True).select_related('user'),
+        'priority_filter': request.GET.get('priority', ''),
+        'assigned_to_filter': request.GET.get('assigned_to', ''),
+        'task_priority_choices': Task.PRIORITY_CHOICES,
+        'query_string': request.GET.urlencode(),
+    }
+    return render(request, 'hse/task/board.html', context)
+
+
+@login_required_company_member
+@require_GET
+def task_board_api(request, company_id):
+    """
+    داده برد وظایف
+    بدون status: همه ستون‌ها با تعداد کل و صفحه اول هر ستون
+    با status و cursor: صفحه بعد همان ستون (اسکرول بی‌نهایت)
+    """
+    company = get_object_or_404(Company, id=company_id)
+    tasks = filter_tasks(request, company, Task.objects.filter(company=company))
+    today = timezone.localdate()
+
+    try:
+        limit = board_service.page_size(request.GET.get('limit'))
+        status = request.GET.get('column')
+        if not status:
+            return JsonResponse({'success': True, 'columns': board_service.board(tasks, limit, today)})
+
+        if status not in board_service.COLUMN_LABELS:
+            raise board_service.BoardError('ستون نامعتبر است')
+        cards, next_cursor = board_service.column_page(tasks, status, request.GET.get('cursor'), limit)
+    except board_service.BoardError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'column': status,
+        'cards': [board_service.serialize_card(task, today) for task in cards],
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required_company_member
+@require_POST
+def task_board_move(request, company_id, task_id):
+    """جابجایی کارت بین ستون‌ها؛ انتقال از همان جدول وضعیت‌های مجاز بررسی می‌شود"""
+    company = get_object_or_404(Company, id=company_id)
+    task = get_object_or_404(Task.objects.only('id', 'company_id', 'status'), id=task_id, company=company)
+
+    if request.content_type == 'application/json':
+        try:
+            target = json.loads(request.body or b'{}').get('status')
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'داده ارسالی نامعتبر است'}, status=400)
+    else:
+        target = request.POST.get('status')
+
+    try:
+        status_service.transition(task, target, request.user)
+    except status_service.TransitionError as error:
+        return JsonResponse({'success': False, 'error': str(error), 'status': task.status}, status=400)
+
+    return JsonResponse({'success': True, 'id': str(task.id), 'from': task.status, 'status': target})
+
+
+# ==================== Audit History Views ====================
+from .service import audit_service
+
+
+@login_required_company_member
+@require_GET
+def audit_history_api(request, company_id):
+    """
+    تاریخچه تغییرات شرکت به صورت JSON، جدیدترین اول
+    فیلترها: object_type (مثلاً task) و object_id؛ صفحه بعد با پارامتر cursor
+    """
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        entries, next_cursor = audit_service.history(
+            company,
+            request.GET.get('object_type'),
+            request.GET.get('object_id'),
+            request.GET.get('cursor'),
+            audit_service.page_size(request.GET.get('limit')),
+        )
+    except audit_service.AuditError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'entries': [audit_service.serialize_entry(entry) for entry in entries],
+        'next_cursor': next_cursor,
+    })
+
+
+# ==================== Offline Sync Views ====================
+from django.views.decorators.gzip import gzip_page
+from .service import sync_service
+
+
+@gzip_page
+@login_required_company_member
+@require_GET
+def sync_changes(request, company_id):
+    """
+    تغییرات شرکت برای کلاینت آفلاین از مکان نمای cursor (بدون cursor: همگام‌سازی اولیه)
+    هر موجودیت به صورت ستونی (columns + rows) و حذف‌ها در deleted؛
+    تا زمانی که has_more برقرار است کلاینت با cursor جدید دوباره درخواست می‌دهد
+    """
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        payload = sync_service.changes_since(
+            company,
+            request.GET.get('cursor'),
+            sync_service.page_size(request.GET.get('limit')),
+        )
+    except sync_service.SyncError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    return JsonResponse({'success': True, **payload}, json_dumps_params={'separators': (',', ':')})
+
+
+@login_required_company_member
+@require_POST
+def sync_upload(request, company_id):
+    """
+    اعمال صف عملیات آفلاین: {"operations": [...]}
+    ایجادها با شناسه تولید شده در کلاینت ثبت می‌شوند و ارسال دوباره همان صف بی‌اثر است
+    """
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        operations = json.loads(request.body or b'{}').get('operations')
+    except (ValueError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'داده ارسالی نامعتبر است'}, status=400)
+
+    try:
+        results = sync_service.apply_operations(company, request.user, operations)
+    except sync_service.SyncError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    return JsonResponse({'success': True, 'results': results})
+
+
+# ==================== Read-only API Views ====================
+from .service import api_service
+
+
+@login_required_company_member
+@require_GET
+def api_list(request, company_id, resource):
+    """
+    لیست فقط خواندنی یک منبع (incidents، inspections، tasks، trainings، departments، members)
+    ?fields=title,assigned_to.user.name فیلدهای خروجی، ?include=department روابط و ?cursor= صفحه بعد
+    """
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        items, next_cursor = api_service.list_objects(
+            api_service.get_resource(resource),
+            company,
+            request.GET.get('fields'),
+            request.GET.get('include'),
+            request.GET.get('cursor'),
+            api_service.page_size(request.GET.get('limit')),
+        )
+    except api_service.ApiError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    return JsonResponse({'success': True, 'results': items, 'next_cursor': next_cursor})
+
+
+@login_required_company_member
+@require_GET
+def api_detail(request, company_id, resource, object_id):
+    """یک شی از منبع با همان پارامترهای fields و include"""
+    company = get_object_or_404(Company, id=company_id)
+    try:
+        item = api_service.get_object(
+            api_service.get_resource(resource),
+            company,
+            object_id,
+            request.GET.get('fields'),
+            request.GET.get('include'),
+        )
+    except api_service.ApiError as error:
+        return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
+    if item is None:
+        return JsonResponse({'success': False, 'error': 'مورد یافت نشد'}, status=404)
+    return JsonResponse({'success': True, 'result': item})
@@ -9,3 +9,28 @@ def validate_iranian_mobile(value):
     """
     if not re.fullmatch(r"09\d{9}", value):
         raise ValidationError("شماره موبایل معتبر نیست. باید با 09 شروع شود و 11 رقم باشد.")
+
+
+PERSIAN_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+
+
+def normalize_iranian_mobile(value):
+    """
+    یکسان‌سازی شماره موبایل ایرانی به فرمت 09XXXXXXXXX
+    ارقام فارسی/عربی، فاصله، خط تیره و پیش‌شماره +98 پذیرفته می‌شود
+    اگر شماره معتبر نباشد None برمی‌گردد
+    """
+    if value is None:
+        return None
+    mobile = re.sub(r'[\s\-()]', '', str(value).translate(PERSIAN_DIGITS))
+    if mobile.startswith('+98'):
+        mobile = '0' + mobile[3:]
+    elif mobile.startswith('0098'):
+        mobile = '0' + mobile[4:]
+    elif mobile.startswith('98') and len(mobile) == 12:
+        mobile = '0' + mobile[2:]
+    elif mobile.startswith('9') and len(mobile) == 10:
+        mobile = '0' + mobile
+    if not re.fullmatch(r"09\d{9}", mobile):
+        return None
+    return mobile
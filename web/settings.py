@@ -50,6 +50,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.hse.middleware.AuditMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,6 +92,18 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# کش باید بین همه پروسه‌های وب و دستورات مدیریتی مشترک باشد؛ ماتریس انطباق آموزشی با شمارنده
+# نسخه شرکت باطل می‌شود و کش جداگانه هر پروسه (LocMem پیش‌فرض) نسخه‌های قدیمی را نشان می‌دهد.
+# نیازمند سرور Redis و بسته redis؛ آدرس سرور از متغیر محیطی HSE_REDIS_URL خوانده می‌شود
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('HSE_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+        'KEY_PREFIX': 'hse',
+    }
+}
 
 
 # Password validation
@@ -134,6 +147,76 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR,'static/'),)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR,'media/')
+# فقط تصاویر عمومی سایت (لوگو و ...) مستقیم سرو می‌شوند؛ وب‌سرور هم باید فقط همین مسیر را عمومی کند
+PUBLIC_MEDIA_URL = MEDIA_URL + 'img/'
+PUBLIC_MEDIA_ROOT = os.path.join(MEDIA_ROOT, 'img/')
+
+# ارسال فایل‌های محافظت‌شده آموزش (فیلم/ضمیمه)
+# 'django': استریم از خود جنگو | 'x-accel': nginx | 'x-sendfile': apache/lighttpd
+HSE_MEDIA_SERVE_MODE = 'django'
+# location داخلی nginx که به MEDIA_ROOT اشاره می‌کند (فقط در حالت x-accel)
+HSE_MEDIA_ACCEL_PREFIX = '/protected-media/'
+HSE_MEDIA_CHUNK_SIZE = 64 * 1024
+HSE_MEDIA_MAX_AGE = 3600
+
+# آپلود تکه‌ای و قابل ادامه فایل‌های حجیم آموزش
+HSE_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+HSE_UPLOAD_MAX_CHUNK_SIZE = 16 * 1024 ** 2
+# آپلودهای متصل نشده که این مدت تغییری نداشته‌اند توسط gc_media_blobs حذف می‌شوند
+HSE_UPLOAD_EXPIRY_HOURS = 72
+
+# صدور گواهی آموزش؛ فونت باید از حروف فارسی پشتیبانی کند (مثلاً وزیرمتن) و در این مسیر قرار گیرد،
+# در غیر این صورت صدور گواهی با خطا متوقف می‌شود. فونت همراه مخزن نیست و هنگام استقرار نصب می‌شود:
+#   فایل Vazirmatn-Regular.ttf از https://github.com/rastikerdar/vazirmatn/releases (مجوز OFL)
+#   در static/fonts/ قرار گیرد، یا مسیر یک فونت فارسی دیگر در HSE_CERTIFICATE_FONT تنظیم شود
+# اگر Pillow با کتابخانه raqm ساخته نشده باشد متن با arabic-reshaper و python-bidi شکل‌دهی می‌شود
+HSE_CERTIFICATE_FONT = os.path.join(BASE_DIR, 'static', 'fonts', 'Vazirmatn-Regular.ttf')
+# تعداد پروسه‌های رندر گواهی در دستور issue_certificates (None یعنی تعداد هسته‌های پردازنده)
+HSE_CERTIFICATE_WORKERS = None
+# حداکثر گواهی جدید که در صفحه آموزش (همان پروسه وب) رندر می‌شود
+HSE_CERTIFICATE_WEB_MAX_RENDERS = 50
+
+# سطوح تشدید اعلان وظایف معوق (روز پس از سررسید) - دستور escalate_overdue_tasks
+HSE_TASK_ESCALATION_LEVELS = (1, 3, 7)
+
+# یادآوری بازرسی‌های پیش رو (روز قبل از موعد) - دستور send_inspection_reminders
+HSE_INSPECTION_REMINDER_LEAD_DAYS = (7, 1, 0)
+
+# بازرسی‌های برنامه‌های دوره‌ای فقط تا این تعداد روز آینده ساخته می‌شوند - دستور generate_scheduled_inspections
+HSE_INSPECTION_SCHEDULE_HORIZON_DAYS = 30
+
+# نگهداری داده‌های پرحجم (روز) - دستور apply_retention رکوردهای قدیمی‌تر را به جداول بایگانی منتقل می‌کند
+HSE_RETENTION_DAYS = {
+    'notifications': 90,      # اعلان‌های خوانده شده
+    'incidents': 3 * 365,     # حوادث بسته شده بدون وظیفه مرتبط
+}
+# تعداد رکورد هر دسته و مکث بین دسته‌ها (ثانیه) برای کاهش فشار روی پایگاه داده
+HSE_RETENTION_BATCH_SIZE = 1000
+HSE_RETENTION_SLEEP = 0.1
+
+# همگام‌سازی آفلاین: تغییرات چند ثانیه اخیر در دور بعد ارسال می‌شوند تا تراکنش‌های
+# هم‌زمانی که دیرتر commit می‌شوند از مکان نمای کلاینت جا نمانند
+HSE_SYNC_SETTLE_SECONDS = 2
+
+# کانون‌های حادثه: حداکثر تعداد محل نگهداری شده در خلاصه روزانه هر شرکت (الگوریتم Space-Saving)
+HSE_HOTSPOT_CAPACITY = 50
+
+# بازه محاسبه شاخص‌های مقایسه با شرکت‌های هم‌حوزه (روز) - دستور compute_benchmarks
+HSE_BENCHMARK_WINDOW_DAYS = 365
+
+# تشخیص افزایش غیرعادی حوادث بخش‌ها - دستور detect_incident_anomalies (اجرای هفتگی)
+HSE_ANOMALY_HISTORY_WEEKS = 12    # هفته‌های مبنا
+HSE_ANOMALY_EWMA_ALPHA = 0.3      # وزن هفته‌های اخیر در میانگین متحرک نمایی
+HSE_ANOMALY_Z_THRESHOLD = 3.0
+HSE_ANOMALY_MIN_COUNT = 3         # حداقل حوادث هفته برای هشدار
+
+# تشخیص گزارش‌های تکراری یک رویداد (امضای MinHash عنوان، شرح و محل) - دستور cluster_duplicate_incidents
+HSE_DUPLICATE_THRESHOLD = 0.35    # حداقل شباهت تخمینی متن
+HSE_DUPLICATE_WINDOW_DAYS = 14    # حداکثر فاصله تاریخ وقوع دو گزارش
+
+
+# فرم ثبت حضور گروهی برای هر شرکت‌کننده چند فیلد دارد (جلسات چندصد نفره)
+DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
 
 
 AUTH_USER_MODEL = 'user.CustomUser'
@@ -24,4 +24,6 @@ urlpatterns = [
     path('',include('apps.main.urls'),name='main'),
     path('accounts/',include('apps.user.urls',namespace='account')),
     path('hse/',include('apps.hse.urls',namespace='hse'))
-]+static(sett.MEDIA_URL,document_root = sett.MEDIA_ROOT)
+]+static(sett.PUBLIC_MEDIA_URL,document_root = sett.PUBLIC_MEDIA_ROOT)
+# بقیه MEDIA_ROOT (فایل‌های آموزش، blobها، گواهی‌ها، فایل‌های ورود) عمومی نیست و فقط از
+# viewهای دارای کنترل دسترسی hse ارسال می‌شود